@@ -0,0 +1,135 @@
+"""ARAM bench sniping: bench'e düşen daha öncelikli şampiyonu anında kapma.
+
+ARAM'da reroll sonrası istenen şampiyonlar `benchChampions`'a düşer ve genelde bir
+saniye içinde başkası tarafından alınır. BenchSniper her champ-select güncellemesinde
+bench'i öncekiyle karşılaştırır; değişiklik yoksa hiçbir şey yapmaz. Değişiklik varsa
+öncelik sırası (pick_rules planı: kurallar + auto_pick_ids) mevcut şampiyonumdan daha
+iyi olan en öncelikli bench şampiyonunu aynı tick içinde kritik istek yolundan
+(LcuSession.critical) swap eder ve her swap'ın tepki süresini kaydeder.
+
+    sniper = BenchSniper(cs, cfg)
+    threading.Thread(target=sniper.run, args=(stop_flag,), daemon=True).start()
+    sniper.stats()   # {"swaps": n, "ok": n, "react_p50_ms": ..., ...}
+
+Açma/kapama: BENCH_SNIPE=true veya /bench-snipe on|off.
+"""
+from __future__ import annotations
+import threading, time
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Optional
+
+from utils import log_once, percentile
+from profiler import loop_tick
+from models import ChampSelectSession
+from pick_rules import ChampSelectPlanner, SessionView
+
+POLL_INTERVAL = 0.1    # sn — bench modunda champ-select session yoklama aralığı
+IDLE_INTERVAL = 0.5    # sn — champ select dışında / mod kapalıyken
+
+
+class BenchSniper:
+    def __init__(self, cs, cfg, planner: Optional[ChampSelectPlanner] = None,
+                 interval: float = POLL_INTERVAL):
+        self.cs = cs
+        self.cfg = cfg
+        self.planner = planner or ChampSelectPlanner(cs)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self.swaps: Deque[dict] = deque(maxlen=500)
+        self.reset()
+
+    def reset(self) -> None:
+        self._bench: FrozenSet[int] = frozenset()
+        self._mine = 0
+        self._failed: set = set()      # bu bench görünümünde swap'ı başarısız olanlar
+        self._rank: Dict[int, int] = {}
+        self._rank_plan = None
+        self.planner.reset()
+
+    # ---------- öncelik ----------
+    def _ranks(self, sess: dict) -> Dict[int, int]:
+        plan = self.planner.plan_for(SessionView.from_session(sess), self.cfg.snapshot())
+        if plan is not self._rank_plan:
+            self._rank = {cid: i for i, cid in enumerate(plan.picks)}
+            self._rank_plan = plan
+        return self._rank
+
+    # ---------- güncelleme ----------
+    def on_session(self, sess: dict, t_seen: Optional[float] = None) -> Optional[dict]:
+        """Bir champ-select güncellemesini işler; swap yapıldıysa kaydını döner.
+
+        Bench ve kendi şampiyonum değişmediyse O(bench) bir karşılaştırmadan sonra döner.
+        """
+        cs = ChampSelectSession.from_raw(sess)
+        if cs is None or not cs.bench_enabled:
+            return None
+        t_seen = t_seen if t_seen is not None else time.perf_counter()
+        bench, mine = frozenset(cs.bench), cs.my_champion
+        if bench == self._bench and mine == self._mine:
+            return None
+        self._failed &= bench
+        self._bench, self._mine = bench, mine
+
+        rank = self._ranks(sess)
+        best, best_rank = None, rank.get(mine, len(rank))
+        for cid in bench:
+            r = rank.get(cid)
+            if r is not None and r < best_rank and cid not in self._failed:
+                best, best_rank = cid, r
+        if best is None:
+            return None
+
+        t0 = time.perf_counter()
+        ok = self.cs.bench_swap(best, critical=True)
+        t1 = time.perf_counter()
+        rec = {"ts": time.time(), "t": t1, "champion": best, "from": mine, "rank": best_rank, "ok": ok,
+               "react_ms": round((t1 - t_seen) * 1000.0, 3), "swap_ms": round((t1 - t0) * 1000.0, 3)}
+        with self._lock:
+            self.swaps.append(rec)
+        if ok:
+            # bir sonraki güncelleme beklenmeden yerel görünüm düzeltilir
+            self._mine = best
+            self._bench = (bench - {best}) | ({mine} if mine else frozenset())
+        else:
+            self._failed.add(best)
+        log_once("BENCH", f"{'SWAP' if ok else 'swap fail'} {self.planner.name_of(mine) if mine else '-'} → "
+                          f"{self.planner.name_of(best)} (öncelik #{best_rank + 1}) "
+                          f"tepki={rec['react_ms']:.1f} ms swap={rec['swap_ms']:.1f} ms")
+        return rec
+
+    def run(self, stop_flag: dict) -> None:
+        active = False
+        while not stop_flag.get("stop"):
+            loop_tick()
+            if not self.cs.wait_online():
+                continue
+            try:
+                if not self.cfg.get("bench_snipe", False):
+                    active = False
+                    time.sleep(IDLE_INTERVAL); continue
+                sess = self.cs.cs_session()
+                t_seen = time.perf_counter()
+                if not sess:
+                    if active:
+                        self.reset()
+                        active = False
+                    time.sleep(IDLE_INTERVAL); continue
+                active = True
+                self.on_session(sess, t_seen)
+            except Exception as e:
+                log_once("BENCH", f"err={e}")
+            time.sleep(self.interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            recs = list(self.swaps)
+        react = [r["react_ms"] for r in recs if r["ok"]]
+        swap = [r["swap_ms"] for r in recs if r["ok"]]
+        return {
+            "swaps": len(recs),
+            "ok": sum(1 for r in recs if r["ok"]),
+            "react_p50_ms": round(percentile(react, 0.5), 3),
+            "react_p95_ms": round(percentile(react, 0.95), 3),
+            "swap_p50_ms": round(percentile(swap, 0.5), 3),
+            "swap_max_ms": round(max(swap), 3) if swap else 0.0,
+        }
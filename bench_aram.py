@@ -0,0 +1,107 @@
+"""ARAM bench sniping benchmark'ı: senaryolu bench dizisine karşı FakeLcu ile.
+
+Her turda bench'e öncelik listesinden şampiyonlar kısa süreliğine düşer ("add") ve
+belirli bir süre sonra başka bir oyuncu tarafından alınır ("remove"). BenchSniper'ın
+hangilerini yakaladığı, hangilerini kaçırdığı ve bench'e düşüşten swap'a kadar geçen
+süre raporlanır.
+
+Kullanım:
+    python bench_aram.py --rounds 20 --latency-ms 3 --window-ms 400
+"""
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from chat_service import ChatService
+from config import ConfigStore
+from fake_lcu import FakeLcu
+from aram_sniper import BenchSniper
+
+PRIORITY = ["Jinx", "Lux", "Ahri", "Katarina"]
+FILLER = [1, 22, 35, 17, 48]  # Annie, Ashe, Shaco, Teemo, Trundle
+
+
+def _pct(values: list[float], p: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))] if s else 0.0
+
+
+def _script(rnd: random.Random, ids: list[int], window: float) -> list[tuple[float, str, int]]:
+    """Düşük öncelikliden yükseğe: her şampiyon bench'e düşer, window sn sonra alınır."""
+    steps = [(0.0, "add", c) for c in rnd.sample(FILLER, 3)]
+    t = 0.1
+    for cid in reversed(ids):
+        steps.append((t, "add", cid))
+        steps.append((t + window, "remove", cid))
+        t += window + rnd.uniform(0.05, 0.15)
+    return steps
+
+
+def run_round(rnd: random.Random, latency: float, window: float, interval: float) -> dict:
+    fl = FakeLcu("Bench", latency=latency)
+    cs = ChatService(fl)
+    cfg = ConfigStore({"bench_snipe": True, "auto_pick_ids": [], "auto_ban_ids": [], "pick_rules": ""})
+    ids = [cs.champion_id_from_text(n) for n in PRIORITY]
+    cfg.update(auto_pick_ids=ids)
+    fl.start_champ_select(bench=[], my_champion=86, queue_id=450)  # Garen, listede yok
+
+    sniper = BenchSniper(cs, cfg, interval=interval)
+    stop = {"stop": False}
+    th = threading.Thread(target=sniper.run, args=(stop,), daemon=True)
+    th.start()
+    steps = _script(rnd, ids, window)
+    fl.play_bench_script(steps).join()
+    time.sleep(interval * 3)
+    stop["stop"] = True
+    th.join(2.0)
+
+    # bench'e düşüş → swap tamamlanma süresi (kendi saatimizle)
+    appeared = {cid: t for t, op, cid, eff in fl.bench_log if op == "add" and eff}
+    swaps = [s for s in sniper.swaps if s["ok"]]
+    reach = []
+    for s in swaps:
+        t_app = appeared.get(s["champion"])
+        if t_app is not None:
+            reach.append((s["t"] - t_app) * 1000.0)
+    missed = [cid for t, op, cid, eff in fl.bench_log if op == "remove" and eff]
+    return {"final": fl.my_champion(), "best": ids[0], "swaps": swaps, "reach_ms": reach,
+            "missed": missed, "requests": len(fl.requests)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ARAM bench sniping benchmark (FakeLcu)")
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--latency-ms", type=float, default=2.0, help="FakeLcu istek başına gecikme")
+    ap.add_argument("--window-ms", type=float, default=400.0, help="şampiyonun bench'te kalma süresi")
+    ap.add_argument("--interval-ms", type=float, default=100.0, help="BenchSniper yoklama aralığı")
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    react, swap_ms, reach, got_best, missed, reqs = [], [], [], 0, 0, 0
+    for _ in range(args.rounds):
+        res = run_round(rnd, args.latency_ms / 1000.0, args.window_ms / 1000.0, args.interval_ms / 1000.0)
+        react += [s["react_ms"] for s in res["swaps"]]
+        swap_ms += [s["swap_ms"] for s in res["swaps"]]
+        reach += res["reach_ms"]
+        got_best += int(res["final"] == res["best"])
+        missed += len(res["missed"])
+        reqs += res["requests"]
+
+    print(f"[BENCH] rounds={args.rounds} latency={args.latency_ms} ms window={args.window_ms} ms "
+          f"interval={args.interval_ms} ms")
+    print(f"[BENCH] en öncelikli şampiyon alındı: {got_best}/{args.rounds}  kaçırılan: {missed}  "
+          f"swap={len(swap_ms)}  istek/tur={reqs / max(1, args.rounds):.0f}")
+    if swap_ms:
+        print(f"[BENCH] tepki (session → swap): p50={_pct(react, 50):.2f} ms p95={_pct(react, 95):.2f} ms "
+              f"max={max(react):.2f} ms")
+        print(f"[BENCH] swap isteği: mean={statistics.mean(swap_ms):.2f} ms p95={_pct(swap_ms, 95):.2f} ms")
+    if reach:
+        print(f"[BENCH] bench'e düşüş → swap: p50={_pct(reach, 50):.1f} ms p95={_pct(reach, 95):.1f} ms "
+              f"max={max(reach):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
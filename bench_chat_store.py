@@ -0,0 +1,81 @@
+"""ChatStore benchmark'ı: sentetik mesaj ingest hızı ve sorgu gecikmesi.
+
+Kullanım:
+    python bench_chat_store.py --messages 1000000 --convs 200
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from chat_store import ChatStore
+
+WORDS = (
+    "baslat durdur ban odadevret picklist pick lock geo gg wp mid top bot jungle support "
+    "shaco teemo trundle ahri annie katarina ready accept lobby queue aram bench reroll "
+    "selam naber hadi oyun kuyruk bekle tamam olur yok evet hayir"
+).split()
+
+
+def _pct(values: list[float], p: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _timed(fn, n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+
+def _report(name: str, ms: list[float]) -> None:
+    print(f"[{name}] n={len(ms)} mean={statistics.mean(ms):.3f} ms p50={_pct(ms, 50):.3f} ms "
+          f"p95={_pct(ms, 95):.3f} ms max={max(ms):.3f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ChatStore ingest / query benchmark")
+    ap.add_argument("--messages", type=int, default=1_000_000)
+    ap.add_argument("--convs", type=int, default=200)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--db", default="", help="Veritabanı yolu (varsayılan: geçici dosya)")
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    tmpdir = None
+    path = args.db
+    if not path:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "bench_chat.db")
+
+    store = ChatStore(path)
+    convs = [f"conv{i}@sec.pvp.net" for i in range(args.convs)]
+    t_base = time.time() - args.messages
+
+    t0 = time.perf_counter()
+    for i in range(args.messages):
+        body = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 8)))
+        store.add(convs[i % args.convs], i, t_base + i, f"user{i % 37}", i % 5 == 0, body)
+    t_enq = time.perf_counter() - t0
+    store.flush(timeout=3600)
+    t_all = time.perf_counter() - t0
+    print(f"[INGEST] {store.count()} mesaj; kuyruk {t_enq:.2f} s, diske {t_all:.2f} s "
+          f"→ {args.messages / t_all:,.0f} msg/s (fts={store.has_fts})")
+
+    _report("RECENT50", _timed(lambda: store.recent(rnd.choice(convs), 50), args.queries))
+    _report("SEARCH1", _timed(lambda: store.search(rnd.choice(WORDS), 20), args.queries))
+    _report("SEARCH2", _timed(lambda: store.search(f"{rnd.choice(WORDS)} {rnd.choice(WORDS)}", 20), args.queries))
+    _report("SEARCH_CONV", _timed(lambda: store.search(rnd.choice(WORDS), 20, conv_id=rnd.choice(convs)), args.queries))
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
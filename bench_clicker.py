@@ -0,0 +1,164 @@
+"""ui_clicker şablon eşleme benchmark'ı (çevrimdışı, ekran/pyautogui gerekmez).
+
+  ESKİ : locateCenterOnScreen'in maliyet profili — her çağrıda şablonu diskten çöz,
+         tüm masaüstünde tek ölçekte tam çözünürlük NCC
+  pyscreeze : (kuruluysa) pyautogui'nin kendi locate()'i, OpenCV ile
+  YENİ : TemplateEngine — önbellekli şablon, yalnızca pencere bölgesi, kaba→ince arama,
+         birkaç ölçek; ikinci ve sonraki çağrılar son isabet ROI'sinden
+
+Kayıtlı ekran görüntüleriyle:
+    python bench_clicker.py --shots shots/ --templates assets/ --region 0,0,1280,720
+(shots/*.png tam masaüstü görüntüleri; templates/ altında accept_button.png, ara_button.png)
+
+Görüntü yoksa sentetik bir çift monitör masaüstü üretilir (pencere 1280x720 ve 1600x900):
+    python bench_clicker.py --repeat 5
+"""
+from __future__ import annotations
+import argparse
+import glob
+import importlib.util
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from template_match import TemplateEngine, Template, best, load_gray
+
+TEMPLATE_FILES = {"accept": "accept_button.png", "find": "ara_button.png"}
+
+
+def _median_ms(fn, repeat: int):
+    ts, res = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        ts.append(time.perf_counter() - t0)
+    return statistics.median(ts) * 1000.0, res
+
+
+# ---------- sentetik korpus ----------
+def _button(rnd: np.random.Generator, w: int = 180, h: int = 44) -> np.ndarray:
+    b = np.full((h, w), 40.0, dtype=np.float32)
+    b[2:-2, 2:-2] = 90.0
+    for _ in range(9):   # "yazı" benzeri yüksek kontrastlı çizgiler
+        x0 = int(rnd.integers(12, w - 24))
+        y0 = int(rnd.integers(10, h - 16))
+        b[y0:y0 + int(rnd.integers(4, 8)), x0:x0 + int(rnd.integers(3, 14))] = 230.0
+    return b
+
+
+def _desktop(rnd: np.random.Generator, w: int, h: int) -> np.ndarray:
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = 80 + 40 * np.sin(xx / 97.0) * np.cos(yy / 61.0) + rnd.normal(0, 6, (h, w)).astype(np.float32)
+    for _ in range(60):   # pencere / ikon benzeri bloklar
+        x0, y0 = int(rnd.integers(0, w - 200)), int(rnd.integers(0, h - 120))
+        img[y0:y0 + int(rnd.integers(20, 120)), x0:x0 + int(rnd.integers(30, 200))] = float(rnd.integers(0, 255))
+    return np.clip(img, 0, 255).astype(np.float32)
+
+
+def synthetic_corpus(rnd: np.random.Generator):
+    from template_match import _resize
+    tpls = {"accept": _button(rnd), "find": _button(rnd, 150, 40)}
+    shots = []
+    for win_w, win_h, win_x, win_y in ((1280, 720, 2200, 200), (1600, 900, 300, 90)):
+        scale = win_w / 1280
+        desk = _desktop(rnd, 3840, 1080)
+        desk[win_y:win_y + win_h, win_x:win_x + win_w] = _desktop(rnd, win_w, win_h) * 0.5
+        truth = {}
+        for name, (fx, fy) in (("accept", (0.45, 0.78)), ("find", (0.40, 0.90))):
+            t = _resize(tpls[name], scale)
+            x, y = win_x + int(win_w * fx), win_y + int(win_h * fy)
+            desk[y:y + t.shape[0], x:x + t.shape[1]] = t
+            truth[name] = (x + t.shape[1] // 2, y + t.shape[0] // 2)
+        shots.append((f"synthetic-{win_w}x{win_h}", desk, (win_x, win_y, win_w, win_h), truth))
+    return tpls, shots
+
+
+def _save_templates(tpls) -> str:
+    from PIL import Image
+    d = tempfile.mkdtemp(prefix="bench_clicker_")
+    for name, arr in tpls.items():
+        Image.fromarray(arr.astype(np.uint8)).save(os.path.join(d, TEMPLATE_FILES[name]))
+    return d
+
+
+# ---------- yöntemler ----------
+def old_locate(path: str, screen: np.ndarray, threshold: float):
+    """Her çağrıda şablonu çöz + tüm ekranda tek ölçek NCC (önbelleksiz)."""
+    st = Template.load("x", path).at(1.0)
+    score, y, x = best(screen, st)
+    return (x + st.w // 2, y + st.h // 2) if score >= threshold else None
+
+
+def pyscreeze_locate(path: str, screen_img, threshold: float):
+    import pyscreeze
+    box = pyscreeze.locate(path, screen_img, confidence=threshold, grayscale=True)
+    return (box.left + box.width // 2, box.top + box.height // 2) if box else None
+
+
+def _fmt(pos, truth) -> str:
+    if pos is None:
+        return "yok"
+    if truth is None:
+        return f"{pos}"
+    err = max(abs(pos[0] - truth[0]), abs(pos[1] - truth[1]))
+    return f"{pos} ({'OK' if err <= 3 else f'hata {err}px'})"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ui_clicker şablon eşleme benchmark'ı")
+    ap.add_argument("--shots", default="", help="*.png masaüstü görüntüleri dizini (varsayılan: sentetik)")
+    ap.add_argument("--templates", default="assets", help="accept_button.png / ara_button.png dizini")
+    ap.add_argument("--region", default="", help="pencere bölgesi left,top,width,height (varsayılan: tüm görüntü)")
+    ap.add_argument("--threshold", type=float, default=0.86)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.shots:
+        tdir = args.templates
+        shots = []
+        region = tuple(int(v) for v in args.region.split(",")) if args.region else None
+        for p in sorted(glob.glob(os.path.join(args.shots, "*.png"))):
+            img = load_gray(p)
+            shots.append((os.path.basename(p), img, region or (0, 0, img.shape[1], img.shape[0]), {}))
+    else:
+        tpls, shots = synthetic_corpus(np.random.default_rng(7))
+        tdir = _save_templates(tpls)
+    paths = {n: os.path.join(tdir, f) for n, f in TEMPLATE_FILES.items() if os.path.exists(os.path.join(tdir, f))}
+    if not paths or not shots:
+        raise SystemExit("şablon veya ekran görüntüsü bulunamadı")
+    have_pyscreeze = bool(importlib.util.find_spec("pyscreeze") and importlib.util.find_spec("cv2"))
+
+    for label, screen, region, truth in shots:
+        print(f"[{label}] ekran {screen.shape[1]}x{screen.shape[0]}  pencere {region[2]}x{region[3]}")
+        l, t, w, h = region
+
+        def grab(r, screen=screen):
+            return screen[r[1]:r[1] + r[3], r[0]:r[0] + r[2]]
+
+        eng = TemplateEngine(paths, threshold=args.threshold)
+        for name, path in paths.items():
+            tr = truth.get(name)
+            old_ms, old_pos = _median_ms(lambda: old_locate(path, screen, args.threshold), max(1, args.repeat // 2))
+            cols = [f"eski={old_ms:7.1f} ms {_fmt(old_pos, tr)}"]
+            if have_pyscreeze:
+                from PIL import Image
+                pil = Image.fromarray(screen.astype(np.uint8))
+                ps_ms, ps_pos = _median_ms(lambda: pyscreeze_locate(path, pil, args.threshold), args.repeat)
+                cols.append(f"pyscreeze={ps_ms:7.1f} ms {_fmt(ps_pos, tr)}")
+            eng.forget(name)
+            cold_ms, hit = _median_ms(lambda: (eng.forget(name), eng.find(name, grab, region))[1], args.repeat)
+            warm_ms, warm = _median_ms(lambda: eng.find(name, grab, region), args.repeat)
+            pos = (hit.x, hit.y) if hit else None
+            cols.append(f"yeni={cold_ms:6.1f} ms {_fmt(pos, tr)}"
+                        + (f" ölçek={hit.scale:g} skor={hit.score:.3f}" if hit else ""))
+            cols.append(f"ROI={warm_ms:5.2f} ms" + (" (ROI isabeti)" if warm and warm.roi else ""))
+            speed = f"  → {old_ms / cold_ms:.0f}x / {old_ms / warm_ms:.0f}x" if cold_ms and warm_ms else ""
+            print(f"  {name:7s} " + "  ".join(cols) + speed)
+        print(f"  sayaçlar: {eng.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""ui_clicker buton dedektörü için doğruluk/gecikme benchmark'ı (etiketli ekran görüntüleri).
+
+ui_clicker'ın kullandığı TemplateEngine'i ve eşiği (template_match.DEFAULT_THRESHOLD)
+saf görüntü dosyaları üzerinde çalıştırır; ekran, pyautogui veya Windows gerekmez.
+
+Korpus dizini:
+    corpus/labels.json      {"<dosya>": {"window": [l, t, w, h],      # yoksa tüm görüntü
+                                         "accept": [cx, cy] | null,   # buton merkezi; yok/null → görünmüyor
+                                         "find": [cx, cy] | null}, ...}
+    corpus/templates/       accept_button.png, ara_button.png (yoksa --templates / assets/)
+
+Çözünürlük (pencere boyutu) ve şablon başına TP/FP/FN/TN, precision/recall ve kare
+başına tam pencere tarama süresi (p50/p95/max) raporlanır; ardından eşik taraması
+(precision/recall/F1) gelir. Bir tespit, etiketli merkeze --tol pikselden yakınsa doğrudur;
+butonsuz karede ya da yanlış yerde tespit FP sayılır (yanlış yer ayrıca FN'dir).
+
+    python bench_detector.py corpus/
+    python bench_detector.py corpus/ --thresholds 0.80,0.86,0.90 --sequential
+    python bench_detector.py --make-synthetic corpus/    # sentetik etiketli korpus üret
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from template_match import ASSETS, DEFAULT_THRESHOLD, TemplateEngine, load_gray
+
+Label = Optional[Tuple[int, int]]
+
+
+def load_corpus(root: str) -> List[Tuple[str, np.ndarray, Tuple[int, int, int, int], Dict[str, Label]]]:
+    with open(os.path.join(root, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+    out = []
+    for fname in sorted(labels):
+        meta = labels[fname] or {}
+        img = load_gray(os.path.join(root, fname))
+        win = tuple(meta.get("window") or (0, 0, img.shape[1], img.shape[0]))
+        truth = {name: (tuple(meta[name]) if meta.get(name) else None) for name in ASSETS}
+        out.append((fname, img, win, truth))
+    return out
+
+
+def template_paths(root: str, fallback: str) -> Dict[str, str]:
+    out = {}
+    for name, asset in ASSETS.items():
+        base = os.path.basename(asset)
+        for d in (os.path.join(root, "templates"), fallback):
+            p = os.path.join(d, base)
+            if os.path.exists(p):
+                out[name] = p
+                break
+    return out
+
+
+def _classify(hit, truth: Label, tol: int) -> str:
+    if hit is None:
+        return "fn" if truth else "tn"
+    if truth and abs(hit.x - truth[0]) <= tol and abs(hit.y - truth[1]) <= tol:
+        return "tp"
+    return "fp+fn" if truth else "fp"
+
+
+def _pr(c: Dict[str, int]) -> Tuple[float, float]:
+    tp, fp, fn = c["tp"], c["fp"], c["fn"]
+    return (tp / (tp + fp) if tp + fp else 1.0), (tp / (tp + fn) if tp + fn else 1.0)
+
+
+def _pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+
+
+def run(corpus, paths: Dict[str, str], threshold: float, tol: int, sequential: bool) -> None:
+    eng = TemplateEngine(paths, threshold=threshold)
+    groups: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    lat: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+    misses: List[str] = []
+    for fname, img, win, truth in corpus:
+        res = f"{win[2]}x{win[3]}"
+
+        def grab(r, img=img):
+            return img[r[1]:r[1] + r[3], r[0]:r[0] + r[2]]
+
+        for name in paths:
+            if not sequential:
+                eng.forget(name)   # her kare soğuk: tam pencere taraması
+            t0 = time.perf_counter()
+            hit = eng.find(name, grab, win)
+            lat[(res, name)].append((time.perf_counter() - t0) * 1000.0)
+            kind = _classify(hit, truth.get(name), tol)
+            for k in kind.split("+"):
+                groups[(res, name)][k] += 1
+            if kind != "tp" and kind != "tn":
+                got = f"({hit.x},{hit.y}) skor={hit.score:.3f}" if hit else "yok"
+                misses.append(f"  {kind.upper():6s} {name:7s} {fname}  beklenen={truth.get(name)} bulunan={got}")
+
+    print(f"[DETECT] eşik={threshold} tol={tol}px {'ardışık (ROI)' if sequential else 'soğuk tarama'}")
+    print(f"  {'çözünürlük':11s} {'şablon':7s} {'kare':>5s} {'TP':>4s} {'FP':>4s} {'FN':>4s} {'TN':>4s} "
+          f"{'precision':>9s} {'recall':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+    total: Dict[str, int] = defaultdict(int)
+    for key in sorted(groups, key=lambda k: (int(k[0].split("x")[0]), k[1])):
+        c, ms = groups[key], lat[key]
+        for k, v in c.items():
+            total[k] += v
+        p, r = _pr(c)
+        print(f"  {key[0]:11s} {key[1]:7s} {len(ms):5d} {c['tp']:4d} {c['fp']:4d} {c['fn']:4d} {c['tn']:4d} "
+              f"{p:9.3f} {r:7.3f} {statistics.median(ms):8.1f} {_pct(ms, 0.95):8.1f} {max(ms):8.1f}")
+    p, r = _pr(total)
+    all_ms = [x for v in lat.values() for x in v]
+    print(f"  {'TOPLAM':19s} {len(all_ms):5d} {total['tp']:4d} {total['fp']:4d} {total['fn']:4d} {total['tn']:4d} "
+          f"{p:9.3f} {r:7.3f} {statistics.median(all_ms):8.1f} {_pct(all_ms, 0.95):8.1f} {max(all_ms):8.1f}")
+    for line in misses[:20]:
+        print(line)
+    if len(misses) > 20:
+        print(f"  ... +{len(misses) - 20} hata")
+
+
+def sweep(corpus, paths: Dict[str, str], thresholds: List[float], tol: int) -> None:
+    eng = TemplateEngine(paths)
+    print("[SWEEP] eşik  precision  recall     F1")
+    for thr in thresholds:
+        c: Dict[str, int] = defaultdict(int)
+        for _fname, img, win, truth in corpus:
+            frame = img[win[1]:win[1] + win[3], win[0]:win[0] + win[2]]
+            for name in paths:
+                hit = eng.locate(name, frame, origin=win[:2], width=win[2], threshold=thr)
+                for k in _classify(hit, truth.get(name), tol).split("+"):
+                    c[k] += 1
+        p, r = _pr(c)
+        f1 = 2 * p * r / (p + r) if p + r else 0.0
+        mark = "  ← ui_clicker" if abs(thr - DEFAULT_THRESHOLD) < 1e-9 else ""
+        print(f"        {thr:.2f}  {p:9.3f} {r:7.3f} {f1:6.3f}{mark}")
+
+
+# ---------- sentetik korpus ----------
+def _button(rnd: np.random.Generator, w: int, h: int, glyphs: int = 9) -> np.ndarray:
+    b = np.full((h, w), 45.0, dtype=np.float32)
+    b[2:-2, 2:-2] = 95.0
+    for _ in range(glyphs):
+        x0, y0 = int(rnd.integers(12, w - 24)), int(rnd.integers(10, h - 16))
+        b[y0:y0 + int(rnd.integers(4, 8)), x0:x0 + int(rnd.integers(3, 14))] = 225.0
+    return b
+
+
+def _background(rnd: np.random.Generator, w: int, h: int) -> np.ndarray:
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = 60 + 30 * np.sin(xx / rnd.uniform(50, 120)) * np.cos(yy / rnd.uniform(40, 90))
+    img += rnd.normal(0, 5, (h, w)).astype(np.float32)
+    for _ in range(40):
+        x0, y0 = int(rnd.integers(0, max(1, w - 150))), int(rnd.integers(0, max(1, h - 80)))
+        img[y0:y0 + int(rnd.integers(10, 80)), x0:x0 + int(rnd.integers(20, 150))] = float(rnd.integers(0, 255))
+    return img
+
+
+def make_synthetic(root: str, per_class: int = 4, seed: int = 11) -> None:
+    """Çözünürlük başına: butonlu (accept / find), butonsuz ve benzer-ama-farklı buton içeren kareler.
+
+    Kareler parlaklık/kontrast değişimi ve gürültüyle bozulur; butonlar pencere ölçeğine göre boyutlanır.
+    """
+    from PIL import Image
+    rnd = np.random.default_rng(seed)
+    os.makedirs(os.path.join(root, "templates"), exist_ok=True)
+    tpls = {"accept": _button(rnd, 180, 44), "find": _button(rnd, 150, 40)}
+    for name, arr in tpls.items():
+        Image.fromarray(arr.astype(np.uint8)).save(os.path.join(root, "templates", os.path.basename(ASSETS[name])))
+    labels = {}
+    for win_w, win_h in ((1024, 576), (1280, 720), (1600, 900), (1920, 1080)):
+        scale = win_w / 1280
+        for kind in ("accept", "find", "none", "distractor"):
+            for i in range(per_class):
+                img = _background(rnd, win_w, win_h)
+                meta: dict = {"window": [0, 0, win_w, win_h]}
+                if kind in ("accept", "find"):
+                    t = tpls[kind]
+                elif kind == "distractor":
+                    t = tpls["accept"].copy()   # aynı çerçeve, yazının yarısı farklı
+                    t[:, 90:] = _button(rnd, 180, 44)[:, 90:]
+                else:
+                    t = None
+                if t is not None:
+                    st = np.asarray(Image.fromarray(t).resize((round(t.shape[1] * scale), round(t.shape[0] * scale)),
+                                                              Image.BILINEAR), dtype=np.float32)
+                    x = int(rnd.integers(0, win_w - st.shape[1]))
+                    y = int(rnd.integers(win_h // 2, win_h - st.shape[0]))
+                    img[y:y + st.shape[0], x:x + st.shape[1]] = st
+                    if kind != "distractor":
+                        meta[kind] = [x + st.shape[1] // 2, y + st.shape[0] // 2]
+                gain, bias = rnd.uniform(0.8, 1.2), rnd.uniform(-20, 20)
+                img = img * gain + bias + rnd.normal(0, rnd.uniform(1, 8), img.shape)
+                fname = f"{win_w}x{win_h}-{kind}-{i}.png"
+                Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).save(os.path.join(root, fname))
+                labels[fname] = meta
+    with open(os.path.join(root, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=1)
+    print(f"[DETECT] {len(labels)} kare → {root}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ui_clicker dedektörü: precision/recall + kare başına gecikme")
+    ap.add_argument("corpus", nargs="?", default="")
+    ap.add_argument("--templates", default=os.path.dirname(ASSETS["accept"]) or ".",
+                    help="korpusta templates/ yoksa şablon dizini")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    ap.add_argument("--thresholds", default="0.70,0.75,0.80,0.86,0.90,0.95", help="eşik taraması ('' → kapalı)")
+    ap.add_argument("--tol", type=int, default=6, help="doğru sayılma için merkez hatası (px)")
+    ap.add_argument("--sequential", action="store_true", help="kareler arası son isabet ROI'sini koru (canlı akış)")
+    ap.add_argument("--make-synthetic", default="", metavar="DIR", help="sentetik etiketli korpus üret ve çık")
+    args = ap.parse_args()
+
+    if args.make_synthetic:
+        make_synthetic(args.make_synthetic)
+        return
+    if not args.corpus:
+        ap.error("korpus dizini gerekli (veya --make-synthetic DIR)")
+    corpus = load_corpus(args.corpus)
+    paths = template_paths(args.corpus, args.templates)
+    if not paths:
+        raise SystemExit("şablon bulunamadı (templates/ veya --templates)")
+    run(corpus, paths, args.threshold, args.tol, args.sequential)
+    if args.thresholds:
+        sweep(corpus, paths, [float(t) for t in args.thresholds.split(",") if t.strip()], args.tol)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Mesaj çekme benchmark'ı: tam indirme+çözme vs gövde hash'i vs ETag (FakeLcu).
+
+Uzun geçmişli meşgul bir grup sohbeti her tick'te (watch_group_messages 0.8 sn)
+yoklanır; her --every tick'te bir yeni mesaj gelir. Tick başına aktarılan bayt ve
+JSON çözme (+ gövde hash'i) CPU'su raporlanır.
+
+Kullanım:
+    python bench_fetch.py --history 2000 --ticks 300 --every 5
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+
+from fake_lcu import FakeLcu
+from msg_fetch import MessageFetcher
+
+CONV = "busy@sec.pvp.net"
+
+
+def _setup(history: int, etags: bool) -> FakeLcu:
+    fl = FakeLcu("Bench", etags=etags)
+    fl.add_friend("Ali")
+    fl.add_group(CONV, ["Ali"])
+    for i in range(history):
+        fl.inject_message(CONV, f"mesaj {i} hadi oyun kuyruk tamam mid top bot", sender="Ali")
+    return fl
+
+
+def run_full(history: int, ticks: int, every: int) -> dict:
+    """Eski yol: her tick'te tüm liste indirilir ve r.json() ile çözülür."""
+    fl = _setup(history, etags=False)
+    s, base = fl.get()
+    nbytes, cpu = 0, 0.0
+    for t in range(ticks):
+        if t % every == 0:
+            fl.inject_message(CONV, f"yeni {t}", sender="Ali")
+        r = s.get(f"{base}/lol-chat/v1/conversations/{CONV}/messages", timeout=3)
+        nbytes += len(r.content)
+        t0 = time.thread_time()
+        json.loads(r.content)
+        cpu += time.thread_time() - t0
+    return {"bytes": nbytes, "decode_cpu": cpu, "decoded": ticks, "skipped": 0}
+
+
+def run_fetcher(history: int, ticks: int, every: int, etags: bool) -> dict:
+    fl = _setup(history, etags=etags)
+    f = MessageFetcher(fl)
+    for t in range(ticks):
+        if t % every == 0:
+            fl.inject_message(CONV, f"yeni {t}", sender="Ali")
+        f.fetch(CONV)
+    st = f.stats()
+    cpu = (st["decode_cpu_ms"] + st["hash_cpu_ms"]) / 1000.0
+    return {"bytes": st["bytes"], "decode_cpu": cpu, "decoded": st["decoded"],
+            "skipped": st["not_modified"] + st["unchanged"]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="mesaj çekme (tam / hash / ETag) benchmark'ı")
+    ap.add_argument("--history", type=int, default=2000, help="konuşmadaki mesaj sayısı")
+    ap.add_argument("--ticks", type=int, default=300)
+    ap.add_argument("--every", type=int, default=5, help="kaç tick'te bir yeni mesaj gelir")
+    args = ap.parse_args()
+
+    rows = [("FULL", run_full(args.history, args.ticks, args.every)),
+            ("HASH", run_fetcher(args.history, args.ticks, args.every, etags=False)),
+            ("ETAG", run_fetcher(args.history, args.ticks, args.every, etags=True))]
+    base = rows[0][1]
+    print(f"[FETCH] history={args.history} ticks={args.ticks} yeni mesaj her {args.every} tick")
+    for name, r in rows:
+        print(f"[{name}] bayt/tick={r['bytes'] / args.ticks / 1024:,.1f} KiB  "
+              f"çözme+hash CPU/tick={r['decode_cpu'] * 1000.0 / args.ticks:.3f} ms  "
+              f"çözülen={r['decoded']} atlanan={r['skipped']}  "
+              f"(bayt {r['bytes'] / max(1, base['bytes']):.2f}x, CPU {r['decode_cpu'] / max(1e-9, base['decode_cpu']):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""JSON codec benchmark'ı: uç nokta başına çözme süresi (stdlib / orjson / msgspec).
+
+Varsayılan korpus FakeLcu'dan üretilir (500 arkadaş, 2000 mesajlık grup sohbeti,
+10 oyunculu champ-select session, 170 şampiyonluk özet, lobi). --corpus ile bir
+dizindeki `*.json` dosyaları (dosya adı = uç nokta etiketi) kullanılır.
+Model sütunu, çözme + models.py nesnelerine çevirme süresidir.
+
+Kullanım:
+    python bench_json.py --repeat 200
+    python bench_json.py --corpus payloads/ --repeat 500
+"""
+from __future__ import annotations
+import argparse
+import glob
+import importlib.util
+import os
+import random
+import statistics
+import time
+
+import json_codec
+from fake_lcu import FakeLcu
+from models import ChampSelectSession, Friend, Identity, Message
+
+ME = Identity("1001", "me-puuid")
+
+# uç nokta etiketi → çözülmüş veriyi modele çeviren fonksiyon
+MODEL_OF = {
+    "friends": lambda d: [Friend.from_raw(f) for f in d],
+    "messages": lambda d: [Message.from_raw(m, ME) for m in d],
+    "champ-select": ChampSelectSession.from_raw,
+}
+
+
+def synthetic_corpus(rnd: random.Random) -> dict:
+    champs = [(i, f"Champion{i}") for i in range(1, 171)]
+    fl = FakeLcu("Bench", champions=champs)
+    for i in range(500):
+        fl.add_friend(f"Friend{i}", availability=rnd.choice(["chat", "away", "dnd", "offline"]))
+    fl.add_group("busy@sec.pvp.net", [f"Friend{i}" for i in range(5)])
+    for i in range(2000):
+        fl.inject_message("busy@sec.pvp.net", f"mesaj {i} hadi oyun kuyruk tamam", sender=f"Friend{i % 5}")
+    fl.create_lobby([f"Friend{i}" for i in range(4)])
+    fl.start_champ_select(bench=[1, 2, 3, 4, 5], my_champion=86, ban_phase=True, position="middle",
+                          ally_locked=[10, 11], ally_intent=[12, 13], enemy_locked=[20, 21, 22, 23, 24],
+                          banned=[30, 31, 32])
+    paths = {
+        "friends": "/lol-chat/v1/friends",
+        "messages": "/lol-chat/v1/conversations/busy@sec.pvp.net/messages",
+        "champ-select": "/lol-champ-select/v1/session",
+        "champion-summary": "/lol-game-data/assets/v1/champion-summary.json",
+        "lobby": "/lol-lobby/v2/lobby",
+        "conversations": "/lol-chat/v1/conversations",
+    }
+    return {name: fl.handle("GET", path).content for name, path in paths.items()}
+
+
+def load_corpus(path: str) -> dict:
+    out = {}
+    for p in sorted(glob.glob(os.path.join(path, "*.json"))):
+        with open(p, "rb") as f:
+            out[os.path.splitext(os.path.basename(p))[0]] = f.read()
+    return out
+
+
+def _time_us(fn, body: bytes, repeat: int) -> float:
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(body)
+        ts.append(time.perf_counter() - t0)
+    return statistics.median(ts) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="JSON codec benchmark (uç nokta başına)")
+    ap.add_argument("--corpus", default="", help="*.json yanıtlarının olduğu dizin (varsayılan: sentetik)")
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(random.Random(42))
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        if name == "json" or importlib.util.find_spec(name):
+            backends.append(name)
+    print(f"[JSON] arka uçlar: {', '.join(backends)}  (varsayılan seçim: "
+          f"{json_codec.use(os.environ.get('JSON_CODEC', ''))})")
+
+    for ep, body in corpus.items():
+        cols = []
+        base = None
+        for name in backends:
+            json_codec.use(name)
+            us = _time_us(json_codec.loads, body, args.repeat)
+            base = base or us
+            col = f"{name}={us:,.1f} µs ({base / us:.1f}x)"
+            conv = MODEL_OF.get(ep)
+            if conv:
+                mus = _time_us(lambda b: conv(json_codec.loads(b)), body, args.repeat)
+                col += f" +model={mus:,.1f} µs"
+            cols.append(col)
+        print(f"[{ep}] {len(body) / 1024:,.1f} KiB  " + "  ".join(cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Model katmanı benchmark'ı: ham dict'ler vs __slots__'lu modeller (models.py).
+
+500 arkadaşlık liste ve 10k mesaj (200 konuşma × 50) sentetik LCU JSON'u üzerinde:
+  - CPU: bir DM poll turunun mesaj başına işi (store kaydı + watcher: ts, is_me,
+    gövde, gönderen, arkadaş adı). Ham yolda alanlar her kullanımda yeniden çözülür
+    ve arkadaş adı mesaj başına listeden aranır; model yolunda her mesaj bir kez
+    çözülür, arkadaş adı konuşma başına bir kez indeksten alınır.
+  - Bellek: JSON'dan çözülüp tutulan nesnelerin tracemalloc ile ölçülen boyutu.
+
+Kullanım:
+    python bench_models.py --friends 500 --messages 10000 --rounds 20
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from models import Friend, Identity, Message, index_friends
+from utils import parse_ts_iso
+
+WORDS = "baslat durdur ban pick lock gg wp mid top bot selam naber hadi oyun kuyruk tamam".split()
+ME = {"summonerId": "1001", "puuid": "me-puuid"}
+
+
+def _pct(values: list[float], p: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def make_payloads(rnd: random.Random, n_friends: int, n_msgs: int, per_conv: int = 50):
+    friends = []
+    for i in range(n_friends):
+        puuid = f"{i:08x}-puuid-{rnd.getrandbits(64):016x}"
+        friends.append({"name": f"Friend{i}", "gameName": f"Friend{i}", "gameTag": "TR1",
+                        "puuid": puuid, "pid": f"{puuid}@pvp.net", "summonerId": 5000 + i,
+                        "availability": rnd.choice(["chat", "away", "dnd", "offline", "mobile"]),
+                        "statusMessage": "", "icon": rnd.randint(1, 5000)})
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    convs = {}
+    for i in range(n_msgs):
+        f = friends[(i // per_conv) % n_friends]
+        mine = rnd.random() < 0.3
+        ts = (t0 + timedelta(seconds=i, milliseconds=rnd.randint(0, 999))).isoformat(timespec="milliseconds")
+        convs.setdefault(f["pid"], []).append({
+            "id": f"{i}:{rnd.getrandbits(32):08x}", "type": "chat",
+            "body": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 8))) + ("\n" if i % 7 == 0 else ""),
+            "fromPid": "me-puuid@pvp.net" if mine else f["pid"],
+            "fromSummonerId": 1001 if mine else f["summonerId"],
+            "fromSummonerName": "" if mine else f["name"],
+            "isSelf": mine, "timestamp": ts.replace("+00:00", "Z"),
+        })
+    return json.dumps(friends), {cid: json.dumps(ms) for cid, ms in convs.items()}
+
+
+# ---- ham yol (model katmanı öncesi ChatService yardımcıları) ----
+def _raw_is_me(m: dict) -> bool:
+    if m.get('isSelf') is True:
+        return True
+    if str(m.get('fromSummonerId') or '') == str(ME.get('summonerId') or ''):
+        return True
+    pid = (m.get('fromPid') or '').split('@', 1)[0]
+    return bool(pid and pid == (ME.get('puuid') or ''))
+
+
+def _raw_body(m: dict) -> str:
+    return (m.get('body') or '').replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
+
+
+def _raw_sender(m: dict) -> str:
+    pid = (m.get('fromPid') or '').split('@', 1)[0]
+    return m.get('fromSummonerName') or m.get('fromName') or pid or str(m.get('fromSummonerId') or '?')
+
+
+def _raw_friend_name(friends: list, key: str) -> str:
+    for f in friends:
+        if key == (f.get('pid') or '').split('@', 1)[0] or key == (f.get('puuid') or ''):
+            return f.get('name') or f.get('gameName') or f.get('displayName') or key
+    return key
+
+
+def raw_poll(friends_json: str, convs_json: dict) -> int:
+    friends = json.loads(friends_json)
+    n = 0
+    for cid, text in convs_json.items():
+        msgs = json.loads(text)
+        for m in msgs:   # _record
+            n += len((parse_ts_iso(m.get('timestamp')), _raw_sender(m), _raw_is_me(m), _raw_body(m)))
+        for m in msgs:   # watcher döngüsü
+            parse_ts_iso(m.get('timestamp'))
+            key = cid.split('@', 1)[0]
+            n += len((_raw_is_me(m), _raw_body(m), _raw_friend_name(friends, key)))
+    return n
+
+
+def model_poll(friends_json: str, convs_json: dict) -> int:
+    idx = index_friends([Friend.from_raw(f) for f in json.loads(friends_json)])
+    me = Identity.from_me(ME)
+    n = 0
+    for cid, text in convs_json.items():
+        msgs = [Message.from_raw(m, me) for m in json.loads(text)]
+        for m in msgs:
+            n += len((m.ts, m.sender, m.is_me, m.body))
+        f = idx.get(cid.split('@', 1)[0])
+        name = f.name if f else cid
+        for m in msgs:
+            n += len((m.is_me, m.body, name))
+    return n
+
+
+def _retained(build) -> tuple[int, int]:
+    """build() sonucunun tuttuğu bellek (bayt) ve kurulum sırasındaki tepe."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return cur - base, peak - base
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ham dict vs __slots__ model benchmark'ı")
+    ap.add_argument("--friends", type=int, default=500)
+    ap.add_argument("--messages", type=int, default=10_000)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    friends_json, convs_json = make_payloads(rnd, args.friends, args.messages)
+    assert raw_poll(friends_json, convs_json) == model_poll(friends_json, convs_json)
+
+    me = Identity.from_me(ME)
+    all_msgs = [m for t in convs_json.values() for m in json.loads(t)]
+    msgs_json = json.dumps(all_msgs)
+    del all_msgs
+
+    def models_only():
+        # tutulan yalnızca modeller; ham listeler kurulumdan sonra bırakılır
+        return [Message.from_raw(m, me) for m in json.loads(msgs_json)]
+
+    for label, raw_fn, model_fn in (
+        (f"{args.friends} arkadaş", lambda: json.loads(friends_json),
+         lambda: [Friend.from_raw(f) for f in json.loads(friends_json)]),
+        (f"{args.messages} mesaj", lambda: json.loads(msgs_json), models_only),
+    ):
+        raw_cur, raw_peak = _retained(raw_fn)
+        mod_cur, mod_peak = _retained(model_fn)
+        print(f"[MEM] {label}: dict={raw_cur / 1024:,.0f} KiB (tepe {raw_peak / 1024:,.0f})  "
+              f"model={mod_cur / 1024:,.0f} KiB (tepe {mod_peak / 1024:,.0f})  "
+              f"oran={mod_cur / max(1, raw_cur):.2f}x")
+    print("[MEM] not: Friend ham sözlüğü `raw` alanında tuttuğu için arkadaş listesinde model ek maliyettir; "
+          "Message ham sözlüğü tutmaz.")
+
+    for name, fn in (("RAW", raw_poll), ("MODEL", model_poll)):
+        ms = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            fn(friends_json, convs_json)
+            ms.append((time.perf_counter() - t0) * 1000.0)
+        print(f"[CPU-{name}] poll turu ({args.messages} mesaj): mean={statistics.mean(ms):.1f} ms "
+              f"p50={_pct(ms, 50):.1f} ms p95={_pct(ms, 95):.1f} ms  "
+              f"mesaj başına={statistics.mean(ms) * 1000.0 / args.messages:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""TelegramBridge benchmark'ı (yerel sahte Bot API'ye karşı, ağ gerekmez).
+
+Ölçülenler:
+  - LoL → Telegram DM iletim hızı (on_dm_from_lol → sendMessage, mesaj/sn)
+  - BASLAT onay tur süresi (request_start_confirmation → buton → callback, ms)
+
+Kullanım:
+    python bench_telegram.py --dms 500 --approvals 50
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import threading
+import time
+
+from telegram_bridge import TelegramBridge
+from telegram_fake_api import FakeBotApi
+from telegram_self_test import DummyChatService, FAKE_TOKEN, FAKE_OWNER_ID
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _wait_polling(api: FakeBotApi, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if api.calls.get("getUpdates"):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def bench_dm_throughput(api: FakeBotApi, tb: TelegramBridge, n: int) -> None:
+    base = len(api.sent_messages)
+    t0 = time.perf_counter()
+    for i in range(n):
+        tb.on_dm_from_lol("friend-key", "Friend", f"mesaj {i}", bool(i & 1))
+    ok = api.wait_for_count(base + n, timeout=max(10.0, n * 0.05))
+    dt = time.perf_counter() - t0
+    got = len(api.sent_messages) - base
+    print(f"[DM] {got}/{n} mesaj {dt*1000:.1f} ms → {got/dt:.0f} msg/s" + ("" if ok else " (TIMEOUT)"))
+
+
+def bench_approval_rtt(api: FakeBotApi, tb: TelegramBridge, n: int) -> None:
+    rtts: list[float] = []
+    for i in range(n):
+        req_id = f"bench-{i}"
+        done = threading.Event()
+        start = len(api.sent_messages)
+        t0 = time.perf_counter()
+        if not tb.request_start_confirmation(req_id, "Bench", "busy", lambda _ok: done.set()):
+            print(f"[APPROVE] {req_id} gönderilemedi")
+            continue
+        prompt = api.wait_for_message(lambda m: bool(m.get("reply_markup")), timeout=5.0, start=start)
+        if not prompt:
+            print(f"[APPROVE] {req_id} onay mesajı gelmedi")
+            continue
+        api.press_button(FAKE_OWNER_ID, prompt, f"start:{req_id}:ok")
+        if done.wait(5.0):
+            rtts.append((time.perf_counter() - t0) * 1000.0)
+    if rtts:
+        print(
+            f"[APPROVE] n={len(rtts)} mean={statistics.mean(rtts):.1f} ms "
+            f"p50={_pct(rtts, 50):.1f} ms p95={_pct(rtts, 95):.1f} ms max={max(rtts):.1f} ms"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TelegramBridge throughput / latency benchmark")
+    ap.add_argument("--dms", type=int, default=500)
+    ap.add_argument("--approvals", type=int, default=50)
+    args = ap.parse_args()
+
+    api = FakeBotApi().start()
+    tb = TelegramBridge(DummyChatService(), owner_id=FAKE_OWNER_ID, bot_token=FAKE_TOKEN,
+                        base_url=api.base_url, topics_db="bench_topics.json")
+    tb.start_in_thread()
+    if not (tb.wait_until_ready(10.0) and _wait_polling(api)):
+        raise SystemExit("Bridge sahte API'ye bağlanamadı.")
+
+    bench_dm_throughput(api, tb, args.dms)
+    bench_approval_rtt(api, tb, args.approvals)
+    print(f"[API] çağrı sayıları: {dict(sorted(api.calls.items()))}")
+    api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Zaman damgası çözme micro-benchmark'ları.
+
+  PARSE   : eski parse_ts_iso (Z → +00:00 yeniden yazma + aware fromisoformat) vs
+            LCU sabit biçimi için dakika önbellekli dilim çözücü (utils.parse_ts_iso)
+  MEMO    : TsMemo isabeti (msg id ile)
+  POLL    : conv başına 30 mesaj, her turda 1 yeni mesaj; eski yol her turda tüm
+            mesajları iki kez çözer (store + watcher), yeni yol ts'leri memo'dan alıp
+            sıralar, en yeniden geriye akıp imleçte durur
+
+Kullanım:
+    python bench_ts.py --n 200000 --convs 50 --polls 200
+"""
+from __future__ import annotations
+import argparse
+import time
+from operator import itemgetter
+from datetime import datetime, timedelta, timezone
+
+from utils import TsMemo, parse_ts_iso
+
+
+def old_parse_ts_iso(ts: str | None) -> float:
+    if not ts:
+        return 0.0
+    try:
+        if ts.endswith("Z"):
+            ts = ts[:-1] + "+00:00"
+        return datetime.fromisoformat(ts).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _per_call_ns(fn, args_list, n: int, repeat: int = 5) -> float:
+    """repeat turun en iyisi (gürültülü makinede tek tur yanıltıcı)."""
+    k = len(args_list)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(*args_list[i % k])
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e9 / n
+
+
+def _stamps(k: int) -> list[str]:
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [(t0 + timedelta(milliseconds=137 * i)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+            for i in range(k)]
+
+
+def bench_parse(n: int) -> None:
+    stamps = _stamps(1000)
+    assert all(abs(old_parse_ts_iso(s) - parse_ts_iso(s)) < 1e-6 for s in stamps)
+    args = [(s,) for s in stamps]
+    old = _per_call_ns(old_parse_ts_iso, args, n)
+    new = _per_call_ns(parse_ts_iso, args, n)
+    memo = TsMemo()
+    margs = [(str(i), s) for i, s in enumerate(stamps)]
+    for a in margs:
+        memo.parse(*a)
+    hit = _per_call_ns(memo.parse, margs, n)
+    print(f"[PARSE] eski={old:.0f} ns  dilim+dakika önbelleği={new:.0f} ns ({old / new:.2f}x)  memo isabeti={hit:.0f} ns "
+          f"({old / hit:.1f}x)")
+
+
+def _poll_data(convs: int, polls: int, per_conv: int):
+    """conv başına per_conv mesaj + her tick'te conv başına 1 yeni mesaj (en eski düşer)."""
+    stamps = iter(_stamps(convs * (per_conv + polls)))
+    seq = iter(range(10 ** 9))
+    data = {c: [{"id": str(next(seq)), "timestamp": next(stamps)} for _ in range(per_conv)] for c in range(convs)}
+
+    def tick():
+        for c in range(convs):
+            lst = data[c]
+            lst.append({"id": str(next(seq)), "timestamp": next(stamps)})
+            del lst[0]
+    return data, tick
+
+
+def bench_poll(convs: int, polls: int, per_conv: int = 30) -> None:
+    data, tick = _poll_data(convs, polls, per_conv)
+
+    # eski: her tur tüm mesajlar; _record + watcher döngüsünde ikişer kez
+    last = {c: 0.0 for c in range(convs)}
+    parsed = 0
+    t0 = time.perf_counter()
+    for _ in range(polls):
+        tick()
+        for c in range(convs):
+            msgs = data[c]
+            for m in msgs:
+                old_parse_ts_iso(m.get("timestamp")); parsed += 1
+            for m in msgs:
+                ts = old_parse_ts_iso(m.get("timestamp")); parsed += 1
+                if ts > last[c]:
+                    last[c] = ts
+    t_old = time.perf_counter() - t0
+    old_parsed = parsed
+
+    # yeni (ChatService.fetch_messages gibi): ts TsMemo'dan, ts'ye göre sırala, en yeniden geriye akıp imleçte dur
+    data, tick = _poll_data(convs, polls, per_conv)
+    memo = TsMemo()
+    last = {c: 0.0 for c in range(convs)}
+    t0 = time.perf_counter()
+    for _ in range(polls):
+        tick()
+        for c in range(convs):
+            since = last[c]
+            new = []
+            timed = [(memo.parse(m.get("id"), m.get("timestamp")), m) for m in data[c]]
+            timed.sort(key=itemgetter(0))
+            for ts, _m in reversed(timed):
+                if ts <= since:
+                    break
+                new.append(ts)
+            if new:
+                last[c] = new[0]
+    t_new = time.perf_counter() - t0
+    total = polls * convs
+    print(f"[POLL] {convs} conv × {per_conv} mesaj, {polls} tur: eski={t_old * 1e6 / total:.1f} µs/conv "
+          f"({old_parsed} çözme)  akış+memo={t_new * 1e6 / total:.1f} µs/conv "
+          f"({memo.misses} çözme, {memo.hits} memo isabeti)  → {t_old / t_new:.1f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="parse_ts_iso / TsMemo micro-benchmark'ları")
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--convs", type=int, default=50)
+    ap.add_argument("--polls", type=int, default=200)
+    args = ap.parse_args()
+    bench_parse(args.n)
+    bench_poll(args.convs, args.polls)
+
+
+if __name__ == "__main__":
+    main()
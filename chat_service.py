@@ -1,19 +1,42 @@
 from __future__ import annotations
 import threading
+from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Optional, Dict, List, Callable
 from urllib.parse import quote
-from utils import log_once, parse_ts_iso, status_tag
+from utils import TsMemo, log_once, status_tag
+from msg_fetch import MessageFetcher
+from profiler import loop_tick
+from json_codec import decode_response, loads_models
+from models import (ChampSelectSession, Conversation, Friend, Identity, LobbyMember, Message,
+                    index_friends, pid_key)
+
+OFFLINE_PARK = 1.0   # sn — istemci kapalıyken watcher'ın bir bekleme turu (durdurma bayrağı bu aralıkla bakılır)
 
 class ChatService:
     """LCU Chat üst hizmet katmanı: DM / grup / arkadaş / presence / lobby / matchmaking."""
 
-    def __init__(self, lcu_session):
+    def __init__(self, lcu_session, store=None, cursors=None):
         self.lcu = lcu_session
         self.ME: Dict = {}
         self._last_dm_ts: Dict[str, float] = {}
+        # Kalıcı geçmiş (chat_store.ChatStore) — None ise yalnızca LCU'dan okunur
+        self.store = store
+        self._stored_ts: Dict[str, float] = {}  # conv_id -> store'a yazılan en yeni ts
+        self._ts_memo = TsMemo()  # msg id -> epoch; görülmüş mesajlar yeniden çözülmez
+        # ETag / gövde hash'i ile değişmeyen mesaj listelerini yeniden indirmez/çözmez
+        self.msg_fetch = MessageFetcher(lcu_session)
+        # Kalıcı watcher imleçleri (cursor_store.CursorStore) — restart'ta tekrar oynatmayı önler
+        self.cursors = cursors
         self.active_group_id: Optional[str] = None  # aktif takip edilen grup (lobby chat vs.)
         # Serializes LCU-mutating commands (matchmaking, kick, promote) across threads.
         self._lcu_cmd_lock = threading.Lock()
+        self._identity = Identity()
+        self._identity_src: Optional[Dict] = None
+        # Bot yanıtları için giden kuyruk (send_queue.SendQueue); None → reply() doğrudan gönderir
+        self.outbox = None
+        # presence.PresenceTracker; taze önbelleği varsa arkadaş listesi / kendi durumum GET'siz okunur
+        self.presence = None
 
     # ---- raw helpers ----
     def _get(self, path: str, timeout: int = 3):
@@ -34,11 +57,27 @@ class ChatService:
             return None
         return s.patch(f"{base}{path}", json=json, timeout=timeout)
 
+    def _post_critical(self, path: str, json=None, timeout: float = 1.5):
+        """Zamana duyarlı POST: LcuSession.critical() (lockfile okumadan, ayrı havuz) varsa onu kullanır."""
+        crit = getattr(self.lcu, "critical", None)
+        s, base = crit() if crit else self.lcu.get()
+        if not s:
+            return None
+        return s.post(f"{base}{path}", json=json, timeout=timeout)
+
+    def wait_online(self, timeout: Optional[float] = OFFLINE_PARK) -> bool:
+        """İstemci kapalıyken (LcuSession çevrimdışı) en fazla timeout sn bekler; çevrimiçiyse hemen True.
+
+        FakeLcu / ReplayLcu gibi wait_online'ı olmayan oturumlarda her zaman True.
+        """
+        wait = getattr(self.lcu, "wait_online", None)
+        return wait(timeout) if wait else True
+
     # ---- identity ----
     def refresh_me(self):
         r = self._get("/lol-summoner/v1/current-summoner")
         if r and r.status_code == 200:
-            j = r.json() or {}
+            j = decode_response(r) or {}
             self.ME = {
                 "displayName": j.get("displayName") or j.get("gameName") or "",
                 "summonerId": str(j.get("summonerId") or ""),
@@ -47,38 +86,63 @@ class ChatService:
             return
         r = self._get("/lol-chat/v1/me")
         if r and r.status_code == 200:
-            j = r.json() or {}
+            j = decode_response(r) or {}
             self.ME = {
                 "displayName": j.get("name") or j.get("gameName") or "",
                 "summonerId": str(j.get("summonerId") or ""),
                 "puuid": j.get("puuid") or "",
             }
 
+    def identity(self) -> Identity:
+        """is-me karşılaştırması için ME'nin normalize hali (ME değişince yenilenir)."""
+        me = self.ME
+        if self._identity_src is not me:
+            self._identity, self._identity_src = Identity.from_me(me), me
+        return self._identity
+
     # ---- conversations ----
     def list_conversations(self) -> List[dict]:
         r = self._get("/lol-chat/v1/conversations")
         if not r or r.status_code != 200:
             return []
-        return r.json() or []
+        return decode_response(r) or []
+
+    def conversations(self) -> List[Conversation]:
+        return [Conversation.from_raw(c) for c in self.list_conversations()]
 
     def list_dms(self) -> List[dict]:
-        return [c for c in self.list_conversations() if (c.get('type') or '').lower() == "chat"]
+        return [c.raw for c in self.conversations() if c.is_dm]
 
     def list_groups(self) -> List[dict]:
-        return [c for c in self.list_conversations() if (c.get('type') or '').lower() == "groupchat"]
+        return [c.raw for c in self.conversations() if c.is_group]
 
     # ---- friends & presence ----
     def list_friends(self) -> List[dict]:
+        cached = self.presence.friends() if self.presence is not None else None
+        if cached is not None:
+            return [f.raw for f in cached]
         r = self._get("/lol-chat/v1/friends")
         if not r or r.status_code != 200:
             return []
-        return r.json() or []
+        return decode_response(r) or []
+
+    def friends(self) -> List[Friend]:
+        cached = self.presence.friends() if self.presence is not None else None
+        if cached is not None:
+            return cached
+        r = self._get("/lol-chat/v1/friends")
+        if not r or r.status_code != 200:
+            return []
+        return loads_models(r.content, Friend.from_raw)
 
     def my_presence(self) -> Dict:
         """Aktif hesabın sohbet / presence bilgilerini döner."""
+        cached = self.presence.me() if self.presence is not None else None
+        if cached is not None:
+            return dict(cached)
         r = self._get("/lol-chat/v1/me")
         if r and r.status_code == 200:
-            return r.json() or {}
+            return decode_response(r) or {}
         return {}
 
     def my_availability(self) -> str:
@@ -86,53 +150,79 @@ class ChatService:
         return (pres.get('availability') or pres.get('availabilityStatus') or '').lower()
 
     def list_friends_online(self) -> List[dict]:
-        out = []
-        for f in self.list_friends():
-            av = (f.get('availability') or f.get('availabilityStatus') or '').lower()
-            if av in ('chat', 'online', 'mobile'):
-                out.append(f)
-        return out
+        return [f.raw for f in self.friends() if f.is_online]
 
     def friend_display_label(self, f: dict) -> str:
-        dn = f.get('name') or f.get('gameName') or f.get('displayName') or 'Unknown'
-        return f"{status_tag(f.get('availability'))} {dn}"
+        return Friend.from_raw(f).label
 
     def friend_by_key(self, key: str) -> Optional[dict]:
         # key: pid (preferred) veya puuid
-        for f in self.list_friends():
-            pid = (f.get('pid') or '').split('@', 1)[0]
-            puuid = f.get('puuid') or ''
-            if key == pid or key == puuid:
+        f = self._friend_model(key)
+        return f.raw if f else None
+
+    def _friend_model(self, key: str) -> Optional[Friend]:
+        for f in self.friends():
+            if f.matches_key(key):
                 return f
         return None
 
     def friend_key_from_conv_id(self, conv_id: str) -> str:
-        return (conv_id or '').split('@', 1)[0]
+        return pid_key(conv_id)
 
     def friend_display_name(self, key: str) -> str:
-        f = self.friend_by_key(key)
-        return (f.get('name') or f.get('gameName') or f.get('displayName') or key) if f else key
+        f = self._friend_model(key)
+        return (f.name or key) if f else key
 
     # ---- messaging ----
     def messages(self, conv_id: str, limit: int = 50) -> List[dict]:
-        uid = quote(conv_id, safe='@._-')
-        r = self._get(f"/lol-chat/v1/conversations/{uid}/messages")
-        if not r or r.status_code != 200:
-            return []
-        data = r.json() or []
-        return data[-limit:]
+        data, _changed = self.msg_fetch.fetch(conv_id)
+        return data[-limit:] if data else []
+
+    def fetch_messages(self, conv_id: str, limit: int = 50, since: float = 0.0,
+                       after_id=None) -> List[Message]:
+        """messages() + Message modeli, kronolojik sırada.
+
+        LCU listenin sıralı geleceği varsayılmaz: mesajlar önce (TsMemo'dan gelen, görülmüşler
+        için ucuz) zaman damgasına göre kararlı sıralanır. Sonra en yeniden geriye doğru akıtılır;
+        imleçteki mesaja (after_id) ya da ts < since olan ilk mesaja gelince durulur, eskiler
+        için model kurulmaz.
+        """
+        me, memo = self.identity(), self._ts_memo
+        timed = [(memo.parse(m.get('id'), m.get('timestamp')), m) for m in self.messages(conv_id, limit=limit)]
+        timed.sort(key=itemgetter(0))
+        out: List[Message] = []
+        for ts, m in reversed(timed):
+            if after_id is not None and m.get('id') == after_id:
+                break
+            if ts < since:
+                break
+            out.append(Message.from_raw(m, me, ts))
+        out.reverse()
+        return out
+
+    def _stream_since(self, conv_id: str, cursor_ts: float) -> float:
+        """Akışın duracağı nokta: watcher imleci ile store watermark'ının eskisi."""
+        if self.store:
+            return min(cursor_ts, self._stored_ts.get(conv_id, 0.0))
+        return cursor_ts
 
     def send(self, conv_id: str, text: str) -> bool:
         uid = quote(conv_id, safe='@._-')
         r = self._post(f"/lol-chat/v1/conversations/{uid}/messages", json={"body": text})
         return bool(r and r.status_code in (200, 201, 204))
 
+    def reply(self, conv_id: str, text: str) -> bool:
+        """Bot yanıtı: outbox varsa hız sınırlı/birleştirilerek kuyruktan, yoksa hemen gönderilir."""
+        if self.outbox is None:
+            return self.send(conv_id, text)
+        return self.outbox.post(conv_id, text, lambda t: self.send(conv_id, t))
+
     def participants(self, conv_id: str) -> List[dict]:
         uid = quote(conv_id, safe='@._-')
         r = self._get(f"/lol-chat/v1/conversations/{uid}/participants")
         if not r or r.status_code != 200:
             return []
-        return r.json() or []
+        return decode_response(r) or []
 
     # ---- formatting helpers ----
     @staticmethod
@@ -142,24 +232,46 @@ class ChatService:
         return ts.replace('T', ' ').replace('Z', '')
 
     def _is_me(self, m: dict) -> bool:
-        if m.get('isSelf') is True:
-            return True
-        if str(m.get('fromSummonerId') or '') == str(self.ME.get('summonerId') or ''):
-            return True
-        pid = (m.get('fromPid') or '').split('@', 1)[0]
-        if pid and pid == (self.ME.get('puuid') or ''):
-            return True
-        return False
+        return Message.from_raw(m, self.identity()).is_me
 
     @staticmethod
-    def _sender_guess(m: dict) -> str:
-        pid = (m.get('fromPid') or '').split('@', 1)[0]
-        return (
-            m.get('fromSummonerName')
-            or m.get('fromName')
-            or pid
-            or str(m.get('fromSummonerId') or '?')
-        )
+    def _fmt_epoch(ts: float) -> str:
+        if not ts:
+            return ""
+        return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+    # ---- kalıcı geçmiş ----
+    def _record(self, conv_id: str, msgs: List[Message], group: bool = False) -> None:
+        """Görülen mesajları store'a yazar; conv başına watermark ile eskileri tekrar kuyruklamaz."""
+        if not self.store or not msgs:
+            return
+        wm = self._stored_ts.get(conv_id, 0.0)
+        top = wm
+        for m in msgs:
+            if m.ts < wm:
+                continue
+            self.store.add(conv_id, m.id, m.ts, m.group_sender if group else m.sender, m.is_me, m.body)
+            if m.ts > top:
+                top = m.ts
+        self._stored_ts[conv_id] = top
+
+    def history(self, conv_id: str, limit: int = 50) -> List[dict]:
+        """Son mesajlar: önce yerel store, yoksa LCU (ve store'a yazılır).
+
+        Döner: [{conv_id, msg_id, ts, sender, is_me, body}, ...] kronolojik sırada.
+        """
+        if self.store:
+            rows = self.store.recent(conv_id, limit)
+            if rows:
+                return rows
+        msgs = self.fetch_messages(conv_id, limit=limit)
+        self._record(conv_id, msgs)
+        return [m.to_row(conv_id) for m in msgs]
+
+    def search_history(self, text: str, limit: int = 20, conv_id: Optional[str] = None) -> List[dict]:
+        if not self.store:
+            return []
+        return self.store.search(text, limit=limit, conv_id=conv_id)
 
     # ---- DM watcher (polling) ----
     def watch_dms(
@@ -175,54 +287,77 @@ class ChatService:
         import time as _t
 
         while True:
-            recent_cutoff = (_t.time() - recent_seconds) if recent_seconds and recent_seconds > 0 else None
+            loop_tick()
+            if not self.wait_online():
+                continue
             try:
-                for c in self.list_dms():
-                    cid = c.get('id')
-                    if not cid:
-                        continue
-                    msgs = self.messages(cid, limit=30)
-                    last = self._last_dm_ts.get(cid, 0.0)
-                    if recent_cutoff and last < recent_cutoff:
-                        last = recent_cutoff
-                    for m in msgs:
-                        ts = parse_ts_iso(m.get('timestamp'))
-                        if recent_cutoff and ts < recent_cutoff:
-                            continue
-                        if ts <= last:
-                            continue
-                        is_me = self._is_me(m)
-                        body = (m.get('body') or '').replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-                        friend_key = self.friend_key_from_conv_id(cid)
-                        friend_name = self.friend_display_name(friend_key)
-                        callback(friend_key, friend_name, body, is_me)
-                        if ts > last:
-                            last = ts
-                    self._last_dm_ts[cid] = last
+                self.poll_dms_once(callback, recent_seconds)
             except Exception as e:
                 log_once("DM-WATCH", f"EXC {e}")
             finally:
                 _t.sleep(interval)
 
+    def poll_dms_once(
+        self,
+        callback: Callable[[str, str, str, bool], None],
+        recent_seconds: float = 120.0,
+    ) -> None:
+        """watch_dms'in tek turu (zamanlayıcı/scheduler ile sürülebilir)."""
+        import time as _t
+
+        recent_cutoff = (_t.time() - recent_seconds) if recent_seconds and recent_seconds > 0 else None
+        for c in self.conversations():
+            cid = c.id
+            if not cid or not c.is_dm:
+                continue
+            if cid not in self._last_dm_ts and self.cursors:
+                saved = self.cursors.get("dm", cid)
+                if saved:
+                    self._last_dm_ts[cid] = saved[0]
+            last = self._last_dm_ts.get(cid, 0.0)
+            last_mid = None
+            if recent_cutoff and last < recent_cutoff:
+                last = recent_cutoff
+            msgs = self.fetch_messages(cid, limit=30, since=self._stream_since(cid, last))
+            self._record(cid, msgs)
+            friend_key = friend_name = None
+            for m in msgs:
+                ts = m.ts
+                if recent_cutoff and ts < recent_cutoff:
+                    continue
+                if ts <= last:
+                    continue
+                if friend_key is None:
+                    # conv başına bir kez (eskiden her mesajda arkadaş listesi çekiliyordu)
+                    friend_key = self.friend_key_from_conv_id(cid)
+                    friend_name = self.friend_display_name(friend_key)
+                callback(friend_key, friend_name, m.body, m.is_me)
+                if ts > last:
+                    last, last_mid = ts, m.id
+            if self.cursors and last_mid is not None:
+                self.cursors.set("dm", cid, last, last_mid)
+            self._last_dm_ts[cid] = last
+
     # ---- DM helpers for CLI (/dm-log) ----
     def _find_friend_by_name_or_key(self, name_or_key: str) -> Optional[dict]:
         key = name_or_key.strip()
-        f = self.friend_by_key(key)
+        friends = self.friends()
+        f = index_friends(friends).get(key)
         if f:
-            return f
+            return f.raw
         key_low = key.lower()
-        for fr in self.list_friends():
-            dn = fr.get('name') or fr.get('gameName') or fr.get('displayName') or ''
-            if dn.lower() == key_low:
-                return fr
-        for fr in self.list_friends():
-            dn = fr.get('name') or fr.get('gameName') or fr.get('displayName') or ''
-            if dn.lower().startswith(key_low):
-                return fr
-        for c in self.list_dms():
-            dn = c.get('name') or ''
-            if dn.lower() == key_low or dn.lower().startswith(key_low):
-                return {"name": dn, "pid": c.get('id')}
+        for fr in friends:
+            if fr.name.lower() == key_low:
+                return fr.raw
+        for fr in friends:
+            if fr.name.lower().startswith(key_low):
+                return fr.raw
+        for c in self.conversations():
+            if not c.is_dm:
+                continue
+            dn = c.name.lower()
+            if dn == key_low or dn.startswith(key_low):
+                return {"name": c.name, "pid": c.id}
         return None
 
     def _ensure_dm_conversation(self, friend: dict) -> Optional[dict]:
@@ -245,12 +380,11 @@ class ChatService:
         conv = self._ensure_dm_conversation(friend)
         if not conv:
             return [f"(DM kanalı alınamadı: {name_or_key})"]
-        msgs = self.messages(conv['id'], limit=limit)
         lines: list[str] = []
-        for m in msgs:
-            is_me = self._is_me(m)
-            ts_str = self._fmt_ts_str(m.get('timestamp'))
-            body = (m.get('body') or '').replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
+        for m in self.history(conv['id'], limit=limit):
+            is_me = m["is_me"]
+            ts_str = self._fmt_epoch(m["ts"])
+            body = m["body"]
             if is_me:
                 lines.append(f"[ME=>YOU] [{ts_str}] : {body}")
             else:
@@ -259,7 +393,7 @@ class ChatService:
 
     # ---- Lobby / Party helpers ----
     def _lget(self, path: str):
-        r = self._get(path);  return r.json() if r and r.status_code==200 else {}
+        r = self._get(path);  return decode_response(r) if r and r.status_code==200 else {}
 
     def is_party_leader(self) -> bool:
         try:
@@ -286,20 +420,19 @@ class ChatService:
         j = self._lget("/lol-lobby/v2/lobby")
         return j.get("members", []) or []
 
+    def lobby_members(self) -> List[LobbyMember]:
+        return [LobbyMember.from_raw(m) for m in self._lobby_members()]
+
     def is_puuid_in_lobby(self, puuid: str | None) -> bool:
         target = (puuid or "").lower().strip()
         if not target:
             return False
-        for member in self._lobby_members():
-            mp = (member.get("puuid") or "").lower().strip()
-            if mp and mp == target:
-                return True
-        return False
+        return any(m.puuid == target for m in self.lobby_members())
 
     def find_member_by_name(self, name: str) -> Optional[dict]:
         n = (name or "").strip().lower()
-        for m in self._lobby_members():
-            if (m.get("summonerName") or "").lower() == n: return m
+        for m in self.lobby_members():
+            if m.summoner_name.lower() == n: return m.raw
         return None
 
     def kick_member_by_id(self, summoner_id: int) -> bool:
@@ -339,95 +472,83 @@ class ChatService:
         - debug=True: Yakalanan HER mesajı terminale loglar (GRP-SEE).
         """
         import time
-        from utils import log_once, parse_ts_iso
 
         # conv_id -> (last_ts: float, last_mid: str|int|None)
         last_seen = {}
 
-        def _is_me(msg: dict) -> bool:
-            if msg.get('isSelf') is True:
-                return True
-            me = self.ME or {}
-            my_sid = str(me.get('summonerId') or '')
-            my_puuid = (me.get('puuid') or '')
-            if str(msg.get('fromSummonerId') or '') == my_sid:
-                return True
-            pid = (msg.get('fromPid') or '').split('@', 1)[0]
-            return bool(pid and my_puuid and pid == my_puuid)
-
-        def _sender(msg: dict) -> str:
-            return (
-                    msg.get("fromSummonerName")
-                    or msg.get("fromName")
-                    or msg.get("senderName")
-                    or msg.get("sender")
-                    or "Unknown"
-            )
-
         while True:
+            loop_tick()
+            if not self.wait_online():
+                continue
             try:
-                # Hangi groupchat'leri izleyeceğiz?
-                if self.active_group_id:
-                    conv_ids = [self.active_group_id]
-                else:
-                    conv_ids = [g.get("id") for g in (self.list_groups() or []) if g.get("id")]
-
-                for cid in conv_ids:
-                    msgs = self.messages(cid, limit=50) or []
-                    # kronolojik sıraya al (timestamp varsa ona göre)
-                    try:
-                        msgs.sort(key=lambda m: parse_ts_iso(m.get("timestamp")))
-                    except Exception:
-                        pass
-
-                    last_ts, last_mid = last_seen.get(cid, (0.0, None))
-
-                    for m in msgs:
-                        ts = parse_ts_iso(m.get("timestamp"))
-                        mid = m.get("id")
-
-                        # yeni mi?
-                        is_new = (ts > last_ts) or (ts == last_ts and (last_mid is None or mid != last_mid))
-                        if not is_new:
-                            continue
+                self.poll_groups_once(on_message, last_seen, include_self, debug)
+            except Exception as e:
+                log_once("GRP", f"watch err: {e}")
 
-                        is_self = _is_me(m)
-                        if not include_self and is_self:
-                            # kendi mesajlarını atla (SOLO'da kapatma — biz açık tutuyoruz)
-                            continue
+            time.sleep(interval)
 
-                        body = (m.get("body") or "").strip()
-                        if not body:
-                            continue
+    def poll_groups_once(self, on_message, last_seen: dict, include_self: bool = True, debug: bool = True) -> None:
+        """watch_group_messages'ın tek turu; last_seen (conv_id -> (ts, mid)) çağıranda tutulur."""
+        # Hangi groupchat'leri izleyeceğiz?
+        if self.active_group_id:
+            conv_ids = [self.active_group_id]
+        else:
+            conv_ids = [g.get("id") for g in (self.list_groups() or []) if g.get("id")]
+
+        for cid in conv_ids:
+            if cid not in last_seen and self.cursors:
+                saved = self.cursors.get("grp", cid)
+                if saved:
+                    last_seen[cid] = saved
+            last_ts, last_mid = last_seen.get(cid, (0.0, None))
+
+            # imleçten (aynı ts dahil) yeni olanlar; kronolojik sıraya al.
+            # store geride değilse akış imleç mesajında durur (aynı ms'deki eskiler tekrar gelmez)
+            since = self._stream_since(cid, last_ts)
+            msgs = self.fetch_messages(cid, limit=50, since=since,
+                                       after_id=last_mid if since == last_ts else None)
+            msgs.sort(key=lambda m: m.ts)
+            self._record(cid, msgs, group=True)
+
+            for m in msgs:
+                ts = m.ts
+                mid = m.id
+
+                # yeni mi?
+                is_new = (ts > last_ts) or (ts == last_ts and (last_mid is None or mid != last_mid))
+                if not is_new:
+                    continue
 
-                        sender = _sender(m)
+                is_self = m.is_me
+                if not include_self and is_self:
+                    # kendi mesajlarını atla (SOLO'da kapatma — biz açık tutuyoruz)
+                    continue
 
-                        if debug:
-                            log_once("GRP-SEE", f"cid={cid} from={sender} self={is_self} body={body}")
+                body = m.text.strip()
+                if not body:
+                    continue
 
-                        # callback (komut işleyici)
-                        try:
-                            on_message(cid, body, sender)
-                        except Exception as cb_err:
-                            log_once("GRP", f"on_message err: {cb_err}")
+                sender = m.group_sender
 
-                        # ilerleme kaydı
-                        last_ts, last_mid = ts, mid
+                if debug:
+                    log_once("GRP-SEE", f"cid={cid} from={sender} self={is_self} body={body}")
 
-                    last_seen[cid] = (last_ts, last_mid)
+                # callback (komut işleyici)
+                try:
+                    on_message(cid, body, sender)
+                except Exception as cb_err:
+                    log_once("GRP", f"on_message err: {cb_err}")
 
-            except Exception as e:
-                log_once("GRP", f"watch err: {e}")
+                # ilerleme kaydı
+                last_ts, last_mid = ts, mid
 
-            time.sleep(interval)
+            if self.cursors and last_seen.get(cid) != (last_ts, last_mid):
+                self.cursors.set("grp", cid, last_ts, last_mid)
+            last_seen[cid] = (last_ts, last_mid)
 
     # === Lobby sohbetini otomatik takip (grup id eşleme) ===
     def _lobby_member_names(self) -> set[str]:
-        return {
-            (m.get("summonerName") or "").lower()
-            for m in self._lobby_members()
-            if (m.get("summonerName") or "")
-        }
+        return {m.summoner_name.lower() for m in self.lobby_members() if m.summoner_name}
 
     def follow_lobby_chat(self) -> bool:
         gid = self.get_lobby_group_id()
@@ -488,6 +609,12 @@ class ChatService:
             return False
         return self.send(conv['id'], text)
 
+    def dm_reply(self, friend_key: str, text: str) -> bool:
+        """DM bot yanıtı; arkadaş → konuşma çözümlemesi de gönderici thread'inde yapılır."""
+        if self.outbox is None:
+            return self.dm_send(friend_key, text)
+        return self.outbox.post(f"dm:{friend_key}", text, lambda t: self.dm_send(friend_key, t))
+
     # ============================
     # Matchmaking Ready-Check API
     # ============================
@@ -496,7 +623,7 @@ class ChatService:
         r = self._get("/lol-matchmaking/v1/ready-check")
         if r and r.status_code == 200:
             try:
-                return r.json() or {}
+                return decode_response(r) or {}
             except Exception:
                 return {}
         return {}
@@ -509,7 +636,7 @@ class ChatService:
         r = self._get("/lol-gameflow/v1/gameflow-phase")
         if r and r.status_code == 200:
             try:
-                p = r.json()
+                p = decode_response(r)
                 if isinstance(p, str):
                     return p.strip('"')
             except Exception:
@@ -519,13 +646,34 @@ class ChatService:
     def cs_session(self) -> dict:
         return self._lget("/lol-champ-select/v1/session") or {}
 
+    def champ_select(self) -> Optional[ChampSelectSession]:
+        return ChampSelectSession.from_raw(self.cs_session())
+
     def pickable_ids(self) -> set[int]:
         r = self._get("/lol-champ-select/v1/pickable-champion-ids")
         try:
-            return set(r.json() or []) if r and r.status_code == 200 else set()
+            return set(decode_response(r) or []) if r and r.status_code == 200 else set()
+        except Exception:
+            return set()
+
+    def bannable_ids(self) -> set[int]:
+        r = self._get("/lol-champ-select/v1/bannable-champion-ids")
+        try:
+            return set(decode_response(r) or []) if r and r.status_code == 200 else set()
         except Exception:
             return set()
 
+    def current_queue_id(self) -> int | None:
+        """Aktif oyunun kuyruğu (champ select'te lobi kapanmış olabilir → gameflow session)."""
+        j = self._lget("/lol-gameflow/v1/session") or {}
+        q = ((j.get("gameData") or {}).get("queue") or {}).get("id")
+        if q is None:
+            q = ((self._lget("/lol-lobby/v2/lobby") or {}).get("gameConfig") or {}).get("queueId")
+        try:
+            return int(q) if q is not None else None
+        except (TypeError, ValueError):
+            return None
+
         # Şampiyon kataloğu (ad/alias → id)
 
     _champ_catalog: dict | None = None
@@ -537,7 +685,7 @@ class ChatService:
         by_name, by_alias, by_id = {}, {}, {}
         if r and r.status_code == 200:
             try:
-                for c in (r.json() or []):
+                for c in (decode_response(r) or []):
                     try:
                         cid = int(c.get("id"))
                     except Exception:
@@ -558,23 +706,20 @@ class ChatService:
         cat = self.champion_catalog()
         return cat["by_name"].get(t) or cat["by_alias"].get(t)
 
-    def my_pick_action(self) -> tuple[dict | None, dict]:
+    def my_action(self, kind: str = "pick") -> tuple[dict | None, dict]:
         """
-        Döner: (action or None, full_session)
+        Döner: (action or None, full_session) — kind: 'pick' | 'ban'
         action: {'id', 'type', 'actorCellId', 'isInProgress', 'completed', 'championId', ...}
         """
-        sess = self.cs_session()
-        if not sess: return None, {}
-        me = sess.get("localPlayerCellId")
-        for row in (sess.get("actions") or []):
-            for act in row:
-                if (
-                        act.get("actorCellId") == me and
-                        (act.get("type") or "").lower() == "pick" and
-                        not act.get("completed", False)
-                ):
-                    return act, sess
-        return None, sess
+        cs = self.champ_select()
+        if not cs: return None, {}
+        return cs.my_action(kind), cs.raw
+
+    def my_pick_action(self) -> tuple[dict | None, dict]:
+        return self.my_action("pick")
+
+    def my_ban_action(self) -> tuple[dict | None, dict]:
+        return self.my_action("ban")
 
     def cs_hover(self, action_id: int, champ_id: int) -> bool:
         r = self._patch(f"/lol-champ-select/v1/session/actions/{action_id}", json={"championId": champ_id})
@@ -584,6 +729,10 @@ class ChatService:
         r = self._post(f"/lol-champ-select/v1/session/actions/{action_id}/complete", json={"championId": champ_id})
         return bool(r and r.status_code in (200, 204))
 
+    def cs_ban(self, action_id: int, champ_id: int) -> bool:
+        """Ban action'ı: önce hover, sonra complete (pick ile aynı uçlar)."""
+        return self.cs_hover(action_id, champ_id) and self.cs_lock(action_id, champ_id)
+
     def autopick_try(self, pref_ids: list[int], do_lock: bool = True) -> tuple[bool, str, int | None]:
         """
         Tercih listesinden uygun ilk şampiyonu pick'lemeyi dener.
@@ -656,6 +805,9 @@ class ChatService:
         last_phase = None
 
         while True:
+            loop_tick()
+            if not self.wait_online():
+                continue
             try:
                 lob = self._lobby() or {}
                 lobby_id = self._lobby_id_any(lob) if lob else None
@@ -709,7 +861,7 @@ class ChatService:
         """LCU: /lol-geoinfo/v1/getlocation → bölge/ülke/locale vb. bilgileri döner."""
         r = self._get("/lol-geoinfo/v1/getlocation")
         try:
-            return r.json() if r and r.status_code == 200 else {}
+            return decode_response(r) if r and r.status_code == 200 else {}
         except Exception:
             return {}
 
@@ -725,21 +877,14 @@ class ChatService:
 
     # --- Lobby üyeleri: PUUID seti ---
     def _lobby_member_puuids(self) -> set[str]:
-        j = self._lget("/lol-lobby/v2/lobby") or {}
-        puuids = set()
-        for m in (j.get("members") or []):
-            p = (m.get("puuid") or "").lower()
-            if p:
-                puuids.add(p)
-        return puuids
+        return {m.puuid for m in self.lobby_members() if m.puuid}
 
     # --- Grup (groupchat) katılımcılarından PUUID çıkar ---
     def _group_participant_puuids(self, conv_id: str) -> set[str]:
         puuids = set()
         for p in self.participants(conv_id):
             # pid tipik olarak "<puuid>@pvp.net" biçiminde gelir
-            pid = (p.get("pid") or p.get("id") or "")
-            base = pid.split("@", 1)[0].lower()
+            base = pid_key(p.get("pid") or p.get("id")).lower()
             if base:
                 puuids.add(base)
         # yedek: isimden değil; isim takma/maskeleme sorun çıkarır, o yüzden es geçiyoruz
@@ -774,23 +919,17 @@ class ChatService:
         Champ Select oturumundan bench'teki şampiyonları döndürür (championId listesi).
         ARAM'da reroll sonrası takım bench'ine düşenler burada.
         """
-        sess = self.cs_session() or {}
-        bench = sess.get("benchChampions") or sess.get("bench") or []
-        out = []
-        for b in bench:
-            try:
-                cid = int(b.get("championId") or b.get("id") or 0)
-                if cid: out.append(cid)
-            except Exception:
-                pass
-        return out
+        cs = self.champ_select()
+        return list(cs.bench) if cs else []
 
-    def bench_swap(self, champion_id: int) -> bool:
+    def bench_swap(self, champion_id: int, critical: bool = False) -> bool:
         """
         Bench'ten kendi seçimime champion çeker.
         LCU: POST /lol-champ-select/v1/session/bench/swap/{championId}
+        critical=True: bench sniping için kritik istek yolu (bkz. _post_critical).
         """
-        r = self._post(f"/lol-champ-select/v1/session/bench/swap/{int(champion_id)}")
+        path = f"/lol-champ-select/v1/session/bench/swap/{int(champion_id)}"
+        r = self._post_critical(path) if critical else self._post(path)
         return bool(r and r.status_code in (200, 204))
 
     def autopick_try_with_bench(self, pref_ids: list[int], do_lock: bool = True) -> tuple[bool, str]:
@@ -0,0 +1,161 @@
+"""Kalıcı yerel sohbet geçmişi (SQLite, WAL, FTS5 tam metin indeksi).
+
+Watcher'lar gördükleri her mesajı ChatStore.add ile kuyruğa atar; ayrı bir yazıcı
+thread'i kuyruktan toplu (batched) INSERT yapar. Tablo yalnızca eklemeli (append-only):
+(conv_id, msg_id) tekildir, aynı mesaj ikinci kez yazılmaz.
+
+Okuma tarafı (recent / search) kendi bağlantısını kullanır; WAL sayesinde yazıcıyı bloklamaz.
+"""
+from __future__ import annotations
+import queue, sqlite3, threading, time, zlib
+from typing import Optional, List, Dict, Iterable, Tuple
+from utils import log_once
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id       INTEGER PRIMARY KEY,
+    conv_id  TEXT NOT NULL,
+    msg_id   TEXT NOT NULL,
+    ts       REAL NOT NULL,
+    sender   TEXT NOT NULL DEFAULT '',
+    is_me    INTEGER NOT NULL DEFAULT 0,
+    body     TEXT NOT NULL DEFAULT '',
+    UNIQUE (conv_id, msg_id)
+);
+CREATE INDEX IF NOT EXISTS messages_conv_ts ON messages (conv_id, ts);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    body, sender, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, body, sender) VALUES (new.id, new.body, new.sender);
+END;
+"""
+
+_INSERT = "INSERT OR IGNORE INTO messages (conv_id, msg_id, ts, sender, is_me, body) VALUES (?, ?, ?, ?, ?, ?)"
+
+Row = Tuple[str, str, float, str, bool, str]
+
+
+class ChatStore:
+    """Eklemeli sohbet arşivi. add() thread-safe ve bloklamaz."""
+
+    BATCH_SIZE = 1000
+    BATCH_WAIT = 0.2  # sn — kuyrukta biriken mesajlar en geç bu sürede yazılır
+
+    def __init__(self, path: str = "chat_history.db"):
+        self.path = path
+        self._q: "queue.Queue[Optional[Row]]" = queue.Queue()
+        self._writer = self._connect()
+        self._writer.executescript(_SCHEMA)
+        try:
+            self._writer.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            log_once("STORE", f"FTS5 yok, LIKE araması kullanılacak: {e}")
+            self.has_fts = False
+        self._writer.commit()
+        self._reader = self._connect()
+        self._read_lock = threading.Lock()
+        self.written = 0
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---- yazma ----
+    def add(self, conv_id: str, msg_id, ts: float, sender: str, is_me: bool, body: str) -> None:
+        if not conv_id:
+            return
+        # id'siz mesaj: süreçler arası kararlı özet (hash() her açılışta rastgele tohumlanır)
+        mid = str(msg_id) if msg_id not in (None, "") else f"{ts:.3f}:{zlib.crc32((body or '').encode('utf-8')):x}"
+        self._q.put((conv_id, mid, float(ts or 0.0), sender or "", bool(is_me), body or ""))
+
+    def add_many(self, rows: Iterable[Row]) -> None:
+        for r in rows:
+            self._q.put(r)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Kuyruktaki her şey diske yazılana kadar bekler."""
+        deadline = time.monotonic() + timeout
+        while self._q.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not self._q.unfinished_tasks
+
+    def _write_loop(self) -> None:
+        while True:
+            first = self._q.get()
+            batch = [first]
+            deadline = time.monotonic() + self.BATCH_WAIT
+            while len(batch) < self.BATCH_SIZE:
+                left = deadline - time.monotonic()
+                try:
+                    batch.append(self._q.get(timeout=left) if left > 0 else self._q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._writer:
+                    self._writer.executemany(_INSERT, batch)
+                self.written += len(batch)
+            except Exception as e:
+                log_once("STORE", f"write err: {e}")
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+
+    # ---- okuma ----
+    @staticmethod
+    def _rows(cur) -> List[Dict]:
+        return [
+            {"conv_id": c, "msg_id": m, "ts": ts, "sender": s, "is_me": bool(me), "body": b}
+            for c, m, ts, s, me, b in cur
+        ]
+
+    def recent(self, conv_id: str, limit: int = 50) -> List[Dict]:
+        """conv_id için son `limit` mesaj (kronolojik sırada)."""
+        with self._read_lock:
+            cur = self._reader.execute(
+                "SELECT conv_id, msg_id, ts, sender, is_me, body FROM messages "
+                "WHERE conv_id = ? ORDER BY ts DESC, id DESC LIMIT ?",
+                (conv_id, int(limit)),
+            )
+            return list(reversed(self._rows(cur)))
+
+    def search(self, text: str, limit: int = 20, conv_id: Optional[str] = None,
+               conv_prefix: Optional[str] = None) -> List[Dict]:
+        """Tam metin arama; en yeni eşleşmeler önce. conv_prefix: yalnızca bu önekle başlayan conv_id'ler."""
+        terms = [t for t in (text or "").split() if t]
+        if not terms:
+            return []
+        with self._read_lock:
+            if self.has_fts:
+                match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+                sql = (
+                    "SELECT m.conv_id, m.msg_id, m.ts, m.sender, m.is_me, m.body FROM messages_fts f "
+                    "JOIN messages m ON m.id = f.rowid WHERE messages_fts MATCH ?"
+                )
+                args: list = [match]
+            else:
+                sql = "SELECT conv_id, msg_id, ts, sender, is_me, body FROM messages m WHERE 1=1"
+                args = []
+                for t in terms:
+                    sql += " AND m.body LIKE ?"
+                    args.append(f"%{t}%")
+            if conv_id:
+                sql += " AND m.conv_id = ?"
+                args.append(conv_id)
+            if conv_prefix:
+                sql += " AND substr(m.conv_id, 1, ?) = ?"
+                args += [len(conv_prefix), conv_prefix]
+            sql += " ORDER BY m.ts DESC LIMIT ?"
+            args.append(int(limit))
+            return self._rows(self._reader.execute(sql, args))
+
+    def count(self) -> int:
+        with self._read_lock:
+            return int(self._reader.execute("SELECT COUNT(*) FROM messages").fetchone()[0])
@@ -0,0 +1,117 @@
+"""Parti komutları için tekrar (dedup) penceresi.
+
+Lobi sohbeti ve DM'den aynı anda gelen aynı komut (birkaç üye aynı anda "ban Ali"
+yazınca) tek kez çalışır; pencere içindeki kopyalar sessizce yutulur:
+
+    if not DEDUP.claim("ban", target, lobby=conv_id, scope=id(cs)):
+        return True          # aynı (komut, argüman, lobi) az önce işlendi
+
+Anahtar (komut, normalize argüman, lobi, scope)'tur; scope aynı süreçteki farklı
+istemcileri (multi_client) ayırır. Pencere komut başına ayarlanır (0 → kapalı).
+Kayıt sayısı MAX_KEYS ile sınırlıdır; yutulan her kopya için komutun yapacağı
+LCU çağrısı sayısı (COST) "kaçınılan çağrı" olarak sayılır.
+"""
+from __future__ import annotations
+import threading, time
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from utils import log_once
+
+MAX_KEYS = 1024
+
+DEFAULT_WINDOWS: Dict[str, float] = {   # sn
+    "baslat": 2.0,
+    "durdur": 2.0,
+    "ban": 5.0,
+    "odadevret": 5.0,
+    "picklist": 3.0,
+}
+
+# Yutulan bir kopyanın atlattığı LCU isteği: lider kontrolü + üye araması + değişiklik
+COST: Dict[str, int] = {"baslat": 2, "durdur": 2, "ban": 3, "odadevret": 3, "picklist": 0}
+
+# Karşıt komut aynı lobide pencereyi sıfırlar (BASLAT → DURDUR → BASLAT yutulmasın)
+RESETS: Dict[str, Tuple[str, ...]] = {"baslat": ("durdur",), "durdur": ("baslat",)}
+
+Key = Tuple[str, str, str, Hashable]
+
+
+def normalize(arg: Optional[str]) -> str:
+    """Büyük/küçük harf ve boşluk farkını yok sayar; virgüllü listelerde öğe boşluklarını da."""
+    s = " ".join((arg or "").split()).casefold()
+    if "," in s:
+        s = ",".join(p.strip() for p in s.split(","))
+    return s
+
+
+class DedupWindow:
+    def __init__(self, windows: Optional[Dict[str, float]] = None, max_keys: int = MAX_KEYS):
+        self.windows = dict(DEFAULT_WINDOWS if windows is None else windows)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[Key, float]" = OrderedDict()   # anahtar → pencere sonu (monotonic)
+        self.passed: Counter = Counter()
+        self.suppressed: Counter = Counter()
+        self.avoided_calls = 0
+
+    def configure(self, spec: str) -> Dict[str, float]:
+        """"ban=5,baslat=2" → pencereleri günceller; bilinmeyen/bozuk girdiler atlanır."""
+        for part in (spec or "").split(","):
+            name, _, val = part.partition("=")
+            name = name.strip().lower()
+            try:
+                secs = max(0.0, float(val))
+            except ValueError:
+                continue
+            if name:
+                self.windows[name] = secs
+        return dict(self.windows)
+
+    def claim(self, cmd: str, arg: Optional[str] = "", lobby: Optional[str] = "", scope: Hashable = "") -> bool:
+        """İlk gelen True alır (komut çalışsın); pencere içindeki kopyalar False."""
+        window = self.windows.get(cmd, 0.0)
+        if window <= 0:
+            return True
+        key: Key = (cmd, normalize(arg), lobby or "", scope)
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            until = self._seen.get(key)
+            if until is not None and until > now:
+                self.suppressed[cmd] += 1
+                self.avoided_calls += COST.get(cmd, 0)
+                dup = True
+            else:
+                dup = False
+                self._seen[key] = now + window
+                self._seen.move_to_end(key)
+                self.passed[cmd] += 1
+                for other in RESETS.get(cmd, ()):
+                    for k in [k for k in self._seen if k[0] == other and k[2:] == key[2:]]:
+                        del self._seen[k]
+        if dup:
+            log_once("DEDUP", f"{cmd} {key[1] or '-'} tekrarı yutuldu ({window:g} sn içinde)")
+        return not dup
+
+    def _purge(self, now: float) -> None:
+        # self._lock tutulurken çağrılır; en eski kayıtlar önde
+        seen = self._seen
+        while seen:
+            k, until = next(iter(seen.items()))
+            if until > now and len(seen) < self.max_keys:
+                break
+            del seen[k]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "windows": dict(self.windows),
+                "passed": dict(self.passed),
+                "suppressed": dict(self.suppressed),
+                "avoided_lcu_calls": self.avoided_calls,
+                "keys": len(self._seen),
+            }
+
+
+DEDUP = DedupWindow()
@@ -0,0 +1,166 @@
+"""Sohbet komutları için konuşma başına sıralı worker havuzu.
+
+Watcher thread'i mesajı okuyup yalnızca kuyruğa atar; komut (BAN, BASLAT, ...) havuzda çalışır:
+
+    pool = CommandPool(workers=4, deadline=10.0)
+    pool.submit(conv_id, "ban", handle_group_command, cs, conv_id, body, frm, cfg)
+    pool.submit("dm:" + puuid, "baslat", handle_dm_party_command, cs, puuid, name, body)
+
+Aynı anahtardaki (konuşma) işler geliş sırasıyla, birbiri ardına çalışır; farklı
+konuşmalar ve DM'ler paralel yürür. Bir anahtar her turda tek iş çalıştırıp havuz
+kuyruğunun sonuna döner, böylece yoğun bir lobi diğerlerini aç bırakmaz.
+
+Her işin bir son tarihi (deadline) vardır: sırası geldiğinde süresi geçmişse hiç
+çalıştırılmaz; çalışan iş remaining()/expired() ile kalan süreyi okuyup geç kalmış
+bir değişikliği (ör. 20 sn sonra gelen BAN) atlayabilir. Tür başına kuyruk bekleme
+ve çalışma süreleri (p50/p95/max) stats() ile okunur.
+"""
+from __future__ import annotations
+import threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional
+
+from utils import latency_dist, log_once
+
+DEFAULT_WORKERS = 4
+DEFAULT_DEADLINE = 10.0   # sn — kuyruğa girişten itibaren
+MAX_PER_KEY = 64          # anahtar başına bekleyen iş sınırı (taşarsa yeni iş düşer)
+SAMPLES = 256             # tür başına tutulan son süre örnekleri
+
+_local = threading.local()
+
+
+def remaining() -> float:
+    """Çalışan komutun son tarihine kalan süre (sn); havuz dışında sonsuz."""
+    dl = getattr(_local, "deadline", None)
+    return float("inf") if dl is None else dl - time.monotonic()
+
+
+def expired() -> bool:
+    return remaining() <= 0
+
+
+class _Job:
+    __slots__ = ("kind", "fn", "args", "kwargs", "t_in", "deadline")
+
+    def __init__(self, kind: str, fn: Callable, args: tuple, kwargs: dict, deadline: float):
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.t_in = time.monotonic()
+        self.deadline = self.t_in + deadline
+
+
+class _KindStats:
+    __slots__ = ("done", "errors", "expired", "late", "dropped", "wait", "run")
+
+    def __init__(self):
+        self.done = self.errors = self.expired = self.late = self.dropped = 0
+        self.wait: Deque[float] = deque(maxlen=SAMPLES)
+        self.run: Deque[float] = deque(maxlen=SAMPLES)
+
+
+class CommandPool:
+    def __init__(self, workers: int = DEFAULT_WORKERS, deadline: float = DEFAULT_DEADLINE):
+        self.deadline = max(0.1, float(deadline))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="cmd")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Job]] = {}   # yalnızca işi olan / çalışan anahtarlar
+        self._stats: Dict[str, _KindStats] = {}
+        self.max_depth = 0
+        self._stopped = False
+
+    def submit(self, key: str, kind: str, fn: Callable, *args, deadline: Optional[float] = None, **kwargs) -> bool:
+        """fn(*args, **kwargs)'ı key sırasına ekler; sınır aşıldıysa veya havuz durduysa False."""
+        job = _Job(kind, fn, args, kwargs, self.deadline if deadline is None else deadline)
+        with self._lock:
+            if self._stopped:
+                return False
+            q = self._queues.get(key)
+            if q is not None and len(q) >= MAX_PER_KEY:
+                self._kind(kind).dropped += 1
+                full = True
+            else:
+                full = False
+                idle = q is None
+                if idle:
+                    q = self._queues[key] = deque()
+                q.append(job)
+                self.max_depth = max(self.max_depth, len(q))
+        if full:
+            log_once("CMDQ", f"{key} kuyruğu dolu ({MAX_PER_KEY}); {kind} düşürüldü")
+            return False
+        if idle:
+            try:
+                self._pool.submit(self._drain, key)
+            except RuntimeError:   # stop() arada çağrıldı
+                return False
+        return True
+
+    def _kind(self, kind: str) -> _KindStats:
+        # self._lock tutulurken çağrılır
+        st = self._stats.get(kind)
+        if st is None:
+            st = self._stats[kind] = _KindStats()
+        return st
+
+    def _drain(self, key: str) -> None:
+        """key kuyruğunun başındaki tek işi çalıştırır; iş kaldıysa havuzun sonuna yeniden girer."""
+        with self._lock:
+            job = self._queues[key][0]
+        start = time.monotonic()
+        wait = start - job.t_in
+        err = late = skipped = False
+        if start >= job.deadline:
+            skipped = True
+            log_once("CMDQ", f"{key} {job.kind} {wait:.1f} sn kuyrukta bekledi; süresi doldu, atlandı")
+        else:
+            _local.deadline = job.deadline
+            try:
+                job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                err = True
+                log_once("CMDQ", f"{key} {job.kind} err: {e}")
+            finally:
+                _local.deadline = None
+            late = time.monotonic() > job.deadline
+        run = time.monotonic() - start
+        with self._lock:
+            st = self._kind(job.kind)
+            st.wait.append(wait)
+            if skipped:
+                st.expired += 1
+            else:
+                st.done += 1
+                st.errors += err
+                st.late += late
+                st.run.append(run)
+            q = self._queues[key]
+            q.popleft()
+            more = bool(q) and not self._stopped
+            if not q:
+                del self._queues[key]
+        if more:
+            try:
+                self._pool.submit(self._drain, key)
+            except RuntimeError:
+                pass
+
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return {k: len(q) for k, q in self._queues.items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {k: {"done": s.done, "errors": s.errors, "expired": s.expired, "late": s.late,
+                         "dropped": s.dropped, "wait": latency_dist(s.wait), "run": latency_dist(s.run)}
+                     for k, s in self._stats.items()}
+            depth = {k: len(q) for k, q in self._queues.items()}
+        return {"kinds": kinds, "pending": depth, "max_depth": self.max_depth}
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,162 @@
+"""Kopyala-yaz (copy-on-write) çalışma zamanı ayarları.
+
+Config değişmez bir görüntüdür (snapshot): bir kez oluşturulur, sonra hiç değişmez;
+listeler tuple'a çevrilir. ConfigStore en güncel Config'e atomik bir referans tutar:
+
+    snap = cfg.snapshot()               # okuyucu: tek tutarlı görüntü (kilitsiz)
+    if snap["auto_pick_enabled"]: use(snap["auto_pick_ids"])
+    cfg.update(auto_pick_lock=False)    # yazar: yeni sürüm üretir ve yayınlar
+    cfg.subscribe(on_change, keys=("auto_pick_list",))   # on_change(old, new, changed)
+
+Tek seferlik okumalar için ConfigStore da salt-okunur bir Mapping gibi davranır
+(cfg.get("quiet"), cfg["announce"]); her çağrı o anki görüntüden okur. Döngü içinde
+birden fazla alan okunacaksa bir kez snapshot() alınmalı.
+"""
+from __future__ import annotations
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils import log_once
+
+Subscriber = Callable[["Config", "Config", frozenset], None]
+
+
+def _freeze(v: Any) -> Any:
+    if isinstance(v, list):
+        return tuple(_freeze(x) for x in v)
+    if isinstance(v, set):
+        return frozenset(v)
+    return v
+
+
+class Config(Mapping):
+    """Değişmez, sürümlü ayar görüntüsü."""
+
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, version: int = 0):
+        object.__setattr__(self, "_data", {k: _freeze(v) for k, v in (data or {}).items()})
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config değişmez; ConfigStore.update kullanın")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Config(v{self.version}, {self._data!r})"
+
+    def replace(self, changes: Dict[str, Any]) -> Tuple["Config", frozenset]:
+        """Değişikliklerle yeni bir Config ve gerçekten değişen anahtarları döner."""
+        frozen = {k: _freeze(v) for k, v in changes.items()}
+        changed = frozenset(k for k, v in frozen.items() if k not in self._data or self._data[k] != v)
+        if not changed:
+            return self, changed
+        data = dict(self._data)
+        data.update(frozen)
+        new = Config.__new__(Config)
+        object.__setattr__(new, "_data", data)
+        object.__setattr__(new, "version", self.version + 1)
+        return new, changed
+
+
+class ConfigStore(Mapping):
+    """En güncel Config'e atomik referans + değişiklik aboneleri."""
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None):
+        self._current = Config(initial)
+        # RLock: abone kendi içinde update() çağırabilir (türetilmiş alanlar)
+        self._write_lock = threading.RLock()
+        self._subs: List[Tuple[Subscriber, Optional[frozenset]]] = []
+        # abone içinden yapılan update'ler kuyruğa girer; aboneler sürümleri sırayla görür
+        self._pending: List[Tuple[Config, Config, frozenset]] = []
+        self._notifying = False
+
+    # ---------- okuma ----------
+    def snapshot(self) -> Config:
+        return self._current  # tek referans okuması; yazarlar yalnızca referansı değiştirir
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def __getitem__(self, key: str) -> Any:
+        return self._current[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._current)
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __repr__(self) -> str:
+        return f"ConfigStore({self._current!r})"
+
+    # ---------- yazma ----------
+    def update(self, _changes: Optional[Dict[str, Any]] = None, **changes: Any) -> Config:
+        """Yeni bir sürüm yayınlar ve değişen anahtarlarla ilgilenen abonelere haber verir.
+
+        Aboneler yazarın thread'inde, update() dönmeden önce çağrılır; yani update()
+        döndüğünde türetilmiş alanlar (örn. auto_pick_ids) da güncellenmiş olur.
+        Abone içinden çağrılırsa yeni sürüm yayınlanır, bildirimi sıradaki tura kalır.
+        """
+        if _changes:
+            changes = dict(_changes, **changes)
+        with self._write_lock:
+            old = self._current
+            new, changed = old.replace(changes)
+            if not changed:
+                return old
+            self._current = new
+            self._notify(old, new, changed)
+            return self._current
+
+    def renotify(self, *keys: str) -> None:
+        """İlgili aboneleri o anki görüntüyle yeniden çağırır (örn. şampiyon kataloğu sonradan hazır olunca)."""
+        with self._write_lock:
+            cur = self._current
+            self._notify(cur, cur, frozenset(keys))
+
+    def _notify(self, old: Config, new: Config, changed: frozenset) -> None:
+        # _write_lock tutuluyken çağrılır
+        self._pending.append((old, new, changed))
+        if self._notifying:
+            return
+        self._notifying = True
+        try:
+            while self._pending:
+                old, new, changed = self._pending.pop(0)
+                for fn, keys in list(self._subs):
+                    if keys is not None and not (keys & changed):
+                        continue
+                    try:
+                        fn(old, new, changed)
+                    except Exception as e:
+                        log_once("CFG", f"abone hatası ({getattr(fn, '__name__', fn)}): {e}")
+        finally:
+            self._notifying = False
+
+    def subscribe(self, fn: Subscriber, keys: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """fn(old, new, changed) — keys verilirse yalnızca bu anahtarlar değişince. Aboneliği iptal eden fonksiyon döner."""
+        entry = (fn, frozenset(keys) if keys is not None else None)
+        with self._write_lock:
+            self._subs.append(entry)
+
+        def _unsubscribe():
+            with self._write_lock:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+        return _unsubscribe
+
+
+def as_store(cfg: Any) -> ConfigStore:
+    """dict veya ConfigStore kabul eden API'ler için."""
+    return cfg if isinstance(cfg, ConfigStore) else ConfigStore(dict(cfg or {}))
@@ -0,0 +1,389 @@
+"""Headless (daemon) mod için yerel HTTP kontrol API'si + SSE durum akışı.
+
+Her CLI komutu HTTP üzerinden çalıştırılabilir; çıktı satırları JSON olarak döner.
+UI (dashboard) durumu yoklamak yerine /api/events'e bağlanır ve yalnızca değişen
+alanları (gameflow, lobby, arama durumu, cfg) Server-Sent Events olarak alır.
+
+Uçlar:
+    GET  /api/status                      -> {"me":..., "state":{...}, "cfg":{...}}
+    GET  /api/commands                    -> CLI yardım satırları
+    POST /api/command   {"cmd": "/auto-ready on"}
+    POST /api/<komut>   {"args": "on"}    -> "/<komut> on" ile aynı (örn. /api/auto-pick)
+    GET  /api/events                      -> text/event-stream
+         event: snapshot  data: {...tam durum...}
+         event: state     data: {...yalnızca değişen alanlar...}
+
+Komut yanıtı: {"ok": true, "output": ["satır", ...]} (tanınmayan komutta 404, ok=false).
+
+API_TOKEN ayarlıysa her istekte "Authorization: Bearer <token>" beklenir
+(EventSource başlık gönderemediği için /api/events ?token=... da kabul eder).
+
+Tarayıcıdaki yabancı sayfalara karşı (CSRF / DNS rebinding):
+  - POST gövdesi "Content-Type: application/json" olmalı (aksi halde 415); böylece
+    form/text/plain gibi ön-kontrolsüz (preflight'sız) istekler komut çalıştıramaz;
+  - Origin başlığı olan istek yalnızca API_CORS_ORIGIN ile birebir eşleşirse kabul
+    edilir (403); CORS başlığı da yalnızca bu origin'e gönderilir, joker (*) yok;
+  - token yoksa Host başlığı yerel bir ad (127.0.0.1, localhost, ::1) ya da dinlenen
+    adres olmalı (403).
+
+Kullanım:
+    DAEMON=1 HTTP_LISTEN=127.0.0.1:8787 python main.py
+    curl -s localhost:8787/api/command -H 'Content-Type: application/json' -d '{"cmd":"/auto-ready on"}'
+    curl -N localhost:8787/api/events
+"""
+from __future__ import annotations
+import hmac, json, queue, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils import log_once
+from config import ConfigStore
+
+STATE_INTERVAL = 1.0   # sn — abone varken durum yoklama aralığı
+KEEPALIVE = 15.0       # sn — SSE yorum satırı (proxy/tarayıcı zaman aşımına karşı)
+MAX_BODY = 64 * 1024
+SUB_QUEUE = 256        # yavaş istemci bu kadar olay biriktirirse düşürülür
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+Executor = Callable[[str, Callable[[str], None]], bool]
+
+
+def _json_safe(obj: Any) -> Any:
+    return json.loads(json.dumps(obj, ensure_ascii=False, default=str))
+
+
+class StateHub:
+    """ChatService durumunu yoklar, önceki görüntüyle karşılaştırır, farkları abonelere dağıtır.
+
+    Abone yokken LCU'ya istek atılmaz.
+    """
+
+    def __init__(self, cs, cfg: Optional[ConfigStore] = None, interval: float = STATE_INTERVAL):
+        self.cs = cs
+        self.cfg = cfg
+        self.interval = interval
+        self._lock = threading.Condition()
+        self._subs: List[queue.Queue] = []
+        self._state: Dict[str, Any] = {}
+        self._seq = 0
+        if cfg is not None:  # cfg değişikliği bir sonraki yoklamayı beklemeden yayınlansın
+            cfg.subscribe(lambda *_: self.poke())
+        threading.Thread(target=self._loop, name="state-hub", daemon=True).start()
+
+    def snapshot(self) -> Dict[str, Any]:
+        cs = self.cs
+        lob = cs._lobby() or {}
+        search = cs._lget("/lol-lobby/v2/lobby/matchmaking/search-state") or {}
+        return _json_safe({
+            "phase": cs.gameflow_phase(),
+            "lobby": {
+                "id": cs._lobby_id_any(lob) if lob else None,
+                "members": sorted((m.get("summonerName") or m.get("gameName") or "")
+                                  for m in (lob.get("members") or [])),
+                "leader": bool((lob.get("localMember") or {}).get("isLeader")),
+                "queue": (lob.get("gameConfig") or {}).get("queueId"),
+                "group": cs.active_group_id,
+            },
+            "search": {"state": search.get("searchState"), "time": search.get("timeInQueue")},
+            "cfg": dict(self.cfg.snapshot()) if self.cfg is not None else {},
+        })
+
+    def state(self) -> Dict[str, Any]:
+        """Son bilinen tam durum; hiç yoklanmadıysa anlık olarak hesaplanır."""
+        return self.current() or self.snapshot()
+
+    def subscribe(self) -> queue.Queue:
+        """İlk olay her zaman tam görüntüdür (snapshot); sonrakiler yalnızca fark."""
+        q: queue.Queue = queue.Queue(maxsize=SUB_QUEUE)
+        with self._lock:
+            if self._state:
+                q.put_nowait((self._seq, "snapshot", dict(self._state)))
+            # durum yoksa hub'ın ilk yoklaması snapshot olarak yayınlanır
+            self._subs.append(q)
+            self._lock.notify_all()
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            if q in self._subs:
+                self._subs.remove(q)
+
+    def poke(self) -> None:
+        """Bir komut durumu değiştirmiş olabilir; beklemeden yeniden yokla."""
+        with self._lock:
+            self._lock.notify_all()
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return dict(self._state) if self._state else None
+
+    def _publish(self, name: str, data: Dict[str, Any]) -> None:
+        # çağıran self._lock'u tutar
+        self._seq += 1
+        ev = (self._seq, name, data)
+        for q in list(self._subs):
+            try:
+                q.put_nowait(ev)
+            except queue.Full:
+                self._subs.remove(q)
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                q.put_nowait(None)  # yavaş istemci: akışı kapat
+                log_once("API", "SSE istemcisi yetişemedi; bağlantı kapatılıyor.")
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._subs:
+                    self._state = {}  # abone yok: bayat durum tutma
+                    self._lock.wait()
+            try:
+                snap = self.snapshot()
+                with self._lock:
+                    full = not self._state
+                    diff = {k: v for k, v in snap.items() if self._state.get(k) != v}
+                    self._state = snap
+                    if diff:
+                        self._publish("snapshot" if full else "state", diff)
+            except Exception as e:
+                log_once("API", f"durum err: {e}")
+            with self._lock:
+                self._lock.wait(self.interval)
+
+
+class ControlApi:
+    """execute(cmd, out) -> bool: main.execute_cli_command'ı saran çağrı (döngüsel import yok)."""
+
+    def __init__(self, cs, cfg: ConfigStore, execute: Executor, host: str = "127.0.0.1", port: int = 8787,
+                 token: str = "", help_fn: Optional[Callable[[Callable[[str], None]], None]] = None,
+                 on_quit: Optional[Callable[[], None]] = None, cors_origin: str = ""):
+        self.cs = cs
+        self.cfg = cfg
+        self.execute = execute
+        self.host = host
+        self.port = port
+        self.token = token or ""
+        self.help_fn = help_fn
+        self.on_quit = on_quit
+        self.cors_origin = (cors_origin or "").rstrip("/")   # ör. http://localhost:5173 (dashboard)
+        self.hub = StateHub(cs, cfg)
+        self._cmd_lock = threading.Lock()  # CLI ile aynı sırayla, tek tek çalıştır
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    # ---------- komutlar ----------
+    def run_command(self, cmd: str) -> Tuple[int, Dict[str, Any]]:
+        """(HTTP kodu, yanıt) döner: 200 tamam, 404 bilinmeyen komut, 500 komut hatası."""
+        lines: List[str] = []
+        with self._cmd_lock:
+            try:
+                ok = self.execute(cmd, lambda s: lines.append(str(s)))
+            except Exception as e:
+                log_once("API", f"komut err ({cmd}): {e}")
+                return 500, {"ok": False, "error": str(e), "output": lines}
+        self.hub.poke()
+        if not ok:
+            return 404, {"ok": False, "error": f"bilinmeyen komut: {cmd}", "output": lines}
+        return 200, {"ok": True, "output": lines}
+
+    def status(self) -> Dict[str, Any]:
+        return _json_safe({"me": self.cs.ME, "state": self.hub.state(), "cfg": dict(self.cfg.snapshot())})
+
+    def help_lines(self) -> List[str]:
+        lines: List[str] = []
+        if self.help_fn:
+            self.help_fn(lines.append)
+        return lines
+
+    # ---------- sunucu ----------
+    def start_in_thread(self) -> "ControlApi":
+        api = self
+
+        class Handler(_Handler):
+            pass
+        Handler.api = api
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name="control-api", daemon=True).start()
+        log_once("API", f"HTTP kontrol API: http://{self.host}:{self.port}/api "
+                        f"({'token gerekli' if self.token else 'kimlik doğrulama yok'})")
+        return self
+
+    def stop(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: ControlApi
+    protocol_version = "HTTP/1.1"
+    server_version = "lol-control/1"
+
+    def log_message(self, fmt, *args):  # http.server'ın stderr gürültüsünü kapat
+        pass
+
+    # ---------- yardımcılar ----------
+    def _send_json(self, code: int, obj: Any) -> None:
+        body = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self._cors()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _cors(self) -> None:
+        origin = self.api.cors_origin
+        if origin and self.headers.get("Origin") == origin:
+            self.send_header("Access-Control-Allow-Origin", origin)
+            self.send_header("Vary", "Origin")
+
+    def _origin_ok(self) -> bool:
+        """Tarayıcıdan gelen yabancı sayfa isteklerini ayıklar (Origin/Host kontrolü)."""
+        origin = self.headers.get("Origin")
+        if origin is not None and origin.rstrip("/") != self.api.cors_origin:
+            return False   # "null" (sandbox/file://) dahil her yabancı origin
+        if self.api.token:
+            return True
+        host = urlsplit("//" + (self.headers.get("Host") or "")).hostname or ""
+        return host in LOCAL_HOSTS or host == self.api.host.strip("[]")
+
+    def _authorized(self, query: Dict[str, List[str]]) -> bool:
+        token = self.api.token
+        if not token:
+            return True
+        auth = self.headers.get("Authorization", "")
+        given = auth[7:] if auth.startswith("Bearer ") else (query.get("token") or [""])[0]
+        return hmac.compare_digest(given.encode(), token.encode())
+
+    def _read_json(self) -> dict:
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY:
+            raise ValueError("istek gövdesi çok büyük")
+        raw = self.rfile.read(n) if n else b""
+        if not raw.strip():
+            return {}
+        data = json.loads(raw.decode("utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("gövde bir JSON nesnesi olmalı")
+        return data
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path.rstrip("/")
+        if not path.startswith("/api"):
+            self._send_json(404, {"ok": False, "error": "bulunamadı"})
+            return None, None
+        if not self._origin_ok():
+            self._send_json(403, {"ok": False, "error": "izin verilmeyen origin/host"})
+            return None, None
+        if not self._authorized(query):
+            self._send_json(401, {"ok": False, "error": "yetkisiz"})
+            return None, None
+        return path[4:].lstrip("/"), query
+
+    # ---------- metotlar ----------
+    def do_OPTIONS(self):
+        if not self._origin_ok():
+            self._send_json(403, {"ok": False, "error": "izin verilmeyen origin/host"})
+            return
+        self.send_response(204)
+        self._cors()
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        name, _query = self._route()
+        if name is None:
+            return
+        try:
+            if name in ("", "status"):
+                self._send_json(200, self.api.status())
+            elif name == "commands":
+                self._send_json(200, {"ok": True, "output": self.api.help_lines()})
+            elif name == "events":
+                self._stream_events()
+            else:
+                self._send_json(405, {"ok": False, "error": "komutlar POST ile çalıştırılır"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            log_once("API", f"GET {self.path} err: {e}")
+            self._send_json(500, {"ok": False, "error": str(e)})
+
+    def do_POST(self):
+        name, _query = self._route()
+        if name is None:
+            return
+        ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if ctype != "application/json":
+            self._send_json(415, {"ok": False, "error": "Content-Type: application/json gerekli"})
+            return
+        try:
+            body = self._read_json()
+        except Exception as e:
+            self._send_json(400, {"ok": False, "error": f"geçersiz JSON: {e}"})
+            return
+        if name == "command":
+            cmd = str(body.get("cmd") or "").strip()
+        else:
+            args = body.get("args", "")
+            if isinstance(args, (list, tuple)):
+                args = " ".join(str(a) for a in args)
+            cmd = f"/{name} {args}".strip()
+        if not cmd:
+            self._send_json(400, {"ok": False, "error": "cmd boş"})
+            return
+        if cmd.lower() in ("quit", "exit", "stop", "dur", "bitir", "/quit"):
+            self._send_json(200, {"ok": True, "output": ["kapatılıyor"]})
+            if self.api.on_quit:
+                self.api.on_quit()
+            return
+        code, res = self.api.run_command(cmd)
+        self._send_json(code, res)
+
+    def _stream_events(self) -> None:
+        hub = self.api.hub
+        q = hub.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "keep-alive")
+            self._cors()
+            self.end_headers()
+            self.close_connection = True
+            while True:
+                try:
+                    ev = q.get(timeout=KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if ev is None:
+                    return
+                seq, name, data = ev
+                self._event(name, data, seq)
+        finally:
+            hub.unsubscribe(q)
+
+    def _event(self, name: str, data: Any, seq: Optional[int] = None) -> None:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+        head = f"id: {seq}\n" if seq is not None else ""
+        self.wfile.write(f"{head}event: {name}\ndata: {payload}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def start_control_api(cs, cfg: ConfigStore, execute: Executor, listen: str, token: str = "",
+                      help_fn=None, on_quit=None, cors_origin: str = "") -> ControlApi:
+    host, _, port = listen.rpartition(":")
+    return ControlApi(cs, cfg, execute, host=host or "127.0.0.1", port=int(port or 8787),
+                      token=token, help_fn=help_fn, on_quit=on_quit,
+                      cors_origin=cors_origin).start_in_thread()
@@ -0,0 +1,86 @@
+"""Watcher imleçlerinin (cursor) kalıcı saklanması.
+
+DM ve grup watcher'ları her sohbet için en son işledikleri mesajın (timestamp, message id)
+çiftini burada tutar. Değişiklikler bellekte birikir, arka plan thread'i belirli aralıklarla
+(ve çıkışta) küçük bir JSON dosyasına atomik olarak yazar. Yeniden başlatmada watcher'lar
+kaldıkları yerden devam eder; son 120 sn / son 50 mesaj tekrar işlenmez.
+
+Dosya biçimi: {"dm": {"<conv_id>": [ts, "mid"]}, "grp": {...}}
+"""
+from __future__ import annotations
+import atexit, json, os, threading, time
+from typing import Optional, Dict, Tuple
+from utils import log_once
+
+Cursor = Tuple[float, Optional[str]]
+
+
+class CursorStore:
+    FLUSH_INTERVAL = 2.0  # sn
+
+    def __init__(self, path: str = "watch_state.json", flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._data: Dict[str, Dict[str, list]] = self._load()
+        self._dirty = False
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _load(self) -> Dict[str, Dict[str, list]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                n = sum(len(v) for v in data.values() if isinstance(v, dict))
+                log_once("CURSOR", f"{n} imleç yüklendi ({self.path})")
+                return {k: v for k, v in data.items() if isinstance(v, dict)}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_once("CURSOR", f"okunamadı ({self.path}): {e}")
+        return {}
+
+    def get(self, kind: str, conv_id: str) -> Optional[Cursor]:
+        with self._lock:
+            v = (self._data.get(kind) or {}).get(conv_id)
+        if not v:
+            return None
+        try:
+            return float(v[0]), (None if v[1] is None else str(v[1]))
+        except Exception:
+            return None
+
+    def set(self, kind: str, conv_id: str, ts: float, mid=None) -> None:
+        val = [float(ts or 0.0), None if mid is None else str(mid)]
+        with self._lock:
+            bucket = self._data.setdefault(kind, {})
+            if bucket.get(conv_id) != val:
+                bucket[conv_id] = val
+                self._dirty = True
+
+    def flush(self) -> bool:
+        """Değişiklik varsa dosyaya atomik olarak yazar (tmp + os.replace)."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            payload = json.dumps(self._data, ensure_ascii=False, separators=(",", ":"))
+            self._dirty = False
+        tmp = f"{self.path}.tmp"
+        try:
+            with self._io_lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, self.path)
+            return True
+        except Exception as e:
+            log_once("CURSOR", f"yazılamadı ({self.path}): {e}")
+            with self._lock:
+                self._dirty = True
+            return False
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
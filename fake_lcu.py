@@ -0,0 +1,423 @@
+"""Bellek içi sahte LCU (League Client API) — ağ ve League istemcisi olmadan test için.
+
+FakeLcu, LcuSession ile aynı arayüzü sunar (get() → (session, base)); dönen session
+objesi requests.Session gibi get/post/put/patch/delete kabul eder ve ChatService'in
+kullandığı uç noktaları bellek içi duruma göre yanıtlar.
+
+    lcu = FakeLcu(name="Agent1")
+    cs = ChatService(lcu)
+    lcu.add_group("lobby@champ-select.pvp.net", members=["Ali", "Veli"])
+    lcu.inject_message("lobby@champ-select.pvp.net", "BASLAT", sender="Ali")
+"""
+from __future__ import annotations
+import hashlib, json, re, threading, time, uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Any, Callable, Tuple
+from urllib.parse import unquote
+
+DEFAULT_CHAMPIONS = [
+    (1, "Annie"), (22, "Ashe"), (35, "Shaco"), (17, "Teemo"), (48, "Trundle"),
+    (103, "Ahri"), (55, "Katarina"), (86, "Garen"), (99, "Lux"), (222, "Jinx"),
+]
+
+
+def iso_now(offset: float = 0.0) -> str:
+    t = datetime.fromtimestamp(time.time() + offset, timezone.utc)
+    return t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}Z"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: Any = None):
+        self.status_code = status_code
+        self._body = body
+        self.content = b"" if body is None else json.dumps(body).encode()
+        self.text = self.content.decode()
+        self.headers: Dict[str, str] = {"Content-Type": "application/json"}
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("empty body")
+        return json.loads(self.content)
+
+
+class _FakeHttp:
+    """requests.Session taklidi; tüm çağrıları FakeLcu.handle'a yönlendirir."""
+
+    def __init__(self, lcu: "FakeLcu"):
+        self.lcu = lcu
+        self.headers: Dict[str, str] = {}
+        self.verify = False
+
+    def request(self, method: str, url: str, json=None, data=None, params=None, timeout=None, headers=None, **_):
+        return self.lcu.handle(method.upper(), url, json, params, headers)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+
+class FakeLcu:
+    BASE = "https://127.0.0.1:0"
+
+    def __init__(self, name: str = "FakeSummoner", summoner_id: int = 1001, puuid: Optional[str] = None,
+                 champions: Optional[List[Tuple[int, str]]] = None, latency: float = 0.0,
+                 etags: bool = False):
+        self.lock = threading.RLock()
+        self.online = True
+        self.latency = latency
+        # etags=True: GET yanıtlarına ETag ekler, If-None-Match eşleşirse 304 döner
+        # (gerçek LCU bunu garanti etmez; varsayılan kapalı)
+        self.etags = etags
+        self.me = {"displayName": name, "gameName": name, "summonerId": summoner_id,
+                   "puuid": puuid or uuid.uuid4().hex}
+        self.availability = "chat"
+        self.phase = "None"
+        self.friends: List[dict] = []
+        self.conversations: Dict[str, dict] = {}
+        self.messages: Dict[str, List[dict]] = {}
+        self.participants: Dict[str, List[dict]] = {}
+        self.lobby: Optional[dict] = None
+        self.search_state = {"searchState": "Invalid"}
+        self.ready_check: dict = {}
+        self.cs_session: dict = {}
+        self.pickable: List[int] = []
+        self.bannable: List[int] = []
+        self.queue_id = 420
+        self.champions = champions or list(DEFAULT_CHAMPIONS)
+        self.requests: List[Tuple[float, str, str, Any]] = []  # (ts, method, path, json)
+        self._seq = 0
+        self._http = _FakeHttp(self)
+        self._routes: List[Tuple[str, "re.Pattern", Callable]] = []
+        self._build_routes()
+
+    # ---- LcuSession arayüzü ----
+    def get(self):
+        if not self.online:
+            return None, None
+        return self._http, self.BASE
+
+    # ---- senaryo yardımcıları ----
+    def _next_id(self) -> str:
+        self._seq += 1
+        return str(self._seq)
+
+    def add_friend(self, name: str, availability: str = "chat", puuid: Optional[str] = None) -> dict:
+        puuid = puuid or uuid.uuid4().hex
+        f = {"name": name, "gameName": name, "puuid": puuid, "pid": f"{puuid}@pvp.net",
+             "summonerId": 5000 + len(self.friends), "availability": availability}
+        with self.lock:
+            self.friends.append(f)
+        return f
+
+    def add_dm(self, friend: dict) -> str:
+        cid = friend["pid"]
+        with self.lock:
+            self.conversations[cid] = {"id": cid, "type": "chat", "name": friend["name"]}
+            self.messages.setdefault(cid, [])
+        return cid
+
+    def add_group(self, conv_id: str, members: Optional[List[str]] = None, name: str = "") -> str:
+        with self.lock:
+            self.conversations[conv_id] = {"id": conv_id, "type": "groupchat", "name": name or conv_id}
+            self.messages.setdefault(conv_id, [])
+            parts = [{"name": self.me["displayName"], "pid": f"{self.me['puuid']}@pvp.net"}]
+            for m in members or []:
+                f = next((x for x in self.friends if x["name"] == m), None) or self.add_friend(m)
+                parts.append({"name": m, "pid": f["pid"]})
+            self.participants[conv_id] = parts
+        return conv_id
+
+    def inject_message(self, conv_id: str, body: str, sender: str = "Someone", is_self: bool = False,
+                       ts: Optional[str] = None) -> dict:
+        with self.lock:
+            f = next((x for x in self.friends if x["name"] == sender), None)
+            m = {
+                "id": self._next_id(),
+                "body": body,
+                "timestamp": ts or iso_now(),
+                "type": "groupchat" if self.conversations.get(conv_id, {}).get("type") == "groupchat" else "chat",
+                "isSelf": is_self,
+                "fromSummonerName": self.me["displayName"] if is_self else sender,
+                "fromSummonerId": self.me["summonerId"] if is_self else (f or {}).get("summonerId", 9999),
+                "fromPid": f"{self.me['puuid']}@pvp.net" if is_self else (f or {}).get("pid", ""),
+            }
+            self.messages.setdefault(conv_id, []).append(m)
+        return m
+
+    def create_lobby(self, members: Optional[List[str]] = None, leader: bool = True, queue_id: int = 420) -> dict:
+        with self.lock:
+            mems = [{"summonerName": self.me["displayName"], "summonerId": self.me["summonerId"],
+                     "puuid": self.me["puuid"], "isLeader": leader}]
+            for nm in members or []:
+                f = next((x for x in self.friends if x["name"] == nm), None) or self.add_friend(nm)
+                mems.append({"summonerName": nm, "summonerId": f["summonerId"], "puuid": f["puuid"], "isLeader": False})
+            self.queue_id = queue_id
+            self.lobby = {"partyId": uuid.uuid4().hex, "gameConfig": {"queueId": queue_id},
+                          "localMember": mems[0], "members": mems}
+            self.phase = "Lobby"
+        return self.lobby
+
+    def start_ready_check(self) -> None:
+        with self.lock:
+            self.phase = "ReadyCheck"
+            self.ready_check = {"state": "InProgress", "playerResponse": "None", "timer": 0}
+
+    def start_champ_select(self, bench: Optional[List[int]] = None, my_champion: int = 0,
+                           pickable: Optional[List[int]] = None, ban_phase: bool = False,
+                           position: str = "", queue_id: Optional[int] = None,
+                           ally_locked: Optional[List[int]] = None, ally_intent: Optional[List[int]] = None,
+                           enemy_locked: Optional[List[int]] = None, banned: Optional[List[int]] = None,
+                           bannable: Optional[List[int]] = None) -> dict:
+        """Kendi hücrem 0; takım arkadaşları 1.., rakipler 5.. hücrelerinde kilitli/hover seçimlerle başlar."""
+        with self.lock:
+            self.phase = "ChampSelect"
+            if queue_id is not None:
+                self.queue_id = queue_id
+            self.pickable = list(pickable if pickable is not None else [c for c, _ in self.champions])
+            self.bannable = list(bannable if bannable is not None else [c for c, _ in self.champions])
+            my_team = [{"cellId": 0, "championId": my_champion, "assignedPosition": position,
+                        "puuid": self.me["puuid"]}]
+            their_team: List[dict] = []
+            done: List[dict] = []
+            aid = 100
+            for i, cid in enumerate(ally_locked or [], 1):
+                my_team.append({"cellId": i, "championId": cid, "championPickIntent": 0, "assignedPosition": ""})
+                done.append({"id": aid + i, "actorCellId": i, "type": "pick", "isInProgress": False,
+                             "completed": True, "championId": cid})
+            base = len(my_team)
+            for i, cid in enumerate(ally_intent or [], base):
+                my_team.append({"cellId": i, "championId": 0, "championPickIntent": cid, "assignedPosition": ""})
+            for i, cid in enumerate(enemy_locked or [], 5):
+                their_team.append({"cellId": i, "championId": cid})
+                done.append({"id": aid + i, "actorCellId": i, "type": "pick", "isInProgress": False,
+                             "completed": True, "championId": cid})
+            actions: List[List[dict]] = [done] if done else []
+            if ban_phase:
+                actions.append([{"id": 1, "actorCellId": 0, "type": "ban", "isInProgress": True,
+                                 "completed": False, "championId": 0}])
+            actions.append([{"id": 2, "actorCellId": 0, "type": "pick", "isInProgress": not ban_phase,
+                             "completed": False, "championId": my_champion}])
+            self.cs_session = {
+                "localPlayerCellId": 0,
+                "actions": actions,
+                "myTeam": my_team,
+                "theirTeam": their_team,
+                "benchChampions": [{"championId": c} for c in (bench or [])],
+                "benchEnabled": bench is not None,
+                "bans": {"myTeamBans": [], "theirTeamBans": list(banned or [])},
+                "timer": {"phase": "BAN_PICK" if ban_phase else "PLANNING"},
+            }
+        return self.cs_session
+
+    def set_bench(self, champion_ids: List[int]) -> None:
+        with self.lock:
+            self.cs_session["benchChampions"] = [{"championId": c} for c in champion_ids]
+
+    def play_bench_script(self, steps: List[Tuple[float, str, int]]) -> threading.Thread:
+        """Senaryolu bench dizisi: (t0'dan itibaren sn, "add"|"remove", championId).
+
+        "remove" başka bir oyuncunun o şampiyonu almasıdır; şampiyon artık bench'te değilse
+        (örn. biz swap ettiysek) etkisizdir. Her adım bench_log'a (perf_counter, op, id, etkili) yazılır.
+        """
+        self.bench_log: List[Tuple[float, str, int, bool]] = []
+
+        def _run():
+            t0 = time.perf_counter()
+            for at, op, cid in sorted(steps, key=lambda x: x[0]):
+                delay = t0 + at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                with self.lock:
+                    bench = self.cs_session.setdefault("benchChampions", [])
+                    present = any(int(x.get("championId") or 0) == cid for x in bench)
+                    if op == "add" and not present:
+                        bench.append({"championId": cid})
+                    elif op == "remove" and present:
+                        self.cs_session["benchChampions"] = [x for x in bench if int(x.get("championId") or 0) != cid]
+                    self.bench_log.append((time.perf_counter(), op, cid, present if op == "remove" else not present))
+
+        t = threading.Thread(target=_run, daemon=True)
+        t.start()
+        return t
+
+    def my_champion(self) -> int:
+        with self.lock:
+            for m in self.cs_session.get("myTeam") or []:
+                if m.get("cellId") == self.cs_session.get("localPlayerCellId"):
+                    return int(m.get("championId") or 0)
+        return 0
+
+    # ---- HTTP yönlendirme ----
+    def _build_routes(self) -> None:
+        r = self._routes.append
+        r(("GET", re.compile(r"^/lol-summoner/v1/current-summoner$"), lambda m, b: (200, dict(self.me))))
+        r(("GET", re.compile(r"^/lol-chat/v1/me$"), lambda m, b: (200, {
+            "name": self.me["displayName"], "gameName": self.me["displayName"], "puuid": self.me["puuid"],
+            "summonerId": self.me["summonerId"], "availability": self.availability})))
+        r(("GET", re.compile(r"^/lol-chat/v1/friends$"), lambda m, b: (200, [dict(f) for f in self.friends])))
+        r(("GET", re.compile(r"^/lol-chat/v1/conversations$"), lambda m, b: (200, list(self.conversations.values()))))
+        r(("POST", re.compile(r"^/lol-chat/v1/conversations$"), self._r_create_conv))
+        r(("GET", re.compile(r"^/lol-chat/v1/conversations/([^/]+)/messages$"), self._r_get_messages))
+        r(("POST", re.compile(r"^/lol-chat/v1/conversations/([^/]+)/messages$"), self._r_post_message))
+        r(("GET", re.compile(r"^/lol-chat/v1/conversations/([^/]+)/participants$"),
+           lambda m, b: (200, list(self.participants.get(unquote(m.group(1)), [])))))
+        r(("GET", re.compile(r"^/lol-lobby/v2/lobby$"), lambda m, b: (200, self.lobby) if self.lobby else (404, {})))
+        r(("POST", re.compile(r"^/lol-lobby/v2/lobby/matchmaking/search$"), self._r_search_start))
+        r(("DELETE", re.compile(r"^/lol-lobby/v2/lobby/matchmaking/search$"), self._r_search_stop))
+        r(("GET", re.compile(r"^/lol-lobby/v2/lobby/matchmaking/search-state$"), lambda m, b: (200, dict(self.search_state))))
+        r(("DELETE", re.compile(r"^/lol-lobby/v2/lobby/members/(\d+)$"), self._r_kick))
+        r(("POST", re.compile(r"^/lol-lobby/v2/lobby/members/(\d+)/promote$"), self._r_promote))
+        r(("GET", re.compile(r"^/lol-gameflow/v1/gameflow-phase$"), lambda m, b: (200, self.phase)))
+        r(("GET", re.compile(r"^/lol-matchmaking/v1/ready-check$"),
+           lambda m, b: (200, dict(self.ready_check)) if self.ready_check else (404, {})))
+        r(("POST", re.compile(r"^/lol-matchmaking/v1/ready-check/accept$"), lambda m, b: self._r_ready("Accepted")))
+        r(("POST", re.compile(r"^/lol-matchmaking/v1/ready-check/decline$"), lambda m, b: self._r_ready("Declined")))
+        r(("GET", re.compile(r"^/lol-champ-select/v1/session$"),
+           lambda m, b: (200, json.loads(json.dumps(self.cs_session))) if self.cs_session else (404, {})))
+        r(("GET", re.compile(r"^/lol-champ-select/v1/pickable-champion-ids$"), lambda m, b: (200, list(self.pickable))))
+        r(("GET", re.compile(r"^/lol-champ-select/v1/bannable-champion-ids$"), lambda m, b: (200, list(self.bannable))))
+        r(("GET", re.compile(r"^/lol-gameflow/v1/session$"), lambda m, b: (200, {
+            "phase": self.phase, "gameData": {"queue": {"id": self.queue_id}}})))
+        r(("PATCH", re.compile(r"^/lol-champ-select/v1/session/actions/(\d+)$"), self._r_action_patch))
+        r(("POST", re.compile(r"^/lol-champ-select/v1/session/actions/(\d+)/complete$"), self._r_action_complete))
+        r(("POST", re.compile(r"^/lol-champ-select/v1/session/bench/swap/(\d+)$"), self._r_bench_swap))
+        r(("GET", re.compile(r"^/lol-game-data/assets/v1/champion-summary\.json$"), lambda m, b: (200, [
+            {"id": cid, "name": nm, "alias": nm.replace(" ", "")} for cid, nm in self.champions])))
+        r(("GET", re.compile(r"^/lol-geoinfo/v1/getlocation$"),
+           lambda m, b: (200, {"region": "TR", "country": "TR", "locale": "tr_TR"})))
+
+    def handle(self, method: str, url: str, body: Any = None, params: Optional[dict] = None,
+               headers: Optional[dict] = None) -> FakeResponse:
+        path = url[len(self.BASE):] if url.startswith(self.BASE) else url
+        path = path.split("?", 1)[0]
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests.append((time.time(), method, path, body))
+            for meth, rx, fn in self._routes:
+                if meth != method:
+                    continue
+                m = rx.match(path)
+                if m:
+                    code, out = fn(m, body)
+                    resp = FakeResponse(code, out)
+                    if self.etags and method == "GET" and code == 200:
+                        etag = '"' + hashlib.blake2b(resp.content, digest_size=8).hexdigest() + '"'
+                        if (headers or {}).get("If-None-Match") == etag:
+                            resp = FakeResponse(304)
+                        resp.headers["ETag"] = etag
+                    return resp
+        return FakeResponse(404, {"errorCode": "RPC_ERROR", "message": f"no route {method} {path}"})
+
+    def _r_create_conv(self, m, b):
+        cid = (b or {}).get("id") or ""
+        if cid and cid not in self.conversations:
+            self.conversations[cid] = {"id": cid, "type": (b or {}).get("type") or "chat", "name": cid}
+            self.messages.setdefault(cid, [])
+        return 200, self.conversations.get(cid, {})
+
+    def _r_get_messages(self, m, b):
+        cid = unquote(m.group(1))
+        if cid not in self.messages:
+            return 404, {}
+        return 200, [dict(x) for x in self.messages[cid]]
+
+    def _r_post_message(self, m, b):
+        cid = unquote(m.group(1))
+        if cid not in self.conversations:
+            return 404, {}
+        return 200, self.inject_message(cid, (b or {}).get("body") or "", is_self=True)
+
+    def _r_search_start(self, m, b):
+        if not self.lobby:
+            return 404, {}
+        self.search_state = {"searchState": "Searching"}
+        self.phase = "Matchmaking"
+        return 204, None
+
+    def _r_search_stop(self, m, b):
+        self.search_state = {"searchState": "Invalid"}
+        if self.phase == "Matchmaking":
+            self.phase = "Lobby"
+        return 204, None
+
+    def _r_kick(self, m, b):
+        sid = int(m.group(1))
+        if not self.lobby:
+            return 404, {}
+        before = len(self.lobby["members"])
+        self.lobby["members"] = [x for x in self.lobby["members"] if int(x["summonerId"]) != sid]
+        return (204, None) if len(self.lobby["members"]) < before else (404, {})
+
+    def _r_promote(self, m, b):
+        sid = int(m.group(1))
+        if not self.lobby:
+            return 404, {}
+        for x in self.lobby["members"]:
+            x["isLeader"] = int(x["summonerId"]) == sid
+        return 204, None
+
+    def _r_ready(self, resp: str):
+        if not self.ready_check:
+            return 404, {}
+        self.ready_check["playerResponse"] = resp
+        return 204, None
+
+    def _find_action(self, aid: int) -> Optional[dict]:
+        for row in self.cs_session.get("actions") or []:
+            for a in row:
+                if int(a.get("id")) == aid:
+                    return a
+        return None
+
+    def _set_my_champion(self, cid: int) -> None:
+        for mt in self.cs_session.get("myTeam") or []:
+            if mt.get("cellId") == self.cs_session.get("localPlayerCellId"):
+                mt["championId"] = cid
+
+    def _r_action_patch(self, m, b):
+        a = self._find_action(int(m.group(1)))
+        if not a or a.get("completed"):
+            return 404, {}
+        a["championId"] = int((b or {}).get("championId") or 0)
+        if a.get("type") == "pick":
+            self._set_my_champion(a["championId"])
+        return 204, None
+
+    def _r_action_complete(self, m, b):
+        a = self._find_action(int(m.group(1)))
+        if not a or a.get("completed") or not a.get("isInProgress"):
+            return 404, {}
+        if b and b.get("championId"):
+            a["championId"] = int(b["championId"])
+        a["completed"], a["isInProgress"] = True, False
+        if a.get("type") == "ban":
+            self.cs_session.setdefault("bans", {}).setdefault("myTeamBans", []).append(a["championId"])
+            for row in self.cs_session.get("actions") or []:
+                for nxt in row:
+                    if nxt.get("type") == "pick" and not nxt.get("completed"):
+                        nxt["isInProgress"] = True
+        return 204, None
+
+    def _r_bench_swap(self, m, b):
+        cid = int(m.group(1))
+        bench = self.cs_session.get("benchChampions") or []
+        if not any(int(x.get("championId") or 0) == cid for x in bench):
+            return 404, {}
+        mine = self.my_champion()
+        self.cs_session["benchChampions"] = [x for x in bench if int(x.get("championId") or 0) != cid]
+        if mine:
+            self.cs_session["benchChampions"].append({"championId": mine})
+        self._set_my_champion(cid)
+        return 204, None
@@ -0,0 +1,116 @@
+"""Takılabilir JSON codec: orjson → msgspec → stdlib json.
+
+LCU yanıtları (champ-select session, arkadaş listesi, mesaj geçmişi) saniyede
+onlarca kez çözülür. Bu modül kurulu olan en hızlı kütüphaneyi seçer; hiçbiri
+yoksa standart kütüphaneye düşer. Seçimi JSON_CODEC=orjson|msgspec|json zorlar.
+
+    from json_codec import loads, dumps, decode_response, loads_models
+    data = decode_response(r)                 # r.json() yerine (ham baytlardan)
+    msgs = loads_models(body, Message.from_raw, me)   # bayt → [Message, ...]
+    blob = dumps(obj)                         # kompakt UTF-8 bayt
+    blob = dumps(obj, pretty=True)            # girintili (insan okuyacaksa)
+
+Tüm arka uçlarda çözme hataları ValueError olarak yükselir (r.json() ile aynı).
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Any, Callable, List, Union
+
+from utils import log_once
+
+_Bytes = Union[bytes, bytearray, memoryview, str]
+
+
+def _stdlib():
+    def loads(b: _Bytes) -> Any:
+        return json.loads(b)
+
+    def dumps(obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return "json", loads, dumps
+
+
+def _orjson():
+    import orjson
+
+    def loads(b: _Bytes) -> Any:
+        try:
+            return orjson.loads(b)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any, pretty: bool = False) -> bytes:
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=opt)
+    return "orjson", loads, dumps
+
+
+def _msgspec():
+    import msgspec
+
+    dec, enc = msgspec.json.Decoder(), msgspec.json.Encoder()
+
+    def loads(b: _Bytes) -> Any:
+        try:
+            return dec.decode(b)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any, pretty: bool = False) -> bytes:
+        out = enc.encode(obj)
+        return msgspec.json.format(out, indent=2) if pretty else out
+    return "msgspec", loads, dumps
+
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+
+def _select(name: str = ""):
+    name = (name or "").strip().lower()
+    order = [name] if name in _BACKENDS else ["orjson", "msgspec", "json"]
+    if name and name not in _BACKENDS and name != "auto":
+        log_once("JSON", f"bilinmeyen JSON_CODEC={name}; otomatik seçiliyor")
+    for cand in order + ["json"]:
+        try:
+            return _BACKENDS[cand]()
+        except ImportError:
+            if cand == name:
+                log_once("JSON", f"{cand} kurulu değil; stdlib json kullanılıyor")
+    return _stdlib()
+
+
+BACKEND, _loads, _dumps = _select(os.environ.get("JSON_CODEC", ""))
+
+
+def use(name: str) -> str:
+    """Arka ucu çalışma zamanında değiştirir (benchmark / test). Seçilen adı döner."""
+    global BACKEND, _loads, _dumps
+    BACKEND, _loads, _dumps = _select(name)
+    return BACKEND
+
+
+def loads(b: _Bytes) -> Any:
+    return _loads(b)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    return _dumps(obj, pretty)
+
+
+def decode_response(r) -> Any:
+    """requests.Response (veya FakeResponse) gövdesini codec ile çözer; r.json() yerine."""
+    body = getattr(r, "content", None)
+    if body is None:
+        return r.json()
+    if not body:
+        raise ValueError("empty body")
+    return _loads(body)
+
+
+def loads_models(b: _Bytes, factory: Callable[..., Any], *args: Any) -> List[Any]:
+    """JSON dizisini çözüp her öğeyi doğrudan modele çevirir (örn. Friend.from_raw)."""
+    data = _loads(b) or []
+    return [factory(d, *args) for d in data]
@@ -0,0 +1,353 @@
+"""LCU trafik kaydı ve deterministik tekrar oynatma (replay).
+
+Kayıt: LcuSession(recorder=Recorder(path)) veya LCU_RECORD=<yol> ile her istek/yanıt
+(zaman, süre, metod, yol, istek gövdesi, durum, yanıt gövdesi) gzip'li JSON satırları
+olarak dosyanın sonuna eklenir. Her oturum yeni bir gzip üyesi + başlık satırı açar;
+yazma ayrı bir thread'de yapılır ve periyodik Z_SYNC_FLUSH ile süreç çökse bile
+o ana kadarki kayıtlar okunabilir kalır.
+
+    rec = Recorder("lcu_trace.jsonl.gz")
+    lcu = LcuSession(recorder=rec)
+
+Replay: ReplayLcu, LcuSession/FakeLcu ile aynı arayüzü (get() → (session, base))
+sunar ve kaydı geri oynatır. GET'ler "o andaki durum" mantığıyla yanıtlanır: sanal
+saat (gerçek süre × speed) itibarıyla aynı yola yapılmış en son kaydedilmiş yanıt; o yol
+için henüz kayıtlı yanıt yoksa 404 (gelecekteki durum erken sunulmaz).
+Diğer metodlar (POST/PATCH/DELETE) yol başına kayıt sırasıyla tüketilir.
+
+    lcu = ReplayLcu.load("lcu_trace.jsonl.gz", speed=10)   # 10x hızlı
+    cs = ChatService(lcu)                                  # main.py: LCU_REPLAY=<yol>
+
+Komut satırı:
+    python lcu_record.py stats lcu_trace.jsonl.gz
+    python lcu_record.py export lcu_trace.jsonl.gz --out payloads/   # bench_json.py --corpus
+"""
+from __future__ import annotations
+import argparse, bisect, gzip, json, os, queue, re, threading, time, zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from utils import log_once
+
+FORMAT_VERSION = 1
+FLUSH_INTERVAL = 1.0   # sn — yazıcı thread'in sync-flush aralığı
+
+
+# ---------------------------------------------------------------------------
+# Kayıt
+# ---------------------------------------------------------------------------
+class Recorder:
+    def __init__(self, path: str, client: str = ""):
+        self.path = path
+        self.client = client
+        self.t0 = time.monotonic()
+        self.count = 0
+        self.dropped = 0
+        self._q: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+        self._closed = False
+        self._th = threading.Thread(target=self._writer, name="lcu-record", daemon=True)
+        self._th.start()
+        self._q.put({"v": FORMAT_VERSION, "start": time.time(), "client": client})
+        log_once("REC", f"LCU kaydı açık: {path}")
+
+    def add(self, method: str, path: str, req: Any, status: int, body: bytes, t_start: float,
+            dur: float, err: str = "") -> None:
+        if self._closed:
+            self.dropped += 1
+            return
+        rec = {"t": round(t_start - self.t0, 4), "d": round(dur * 1000.0, 3), "m": method, "p": path,
+               "s": status, "b": body.decode("utf-8", "replace") if body else ""}
+        if req is not None:
+            rec["q"] = req
+        if err:
+            rec["e"] = err
+        self.count += 1
+        self._q.put(rec)
+
+    def _writer(self) -> None:
+        gz = gzip.GzipFile(self.path, "ab", compresslevel=6)
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    rec = self._q.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    rec = ...
+                if rec is None:
+                    break
+                if rec is not ...:
+                    gz.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":"), default=str).encode() + b"\n")
+                now = time.monotonic()
+                if now - last_flush >= FLUSH_INTERVAL:
+                    gz.flush(zlib.Z_SYNC_FLUSH)
+                    last_flush = now
+        except Exception as e:
+            log_once("REC", f"yazma hatası: {e}")
+        finally:
+            gz.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(None)
+        self._th.join(timeout)
+
+
+class RecordingHttp:
+    """requests.Session sarmalayıcısı: her isteği Recorder'a yazar, gerisini aynen iletir."""
+
+    def __init__(self, inner, recorder: Recorder, base: str):
+        self._inner = inner
+        self._rec = recorder
+        self._base = base
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def request(self, method: str, url: str, **kw):
+        path = url[len(self._base):] if url.startswith(self._base) else url
+        if kw.get("params"):
+            path += ("&" if "?" in path else "?") + urlencode(kw["params"], doseq=True)
+        req = kw.get("json")
+        t0 = time.monotonic()
+        try:
+            r = self._inner.request(method, url, **kw)
+        except Exception as e:
+            self._rec.add(method.upper(), path, req, -1, b"", t0, time.monotonic() - t0, err=type(e).__name__)
+            raise
+        self._rec.add(method.upper(), path, req, r.status_code, r.content or b"", t0, time.monotonic() - t0)
+        return r
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+
+# ---------------------------------------------------------------------------
+# Okuma
+# ---------------------------------------------------------------------------
+def read_records(path: str) -> List[dict]:
+    """Kaydı okur; oturumlar (başlık satırları) tek bir zaman çizgisine dizilir.
+
+    Yarım kalmış (çökme) son gzip üyesi tolere edilir: o ana kadar okunanlar döner.
+    """
+    out: List[dict] = []
+    offset, seg_start, last_t = 0.0, None, 0.0
+    with gzip.open(path, "rb") as f:
+        while True:
+            try:
+                line = f.readline()
+            except (EOFError, OSError, zlib.error):
+                break
+            if not line:
+                break
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break  # kesik son satır
+            if "v" in rec:
+                # yeni oturum: zaman çizgisini bir öncekinin sonuna ekle
+                if seg_start is not None:
+                    offset = last_t
+                seg_start = rec.get("start")
+                continue
+            rec["t"] = float(rec.get("t", 0.0)) + offset
+            last_t = max(last_t, rec["t"])
+            out.append(rec)
+    return out
+
+
+_RX_ID = re.compile(r"/(\d+|[0-9a-f]{8,}[^/]*|[^/]+%40[^/]+|[^/]+@[^/]+)(?=/|$)", re.I)
+
+
+def endpoint_label(path: str) -> str:
+    """/lol-chat/v1/conversations/<id>/messages → lol-chat_v1_conversations_-_messages"""
+    p = _RX_ID.sub("/-", path.split("?", 1)[0]).strip("/")
+    return p.replace("/", "_").replace(".json", "")
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+class ReplayResponse:
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.content = body.encode("utf-8") if body else b""
+        self.text = body or ""
+        self.headers: Dict[str, str] = {"Content-Type": "application/json"}
+
+    def json(self):
+        if not self.content:
+            raise ValueError("empty body")
+        return json.loads(self.content)
+
+
+class _ReplayHttp:
+    def __init__(self, lcu: "ReplayLcu"):
+        self.lcu = lcu
+        self.headers: Dict[str, str] = {}
+        self.verify = False
+
+    def request(self, method: str, url: str, params=None, **_):
+        path = url[len(ReplayLcu.BASE):] if url.startswith(ReplayLcu.BASE) else url
+        if params:
+            path += ("&" if "?" in path else "?") + urlencode(params, doseq=True)
+        return self.lcu.respond(method.upper(), path)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+
+class ReplayLcu:
+    """Kaydedilmiş trafiği sanal saatle geri oynatan LCU taşıyıcısı."""
+
+    BASE = "https://127.0.0.1:0"
+
+    def __init__(self, records: List[dict], speed: float = 1.0, latency: bool = False):
+        self.speed = max(0.001, float(speed))
+        self.latency = latency
+        self.records = records
+        self._lock = threading.Lock()
+        # GET: yol → (zamanlar, kayıtlar) — bisect ile "o andaki" yanıt
+        self._gets: Dict[str, Tuple[List[float], List[dict]]] = {}
+        # diğerleri: (metod, yol) → sıra kuyruğu
+        self._seq: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        self._seq_pos: Dict[Tuple[str, str], int] = defaultdict(int)
+        for r in records:
+            if r.get("s", 0) < 0:
+                continue
+            if r["m"] == "GET":
+                ts, rs = self._gets.setdefault(r["p"], ([], []))
+                ts.append(r["t"])
+                rs.append(r)
+            else:
+                self._seq[(r["m"], r["p"])].append(r)
+        self.duration = records[-1]["t"] if records else 0.0
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.served = 0
+        self._http = _ReplayHttp(self)
+        self.t_start = time.monotonic()
+
+    @classmethod
+    def load(cls, path: str, speed: float = 1.0, latency: bool = False) -> "ReplayLcu":
+        recs = read_records(path)
+        log_once("REPLAY", f"{len(recs)} kayıt yüklendi ({path}), süre={recs[-1]['t'] if recs else 0:.1f} sn, "
+                           f"hız={speed}x")
+        return cls(recs, speed=speed, latency=latency)
+
+    # ---- LcuSession arayüzü ----
+    def get(self):
+        return self._http, self.BASE
+
+    def critical(self):
+        return self._http, self.BASE
+
+    # ---- sanal saat ----
+    def now(self) -> float:
+        """Kayıt zaman çizgisinde şu anki konum (sn)."""
+        return (time.monotonic() - self.t_start) * self.speed
+
+    def finished(self) -> bool:
+        return self.now() >= self.duration
+
+    def respond(self, method: str, path: str) -> ReplayResponse:
+        with self._lock:
+            rec = self._pick(method, path)
+            self.served += 1
+        if rec is None:
+            self.misses[f"{method} {path}"] += 1
+            return ReplayResponse(404, '{"errorCode":"RPC_ERROR","message":"not in recording"}')
+        if self.latency and rec.get("d"):
+            time.sleep(rec["d"] / 1000.0 / self.speed)
+        return ReplayResponse(int(rec.get("s") or 0), rec.get("b") or "")
+
+    def _pick(self, method: str, path: str) -> Optional[dict]:
+        if method == "GET":
+            g = self._gets.get(path)
+            if not g:
+                return None
+            ts, rs = g
+            i = bisect.bisect_right(ts, self.now()) - 1
+            return rs[i] if i >= 0 else None   # kayıtta bu yol henüz sorgulanmamıştı
+        key = (method, path)
+        q = self._seq.get(key)
+        if not q:
+            return None
+        i = self._seq_pos[key]
+        self._seq_pos[key] = i + 1
+        return q[min(i, len(q) - 1)]
+
+
+# ---------------------------------------------------------------------------
+# Komut satırı
+# ---------------------------------------------------------------------------
+def _cmd_stats(path: str) -> None:
+    recs = read_records(path)
+    by: Dict[str, List[dict]] = defaultdict(list)
+    for r in recs:
+        by[f"{r['m']} {endpoint_label(r['p'])}"].append(r)
+    raw = sum(len(r.get("b") or "") for r in recs)
+    size = os.path.getsize(path)
+    print(f"[REC] {len(recs)} istek, {recs[-1]['t'] if recs else 0:.1f} sn; gövde {raw / 1024:,.0f} KiB → "
+          f"dosya {size / 1024:,.0f} KiB ({raw / max(1, size):.1f}x sıkıştırma)")
+    for k, rs in sorted(by.items(), key=lambda kv: -len(kv[1])):
+        ds = sorted(r.get("d", 0.0) for r in rs)
+        print(f"  {k:60s} n={len(rs):6d}  p50={ds[len(ds) // 2]:.1f} ms  max={ds[-1]:.1f} ms  "
+              f"gövde~{sum(len(r.get('b') or '') for r in rs) / len(rs) / 1024:,.1f} KiB")
+
+
+def _cmd_export(path: str, out: str) -> None:
+    """Her GET uç noktasının son 200 yanıtını <etiket>.json olarak yazar (bench_json.py --corpus)."""
+    os.makedirs(out, exist_ok=True)
+    last: Dict[str, str] = {}
+    for r in read_records(path):
+        if r["m"] == "GET" and r.get("s") == 200 and r.get("b"):
+            last[endpoint_label(r["p"])] = r["b"]
+    for label, body in last.items():
+        with open(os.path.join(out, f"{label}.json"), "w", encoding="utf-8") as f:
+            f.write(body)
+    print(f"[REC] {len(last)} uç nokta → {out}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LCU kayıt araçları")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("stats", help="uç nokta başına istek/süre/boyut özeti")
+    s.add_argument("path")
+    e = sub.add_parser("export", help="GET yanıtlarını benchmark korpusu olarak yaz")
+    e.add_argument("path")
+    e.add_argument("--out", default="payloads")
+    args = ap.parse_args()
+    if args.cmd == "stats":
+        _cmd_stats(args.path)
+    else:
+        _cmd_export(args.path, args.out)
+
+
+if __name__ == "__main__":
+    main()
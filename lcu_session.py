@@ -1,7 +1,9 @@
 from __future__ import annotations
-import os, base64, re, requests, urllib3
-from typing import Optional, Tuple
+import os, base64, glob, re, requests, threading, time, urllib3
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple, List, Iterable
 from utils import log_once
+from tracing import TracedHttp
 
 urllib3.disable_warnings()
 
@@ -38,6 +40,47 @@ def _build_lockfile_guesses() -> list[str]:
 
 LOCKFILE_GUESSES: list[str] = _build_lockfile_guesses()
 
+# Birden çok istemci (Wine prefix'leri, ayrı kurulumlar) için glob desenleri
+LOCKFILE_GLOBS: list[str] = [
+    os.path.expanduser("~/.wine*/drive_c/Riot Games/League of Legends/lockfile"),
+    os.path.expanduser("~/Games/*/drive_c/Riot Games/League of Legends/lockfile"),
+    os.path.expanduser("~/.local/share/lutris/runners/wine/*/drive_c/Riot Games/League of Legends/lockfile"),
+    os.path.expanduser("~/Prefixes/*/drive_c/Riot Games/League of Legends/lockfile"),
+]
+
+# Tüm LcuSession'lar aynı adapter'ı paylaşır: her istemci (port) için küçük bir
+# keep-alive havuzu, toplamda pool_connections kadar host.
+_SHARED_ADAPTER = HTTPAdapter(pool_connections=64, pool_maxsize=4)
+# Zamana duyarlı istekler (bench swap, ready-check kabul) ayrı bir havuzdan gider:
+# watcher'ların uzun GET'lerinin arkasında sıraya girmez, bağlantı hep sıcak kalır.
+_CRITICAL_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=2)
+
+# İstemci kapalıyken (çevrimdışı) yoklama aralığı: 0.5 sn'den başlayıp ikiye katlanır.
+# Lockfile dizini izlenebiliyorsa tavan yüksek tutulur (açılış dosya bildirimiyle anında
+# yakalanır); izlenemiyorsa (yalnızca process taraması) açılış gecikmesi tavanla sınırlı.
+OFFLINE_BACKOFF_MIN = 0.5
+OFFLINE_BACKOFF_MAX = 30.0
+OFFLINE_BACKOFF_MAX_BLIND = 5.0
+DIR_POLL_INTERVAL = 1.0   # watchdog yoksa dizin mtime kontrol aralığı (sn)
+
+
+def discover_lockfiles(extra: Iterable[str] = ()) -> List[str]:
+    """Var olan tüm lockfile yollarını döner (tekrarsız, bulunma sırasına göre).
+
+    Kaynaklar: LOCKFILE_PATHS env (os.pathsep ile ayrılmış yol/glob), `extra`,
+    LOCKFILE_GLOBS ve LOCKFILE_GUESSES.
+    """
+    env = [p.strip() for p in os.environ.get("LOCKFILE_PATHS", "").split(os.pathsep) if p.strip()]
+    out: List[str] = []
+    seen = set()
+    for pattern in [*env, *extra, *LOCKFILE_GLOBS, *LOCKFILE_GUESSES]:
+        for p in (sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]):
+            real = os.path.realpath(p)
+            if real not in seen and os.path.isfile(p):
+                seen.add(real)
+                out.append(p)
+    return out
+
 # Regex for extracting port/token from LeagueClientUx process args
 _RE_PORT  = re.compile(r"--app-port=(\d+)")
 _RE_TOKEN = re.compile(r"--remoting-auth-token=([^\s]+)")
@@ -74,11 +117,92 @@ def _discover_via_process() -> Optional[Tuple[str, str]]:
     return None
 
 
+class LockfileWatcher:
+    """Riot dizinlerinde lockfile oluşunca on_change() çağırır.
+
+    watchdog kuruluysa işletim sistemi bildirimleri (inotify / ReadDirectoryChangesW /
+    FSEvents) kullanılır; değilse dizinlerin mtime'ı DIR_POLL_INTERVAL'da bir stat'lanır
+    (dosya oluşturma/silme dizin mtime'ını değiştirir). Var olmayan dizinler izlenmez.
+    """
+
+    def __init__(self, lockfiles: Iterable[str], on_change):
+        self.dirs = sorted({d for d in (os.path.dirname(p) for p in lockfiles if p) if os.path.isdir(d)})
+        self.on_change = on_change
+        self.mode = ""
+        self._stop = threading.Event()
+        self._observer = None
+
+    def start(self) -> "LockfileWatcher":
+        if not self.dirs:
+            return self
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            self.mode = "stat"
+            threading.Thread(target=self._poll, name="lockfile-watch", daemon=True).start()
+            return self
+
+        on_change = self.on_change
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, ev):
+                if ev.event_type not in ("created", "modified", "moved"):
+                    return
+                path = getattr(ev, "dest_path", "") or ev.src_path
+                if os.path.basename(path).lower() == "lockfile":
+                    on_change()
+
+        obs = Observer()
+        for d in self.dirs:
+            obs.schedule(_Handler(), d, recursive=False)
+        obs.daemon = True
+        obs.start()
+        self._observer, self.mode = obs, "watchdog"
+        return self
+
+    @staticmethod
+    def _mtime(d: str) -> float:
+        try:
+            return os.stat(d).st_mtime
+        except OSError:
+            return 0.0
+
+    def _poll(self) -> None:
+        last = {d: self._mtime(d) for d in self.dirs}
+        while not self._stop.wait(DIR_POLL_INTERVAL):
+            for d in self.dirs:
+                m = self._mtime(d)
+                if m != last[d]:
+                    last[d] = m
+                    self.on_change()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
 class LcuSession:
-    def __init__(self) -> None:
+    def __init__(self, lockfile_path: Optional[str] = None, recorder=None) -> None:
+        # lockfile_path verilirse oturum bu istemciye sabitlenir (çoklu istemci modu):
+        # env / statik liste / process taraması yapılmaz.
+        self.lockfile_path = lockfile_path
+        # recorder (lcu_record.Recorder) verilirse tüm istek/yanıtlar kaydedilir
+        self.recorder = recorder
         self._tuple: Optional[Tuple[str, str, str, str]] = None  # (pid, port, pw, proto)
         self._sess: Optional[requests.Session] = None
         self._base: Optional[str] = None
+        self._crit: Optional[requests.Session] = None
+        self._crit_tuple: Optional[Tuple[str, str, str, str]] = None
+        # Çevrimdışı durum: get() yoklama yapmadan (None, None) döner, watcher'lar
+        # wait_online() üzerinde bekler; tek bir "lcu-offline" thread'i geri çekilerek
+        # yoklar ve lockfile bildirimiyle anında uyanır.
+        self._offline = False
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self.offline_probes = 0
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -86,6 +210,9 @@ class LcuSession:
 
     def _read_lockfile(self) -> Optional[str]:
         """Return the path of the first existing lockfile candidate, or None."""
+        if self.lockfile_path:
+            return self.lockfile_path if os.path.exists(self.lockfile_path) else None
+
         # 1. Env-var override — highest priority, skips all discovery
         env_path = os.environ.get("LOCKFILE_PATH", "").strip()
         if env_path:
@@ -102,19 +229,84 @@ class LcuSession:
 
         return None
 
-    def _build_session(self, port: str, pw: str, proto: str) -> tuple[requests.Session, str]:
+    def _build_session(self, port: str, pw: str, proto: str,
+                       adapter: HTTPAdapter = _SHARED_ADAPTER) -> tuple[requests.Session, str]:
         b64 = base64.b64encode(f"riot:{pw}".encode()).decode()
         s = requests.Session()
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
         s.verify = False
         s.headers.update({"Authorization": f"Basic {b64}"})
         base = f"https://127.0.0.1:{port}"
-        return s, base
+        http = s
+        if self.recorder is not None:
+            from lcu_record import RecordingHttp
+            http = RecordingHttp(http, self.recorder, base)
+        return TracedHttp(http, base), base
 
     # ------------------------------------------------------------------
     # Public API — signature unchanged
     # ------------------------------------------------------------------
 
+    @property
+    def online(self) -> bool:
+        return not self._offline
+
     def get(self) -> tuple[Optional[requests.Session], Optional[str]]:
+        if self._offline:
+            return None, None   # lcu-offline thread'i yokluyor
+        s, base = self._connect()
+        if s is None:
+            self._go_offline()
+        return s, base
+
+    def wait_online(self, timeout: Optional[float] = None) -> bool:
+        """Çevrimiçiyse hemen True; değilse istemci bulunana kadar (en fazla timeout sn) bekler."""
+        with self._cond:
+            if not self._offline:
+                return True
+            self._cond.wait(timeout)
+            return not self._offline
+
+    def _watch_paths(self) -> List[str]:
+        if self.lockfile_path:
+            return [self.lockfile_path]
+        env_path = os.environ.get("LOCKFILE_PATH", "").strip()
+        return ([env_path] if env_path else []) + LOCKFILE_GUESSES
+
+    def _go_offline(self) -> None:
+        with self._cond:
+            if self._offline:
+                return
+            self._offline = True
+        self._wake.clear()
+        threading.Thread(target=self._offline_loop, name="lcu-offline", daemon=True).start()
+
+    def _offline_loop(self) -> None:
+        watcher = LockfileWatcher(self._watch_paths(), self._wake.set).start()
+        cap = OFFLINE_BACKOFF_MAX if watcher.mode else OFFLINE_BACKOFF_MAX_BLIND
+        log_once("LCU", f"istemci kapalı → çevrimdışı; watcher'lar bekletiliyor "
+                        f"(lockfile izleme: {watcher.mode or 'yok'}, yoklama ≤ {cap:g} sn)")
+        t0 = time.monotonic()
+        delay, probes, woke = OFFLINE_BACKOFF_MIN, 0, False
+        try:
+            while True:
+                woke = self._wake.wait(delay)
+                self._wake.clear()
+                probes += 1
+                self.offline_probes += 1
+                if self._connect()[0] is not None:
+                    break
+                delay = min(delay * 2, cap)
+        finally:
+            watcher.stop()
+        with self._cond:
+            self._offline = False
+            self._cond.notify_all()
+        log_once("LCU", f"istemci bulundu → çevrimiçi ({'dosya bildirimi' if woke else 'yoklama'}, "
+                        f"{probes} deneme, {time.monotonic() - t0:.1f} sn)")
+
+    def _connect(self) -> tuple[Optional[requests.Session], Optional[str]]:
         # --- Path 1: lockfile on disk ---
         p = self._read_lockfile()
         if p:
@@ -131,6 +323,9 @@ class LcuSession:
             except Exception:
                 pass
 
+        if self.lockfile_path:
+            return None, None
+
         # --- Path 2: process-based discovery via psutil ---
         result = _discover_via_process()
         if result:
@@ -144,3 +339,22 @@ class LcuSession:
             return s, base
 
         return None, None
+
+    def critical(self) -> tuple[Optional[requests.Session], Optional[str]]:
+        """Kritik istek yolu: lockfile tekrar okunmaz, ayrı keep-alive havuzu kullanılır.
+
+        Son bilinen kimlik bilgileriyle çalışır; henüz bağlantı yoksa get() ile kurulur.
+        """
+        if self._offline:
+            return None, None
+        cur = self._tuple
+        if cur is None or self._base is None:
+            self.get()
+            cur = self._tuple
+            if cur is None:
+                return None, None
+        if self._crit is None or self._crit_tuple != cur:
+            _pid, port, pw, proto = cur
+            self._crit, _ = self._build_session(port, pw, proto, adapter=_CRITICAL_ADAPTER)
+            self._crit_tuple = cur
+        return self._crit, self._base
@@ -1,53 +1,84 @@
 from __future__ import annotations
-import sys, threading, time, os, importlib.util
-from typing import Optional, Callable
+import sys, threading, time, os
+from concurrent.futures import wait as futures_wait
+from typing import Optional, Callable, TYPE_CHECKING
 from utils import log_once, ASCII_LOGO
 from lcu_session import LcuSession
 from chat_service import ChatService
-def _ensure_dependency(module: str, package_hint: str = "") -> None:
-    if importlib.util.find_spec(module) is None:
-        hint = f" (örn. {package_hint})" if package_hint else ""
-        sys.stderr.write(
-            f"Gerekli '{module}' modülü bulunamadı{hint}.\n"
-            "Lütfen 'pip install -r requirements.txt' komutunu çalıştırın veya modülü manuel olarak yükleyin.\n"
-        )
-        sys.exit(1)
-
-
-_ensure_dependency("pynput", "pip install pynput")
-from pynput import keyboard
-from telegram_bridge import TelegramBridge
+from chat_store import ChatStore
+from cursor_store import CursorStore
+from config import ConfigStore
+from pick_rules import ChampSelectPlanner, SessionView, get_rules
+from aram_sniper import BenchSniper
+from startup import StartupPipeline
+from profiler import MEM, SamplingProfiler, loop_tick, thread_report
+from tracing import TRACER, attach, current, format_trace, span
+from command_pool import CommandPool, remaining
+from command_dedup import DEDUP
+from party_commands import bind_pick_resolver, command_kind, handle_dm_party_command, handle_group_command
+from send_queue import SendQueue
+from presence import KINDS as PRESENCE_KINDS, PresenceTracker, format_event
+
+# Ağır/opsiyonel alt sistemler (python-telegram-bot, pynput, pyautogui) yalnızca
+# gerçekten kullanıldıklarında, kendi thread'lerinde import edilir.
+if TYPE_CHECKING:
+    from telegram_bridge import TelegramBridge
 
 IS_WINDOWS = os.name == "nt"
 CLICKER_AVAILABLE = IS_WINDOWS
 
-if IS_WINDOWS:
-    from ui_clicker import clicker_worker, state as CLICK_STATE
-else:
-    CLICK_STATE = {"active": False}
+CLICK_STATE = {"active": False, "stop": False, "last_click": 0.0}
+CLICKER_REF_WIDTH = int(os.getenv("CLICKER_REF_WIDTH", "0") or 0)  # 0 → template_match.REF_WIDTH (1280)
+BENCH_SNIPER: Optional["BenchSniper"] = None  # main() içinde kurulur; /bench-snipe stats okur
+CMD_POOL: Optional[CommandPool] = None        # main() içinde kurulur; /cmdq okur
+TELEGRAM_READY_WAIT = 12.0  # sn — açılışta BASLAT onayı için köprüyü en fazla bu kadar bekle (wait_until_ready 10 sn)
 
-    def clicker_worker():
-        """No-op clicker for non-Windows platforms."""
+
+def clicker_worker():
+    if not CLICKER_AVAILABLE:
         log_once("CLICK", "UI clicker devre dışı (yalnızca Windows).")
+        return
+    try:
+        from ui_clicker import clicker_worker as _worker
+    except ImportError as e:
+        log_once("CLICK", f"UI clicker yüklenemedi: {e}")
+        return
+    _worker(CLICK_STATE, ref_width=CLICKER_REF_WIDTH or None)
 
 # ------------ Yardım ------------
-def _print_help():
-    print(
+def _print_help(out: Callable[[str], None] = print):
+    out(
         "Komutlar:\n"
         "  /friends | /online-friend | /offline-friend\n"
         "  /chat-groups | /chat-group <ad|id> | /group-log | /sayg <mesaj>\n"
         "  /dm <kisi> <mesaj> | /dm-log <kisi>\n"
+        "  /search <metin>  (yerel sohbet geçmişinde ara)\n"
         "  /geo | /geo-json\n"
         "  /auto-ready [on|off]\n"
         "  /auto-pick [on|off|Ahri,Annie,...]\n"
         "  /auto-pick-lock [on|off]\n"
+        "  /auto-ban [on|off|Yasuo,Zed,...]\n"
+        "  /pick-rules [reload|<dosya.json>]  (derlenmiş pick/ban planı)\n"
+        "  /bench-snipe [on|off|stats]  (ARAM: bench'e düşen öncelikli şampiyonu anında al)\n"
         "  /announce [on|off] | /silent-group [on|off] | /quiet [on|off]\n"
         "  /sayl <mesaj>  (lobiye yaz)\n"
+        "  /profile [sn] [wall]  (tüm thread'leri örnekle → flamegraph collapsed dosyası)\n"
+        "  /threads [ad]  (thread yığınları + döngü hızı) | /mem [stop]  (tracemalloc en çok ayıranlar + fark)\n"
+        "  /traces [n] | /trace <id> | /traces export <dosya.jsonl>  (en yavaş komut trace'leri)\n"
+        "  /cmdq  (komut havuzu: tür başına kuyruk bekleme / çalışma süresi, bekleyenler)\n"
+        "  /dedup [ban=5,baslat=2,...]  (komut tekrar pencereleri; yutulan kopyalar, kaçınılan LCU çağrıları)\n"
+        "  /outbox  (giden yanıt kuyruğu: gönderim gecikmesi, birleştirilen / hız sınırına takılan yanıtlar)\n"
+        "  /presence  (presence önbelleği: yoklama / değişmeyen gövde sayısı, olaylar)\n"
         "  status | exit | help"
     )
 
 # ------------ Acil durdurma ------------
 def emergency_hotkey(stop_flag: dict):
+    try:
+        from pynput import keyboard
+    except ImportError:
+        log_once("HOTKEY", "pynput bulunamadı; Ctrl+Shift+Q devre dışı (pip install pynput).")
+        return
     COMBO = {keyboard.Key.ctrl_l, keyboard.Key.shift, keyboard.KeyCode.from_char('q')}
     pressed = set()
     def on_press(k):
@@ -59,217 +90,24 @@ def emergency_hotkey(stop_flag: dict):
     with keyboard.Listener(on_press=on_press, on_release=on_release) as L:
         L.join()
 
-# ------------ Paylaşılan lobi / DM komutları ------------
-def handle_party_management_command(
-    cs: ChatService,
-    txt: str,
-    from_name: str,
-    send_feedback: Callable[[str], None],
-    *,
-    context: str = "group",
-    sender_puuid: Optional[str] = None,
-    conv_id: Optional[str] = None,
-    start_request_handler: Optional[Callable[[Optional[str], str, Callable[[str], None]], bool]] = None,
-    cfg: Optional[dict] = None,
-) -> bool:
-    text = (txt or "").strip()
-    if not text:
-        return False
-    low = text.lower()
-
-    def reply(msg: str):
-        if send_feedback and msg:
-            send_feedback(msg)
-
-    # BASLAT / START
-    if low in ("baslat", "start", "/l"):
-        log_once("GRP-CMD", f"{from_name} → BASLAT")
-        if context == "dm" and not cs.is_puuid_in_lobby(sender_puuid):
-            reply("lobbye katilmadiginiz icin oyun baslatma yetkini bulunmamaktadir")
-            return True
-        if cs.is_party_leader():
-            # Dedup guard: ignore duplicate BASLAT triggers within 2 seconds.
-            # Protects against concurrent lobby-chat + DM paths firing start_matchmaking twice.
-            if cfg is not None:
-                now = time.time()
-                last = cfg.get("_baslat_last_ts", 0.0)
-                if now - last < 2.0:
-                    log_once("QUEUE", f"START_DEDUP: suppressed duplicate from {from_name}")
-                    return True
-                cfg["_baslat_last_ts"] = now
-            if start_request_handler and start_request_handler(conv_id, from_name, reply):
-                return True
-            reply("Matchmaking başlatılıyor…")
-            ok = cs.start_matchmaking()
-            log_once("QUEUE", f"START_CALL={'OK' if ok else 'FAIL'}")
-        else:
-            reply(f"{from_name} başlat dedi ama lider değilim.")
-        return True
-
-    # BAN <isim>
-    if low.startswith("ban "):
-        target = text.split(" ", 1)[1].strip()
-        log_once("GRP-CMD", f"{from_name} → BAN \"{target}\"")
-        if not cs.is_party_leader():
-            reply(f"{from_name} ban istedi ama lider değilim.")
-            return True
-        m = cs.find_member_by_name(target)
-        if not m:
-            reply(f'Kullanıcı bulunamadı: "{target}"')
-            return True
-        ok = cs.kick_member_by_id(m.get("summonerId"))
-        reply(
-            f'{m.get("summonerName")} lobiden atıldı.' if ok else "Ban başarısız."
-        )
-        return True
-
-    # ODADEVRET [isim]
-    if low.startswith("odadevret"):
-        parts = text.split(" ", 1)
-        target = parts[1].strip() if len(parts) == 2 else (from_name or "")
-        log_once("GRP-CMD", f"{from_name} → ODADEVRET \"{target}\"")
-        if not cs.is_party_leader():
-            reply(f"{from_name} devir istedi ama lider değilim.")
-            return True
-        if not target:
-            reply("ODADEVRET için hedef yok.")
-            return True
-        m = cs.find_member_by_name(target)
-        if not m:
-            reply(f'Liderlik devri için kullanıcı yok: "{target}"')
-            return True
-        ok = cs.promote_member_by_id(m.get("summonerId"))
-        reply(
-            f'Liderlik {m.get("summonerName")} kullanıcısına devredildi.'
-            if ok
-            else "Devir başarısız."
-        )
-        return True
-
-    return False
-
-
-def handle_dm_party_command(cs: ChatService, friend_key: str, friend_name: str, body: str, cfg: Optional[dict] = None) -> bool:
-    name = friend_name or friend_key or "?"
-
-    def dm_feedback(msg: str):
-        if msg:
-            cs.dm_send(friend_key, msg)
-
-    return handle_party_management_command(
-        cs,
-        body,
-        name,
-        dm_feedback,
-        context="dm",
-        sender_puuid=friend_key,
-        conv_id=None,
-        start_request_handler=None,
-        cfg=cfg,
-    )
-
-
-# ------------ Grup komutları (Lobby sohbeti) ------------
-def handle_group_command(cs: ChatService, conv_id: str, body: str, from_name: str, cfg: dict,
-                         start_request_handler: Optional[Callable[[Optional[str], str, Callable[[str], None]], bool]] = None):
-    txt = (body or "").strip()
-    low = txt.lower()
-
-    def info_to_group(msg: str):
-        if not cfg.get("silent_group", False):
-            cs.send(conv_id, msg)
-
-    if handle_party_management_command(
-        cs,
-        txt,
-        from_name,
-        info_to_group,
-        conv_id=conv_id,
-        start_request_handler=start_request_handler,
-        cfg=cfg,
-    ):
-        return
-
-    # DURDUR / STOP
-    if low in ("durdur","stop"):
-        log_once("GRP-CMD", f'{from_name} → DURDUR')
-        if cs.is_party_leader():
-            ok = cs.stop_matchmaking()
-            info_to_group("Matchmaking durduruldu." if ok else "Durdurma başarısız.")
-            log_once("QUEUE", f"STOP_CALL={'OK' if ok else 'FAIL'}")
-        else:
-            info_to_group(f"{from_name} durdur dedi ama lider değilim.")
-        return
-
-    # GEO (kısa geoinfo)
-    if low in ("geo","bolge"):
-        info = cs.geoinfo_quick()
-        log_once("GRP-CMD", f'{from_name} → GEO')
-        info_to_group(f"GeoInfo: {info}")
-        return
-
-    # --- AUTO-PICK (sadece lobi sohbetinden kontrol) ---
-    # PICKLIST Shaco,Teemo,Trundle
-    if low.startswith("picklist "):
-        names_str = txt.split(" ", 1)[1].strip()
-        names = [s.strip() for s in names_str.split(",") if s.strip()]
-        # İsimleri id'ye çevir
-        ids = []
-        bad = []
-        for nm in names:
-            cid = cs.champion_id_from_text(nm)
-            if cid and cid not in ids:
-                ids.append(cid)
-            else:
-                if not cid:
-                    bad.append(nm)
-        cfg["auto_pick_list"] = ",".join(names)
-        cfg["auto_pick_ids"] = ids
-        log_once("PICK", f"list={cfg['auto_pick_list']} ids={ids}")
-        ok_part = (", ".join(names) if names else "∅")
-        msg = f"Auto-pick listesi güncellendi: {ok_part}"
-        if bad:
-            msg += f" | Bilinmeyen: {', '.join(bad)}"
-        info_to_group(msg)
-        return
-
-    # PICK ON / PICK OFF  → otomatik seçim aç/kapat
-    if low in ("pick on", "pick aç", "pick ac"):
-        cfg["auto_pick_enabled"] = True
-        log_once("PICK", "auto-pick = ON")
-        info_to_group("Auto-pick: ON")
-        return
-    if low in ("pick off", "pick kapat"):
-        cfg["auto_pick_enabled"] = False
-        log_once("PICK", "auto-pick = OFF")
-        info_to_group("Auto-pick: OFF")
-        return
-
-    # LOCK ON / LOCK OFF  → pick sonrası lock davranışı
-    if low in ("lock on", "kilit on", "kilit aç", "kilit ac"):
-        cfg["auto_pick_lock"] = True
-        log_once("PICK", "auto-pick-lock = ON")
-        info_to_group("Auto-pick lock: ON (hover + lock)")
-        return
-    if low in ("lock off", "kilit off", "kilit kapat"):
-        cfg["auto_pick_lock"] = False
-        log_once("PICK", "auto-pick-lock = OFF")
-        info_to_group("Auto-pick lock: OFF (sadece hover)")
-        return
-
 
 class StartApprovalManager:
     BUSY_STATES = {"away", "idle", "busy", "dnd", "mobile"}
+    DEFAULT_TTL = 60.0
+    MAX_PENDING = 32
 
-    def __init__(self, cs: ChatService, cfg: dict, telegram_bridge: Optional[TelegramBridge]):
+    def __init__(self, cs: ChatService, cfg: ConfigStore, telegram_bridge: Optional["TelegramBridge"]):
         import threading as _threading
 
         self.cs = cs
         self.cfg = cfg
         self.tb = telegram_bridge
         self._pending: dict[str, dict] = {}
+        self._by_conv: dict[str, str] = {}  # conv_id -> bekleyen req_id (aynı lobiden tek istem)
         self._seq = 0
         self._lock = _threading.Lock()
+        self._wake = _threading.Condition(self._lock)
+        _threading.Thread(target=self._reaper, daemon=True).start()
 
     def _next_id(self) -> str:
         import time as _time
@@ -278,19 +116,39 @@ class StartApprovalManager:
             self._seq += 1
             return f"sreq-{int(_time.time()*1000):x}-{self._seq}"
 
+    def _ttl(self) -> float:
+        try:
+            return max(1.0, float(self.cfg.get("start_approval_ttl", self.DEFAULT_TTL)))
+        except (TypeError, ValueError):
+            return self.DEFAULT_TTL
+
     def _group_notify(self, conv_id: Optional[str], text: str) -> None:
         if not conv_id or self.cfg.get("silent_group", False):
             return
-        self.cs.send(conv_id, text)
+        self.cs.reply(conv_id, text)
 
-    def _finalize(self, req_id: str, approved: bool) -> None:
+    def _pop(self, req_id: str) -> Optional[dict]:
+        # self._lock tutulurken çağrılır
+        info = self._pending.pop(req_id, None)
+        if info and self._by_conv.get(info.get("conv_id")) == req_id:
+            self._by_conv.pop(info.get("conv_id"), None)
+        return info
+
+    def _finalize(self, req_id: str, approved: bool, reason: str = "telegram") -> None:
         with self._lock:
-            info = self._pending.pop(req_id, None)
+            info = self._pop(req_id)
         if not info:
             return
+        # onay farklı bir thread'den (TG callback / reaper) gelir; isteği açan trace'e bağla
+        waited = (time.perf_counter() - info["t_req"]) * 1000.0
+        with attach(info.get("trace")), span("start.finalize", via=reason, approved=approved,
+                                              waited_ms=round(waited, 1)):
+            self._finish(info, req_id, approved, reason)
 
+    def _finish(self, info: dict, req_id: str, approved: bool, reason: str) -> None:
         conv_id = info.get("conv_id")
-        requester = info.get("requester") or "bir oyuncu"
+        requester = ", ".join(sorted(r for r in info.get("requesters", ()) if r)) or "bir oyuncu"
+        log_once("START", f"{req_id} {'APPROVED' if approved else 'DENIED'} via={reason}")
 
         if approved:
             ok = self.cs.start_matchmaking()
@@ -298,27 +156,98 @@ class StartApprovalManager:
                 f"{requester} isteği onaylandı, matchmaking başlatılıyor." if ok
                 else f"{requester} isteği onaylandı ancak matchmaking başlatılamadı."
             )
+        elif reason == "expired":
+            msg = f"{requester} tarafından istenen BASLAT zaman aşımına uğradı."
         else:
             msg = f"{requester} tarafından istenen BASLAT reddedildi."
 
         self._group_notify(conv_id, msg)
 
+    def _expire(self, req_id: str) -> None:
+        if self.tb:
+            self.tb.cancel_start_confirmation(req_id)
+        self._finalize(req_id, bool(self.cfg.get("start_approval_default", False)), reason="expired")
+
+    def _on_send_error(self, req_id: str, _exc: Exception) -> None:
+        with self._lock:
+            info = self._pop(req_id)
+        if not info:
+            return
+        with attach(info.get("trace")), span("start.send_error_fallback"):
+            reply_fn = info.get("reply_fn")
+            if reply_fn:
+                reply_fn("Telegram onay isteği gönderilemedi; normal şekilde başlatılıyor…")
+            else:
+                self._group_notify(info.get("conv_id"), "Telegram onay isteği gönderilemedi.")
+            ok = self.cs.start_matchmaking()
+        log_once("QUEUE", f"START_CALL={'OK' if ok else 'FAIL'} (telegram fallback)")
+
+    def _reaper(self) -> None:
+        """Süresi dolan istekleri varsayılan kararla kapatır; _pending ve TG callback'lerini sınırlı tutar."""
+        import time as _time
+
+        while True:
+            with self._lock:
+                now = _time.monotonic()
+                expired = [rid for rid, info in self._pending.items() if info["deadline"] <= now]
+                if not expired:
+                    nxt = min((info["deadline"] for info in self._pending.values()), default=None)
+                    self._wake.wait(None if nxt is None else max(0.05, nxt - now))
+                    continue
+            for rid in expired:
+                try:
+                    self._expire(rid)
+                except Exception as e:
+                    log_once("START", f"expire err: {e}")
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
     def maybe_request(
         self,
         conv_id: Optional[str],
         requester: str,
         reply_fn: Optional[Callable[[str], None]] = None,
     ) -> bool:
+        """Meşgulsem Telegram onayı ister ve hemen döner (True → BASLAT ele alındı)."""
+        import time as _time
+
         if not (self.tb and conv_id):
             return False
 
-        availability = self.cs.my_availability()
+        with span("availability"):
+            availability = self.cs.my_availability()
         if availability not in self.BUSY_STATES:
             return False
 
+        overflow: list[str] = []
+        with self._lock:
+            dup = self._by_conv.get(conv_id)
+            if dup:
+                self._pending[dup]["requesters"].add(requester or "")
+        if dup:
+            log_once("START", f"{dup} zaten bekliyor; {requester} isteği birleştirildi")
+            return True
+
         req_id = self._next_id()
         with self._lock:
-            self._pending[req_id] = {"conv_id": conv_id, "requester": requester or ""}
+            self._pending[req_id] = {
+                "conv_id": conv_id,
+                "requester": requester or "",
+                "requesters": {requester or ""},
+                "reply_fn": reply_fn,
+                "deadline": _time.monotonic() + self._ttl(),
+                "trace": current(),
+                "t_req": _time.perf_counter(),
+            }
+            self._by_conv[conv_id] = req_id
+            if len(self._pending) > self.MAX_PENDING:
+                oldest = sorted(self._pending, key=lambda rid: self._pending[rid]["deadline"])
+                overflow = oldest[: len(self._pending) - self.MAX_PENDING]
+            self._wake.notify()
+        for rid in overflow:
+            self._expire(rid)
 
         if reply_fn:
             reply_fn("Meşgul durumdayım, Telegram onayı bekleniyor…")
@@ -330,11 +259,12 @@ class StartApprovalManager:
             requester=requester,
             availability=availability,
             callback=lambda approved: self._finalize(req_id, approved),
+            on_send_error=lambda exc: self._on_send_error(req_id, exc),
         )
 
         if not ok:
             with self._lock:
-                self._pending.pop(req_id, None)
+                self._pop(req_id)
             if reply_fn:
                 reply_fn("Telegram onay isteği gönderilemedi; normal şekilde başlatılıyor…")
             else:
@@ -344,7 +274,7 @@ class StartApprovalManager:
         return True
 
 # ------------ Ready-Check watcher (auto-accept) ------------
-def ready_check_watcher(cs: ChatService, cfg: dict, stop_flag: dict):
+def ready_check_watcher(cs: ChatService, cfg: ConfigStore, stop_flag: dict):
     """
     Auto-ready mantığı:
       - Sadece phase == ReadyCheck ve state == InProgress iken dener.
@@ -362,6 +292,9 @@ def ready_check_watcher(cs: ChatService, cfg: dict, stop_flag: dict):
     click_burst_sec = 6.0
 
     while not stop_flag.get("stop"):
+        loop_tick()
+        if not cs.wait_online():
+            continue
         try:
             phase = cs.gameflow_phase()
             if phase != last_phase:
@@ -409,29 +342,46 @@ def ready_check_watcher(cs: ChatService, cfg: dict, stop_flag: dict):
         time.sleep(0.25)
 
 # ------------ Champ Select watcher (auto-pick) ------------
-def champ_select_watcher(cs: ChatService, cfg: dict, stop_flag: dict):
+def champ_select_watcher(cs: ChatService, cfg: ConfigStore, stop_flag: dict):
     """
-    ChampSelect'te otomatik şampiyon seçer.
-    - Phase == 'ChampSelect' iken çalışır.
+    ChampSelect'te otomatik ban + şampiyon seçimi (pick_rules).
+    - Phase == 'ChampSelect' iken çalışır; kurallar (kuyruk, pozisyon) için bir kez derlenir.
+    - Her session okumasında yalnızca derlenmiş öncelik dizileri süzülür.
     - Her yeni actionId için bir kez dener; başarısızsa bekler.
+    - Her turda tek bir cfg görüntüsü okur; pick/ban ayarları değişince aynı action'ı beklemeden yeniden dener.
     """
     import time
     last_phase = ""
     last_action_id = None
     last_try_ts = 0.0
+    planner = ChampSelectPlanner(cs)
+    pick_cfg_changed = threading.Event()
+    cfg.subscribe(lambda *_: pick_cfg_changed.set(),
+                  keys=("auto_pick_enabled", "auto_pick_ids", "auto_pick_lock",
+                        "auto_ban_enabled", "auto_ban_ids", "pick_rules"))
 
     while not stop_flag.get("stop"):
+        loop_tick()
+        if not cs.wait_online():
+            continue
         try:
+            snap = cfg.snapshot()
             phase = cs.gameflow_phase()
             if phase != last_phase:
                 log_once("PHASE", phase)
                 last_phase = phase
                 last_action_id = None
+                planner.reset()
+            if pick_cfg_changed.is_set():
+                pick_cfg_changed.clear()
+                last_action_id = None
 
-            if not cfg.get("auto_pick_enabled", False) or phase != "ChampSelect":
+            if not (snap.get("auto_pick_enabled", False) or snap.get("auto_ban_enabled", False)) \
+                    or phase != "ChampSelect":
                 time.sleep(0.3); continue
 
-            act, _sess = cs.my_pick_action()
+            view = SessionView.from_session(cs.cs_session())
+            act = view.action
             if not act:
                 time.sleep(0.3); continue
 
@@ -442,34 +392,28 @@ def champ_select_watcher(cs: ChatService, cfg: dict, stop_flag: dict):
             last_action_id = aid
             last_try_ts = time.time()
 
-            ids = cfg.get("auto_pick_ids", []) or []
-            if not ids:
-                continue
-
-            ok, how = cs.autopick_try_with_bench(ids, do_lock=cfg.get("auto_pick_lock", True))
+            kind, ok, how, info = planner.act(view, snap)
+            tag = "BAN" if kind == "ban" else "PICK"
             if ok:
-                log_once("PICK", f"{how.upper()} (actionId={aid}) ids={ids}")
-            else:
-                if how not in ("not_my_turn", "not_in_progress"):
-                    log_once("PICK", f"fail={how} (actionId={aid}) ids={ids}")
+                log_once(tag, f"{how.upper()} (actionId={aid}) {info}")
+            elif how not in ("disabled", "not_my_turn", "not_in_progress"):
+                log_once(tag, f"fail={how} (actionId={aid}) {info}")
         except Exception as e:
             log_once("PICK", f"err={e}")
 
         time.sleep(0.25)
 
 # ------------ Arkadaş listesi CLI dump ------------
-def print_friends(cs: ChatService, only: Optional[str]=None):
-    friends = cs.list_friends()
+def print_friends(cs: ChatService, only: Optional[str]=None, out: Callable[[str], None] = print):
+    friends = cs.friends()
     on, bsy, off = [], [], []
-    from utils import status_tag
     for f in friends:
-        name = f.get('name') or f.get('gameName') or f.get('displayName') or 'Unknown'
-        tag = status_tag(f.get('availability'))
-        (on if tag=="[ON]" else off if tag=="[OFF]" else bsy).append(name)
-    print("KING"); idx=1
+        tag = f.status
+        (on if tag=="[ON]" else off if tag=="[OFF]" else bsy).append(f.display_name)
+    out("KING"); idx=1
     def dump(lst, marker):
         nonlocal idx
-        for n in lst: print(f"[{idx}] {marker} {n}"); idx+=1
+        for n in lst: out(f"[{idx}] {marker} {n}"); idx+=1
     if only=="online": dump(on,"[ON]")
     elif only=="offline": dump(off,"[OFF]")
     else: dump(on,"[ON]"); dump(off,"[OFF]"); dump(bsy,"[BSY]")
@@ -478,14 +422,60 @@ def print_friends(cs: ChatService, only: Optional[str]=None):
 def main():
     try: sys.stdout.reconfigure(line_buffering=True)
     except Exception: pass
-    print("RUNNING | Hotkey: Ctrl+Shift+Q"); print(ASCII_LOGO)
-
-    lcu = LcuSession()
-    cs = ChatService(lcu)
-    cs.refresh_me(); log_once("SELF", str(cs.ME))
+    # Headless sunucu: input() ve pynput hotkey yok; kontrol HTTP API üzerinden
+    daemon = "--daemon" in sys.argv[1:] or os.getenv("DAEMON", "false").lower() in ("1","true","on","yes")
+    print("RUNNING | " + ("DAEMON (HTTP API)" if daemon else "Hotkey: Ctrl+Shift+Q")); print(ASCII_LOGO)
+
+    boot = StartupPipeline()
+    if TRACE_FILE and TRACE_FILE.lower() not in ("off", "0", "false", "no"):
+        TRACER.configure(export_path=TRACE_FILE)
+    # LCU_REPLAY: kaydedilmiş trafiği (lcu_record) gerçek istemci yerine geri oynat;
+    # bu modda geçmiş/imleç dosyaları açıkça istenmedikçe kapalıdır (gerçek durumu kirletmesin)
+    replay_path = os.getenv("LCU_REPLAY", "").strip()
+    record_path = os.getenv("LCU_RECORD", "").strip()
+    if replay_path:
+        from lcu_record import ReplayLcu
+        lcu = boot.run("lcu_session", ReplayLcu.load, replay_path,
+                       speed=float(os.getenv("LCU_REPLAY_SPEED", "1") or 1))
+    else:
+        recorder = None
+        if record_path:
+            import atexit
+            from lcu_record import Recorder
+            recorder = Recorder(record_path)
+            atexit.register(recorder.close)
+        lcu = boot.run("lcu_session", LcuSession, recorder=recorder)
+    chat_db = os.getenv("CHAT_DB", "off" if replay_path else "chat_history.db").strip()
+    store = None
+    if chat_db and chat_db.lower() not in ("off", "0", "false", "no"):
+        try:
+            store = boot.run("chat_store", ChatStore, chat_db)
+            log_once("STORE", f"sohbet geçmişi: {chat_db} (fts={store.has_fts})")
+        except Exception as e:
+            log_once("STORE", f"açılamadı ({chat_db}): {e}")
+    state_path = os.getenv("WATCH_STATE", "off" if replay_path else "watch_state.json").strip()
+    cursors = None
+    if state_path and state_path.lower() not in ("off", "0", "false", "no"):
+        cursors = boot.run("cursor_store", CursorStore, state_path)
+    cs = ChatService(lcu, store=store, cursors=cursors)
+    # Bot yanıtları konuşma başına hız sınırlı kuyruktan gider; art arda yanıtlar tek mesajda birleşir
+    if os.getenv("OUTBOX", "on").strip().lower() not in ("off", "0", "false", "no"):
+        cs.outbox = SendQueue(rate=float(os.getenv("OUTBOX_RATE", "1") or 1),
+                              burst=float(os.getenv("OUTBOX_BURST", "3") or 3),
+                              merge=float(os.getenv("OUTBOX_MERGE_MS", "300") or 300) / 1000.0,
+                              workers=int(os.getenv("OUTBOX_WORKERS", "3") or 3))
+    # Arkadaş listesi + kendi durumum tek thread'de yoklanır; friends()/my_availability() önbellekten okunur
+    presence_iv = os.getenv("PRESENCE_INTERVAL", "3").strip().lower()
+    presence = None
+    if presence_iv not in ("off", "0", "false", "no", ""):
+        presence = cs.presence = PresenceTracker(cs, interval=float(presence_iv))
+        presence.subscribe(lambda ev: log_once("PRESENCE", format_event(ev)),
+                           kinds=("friend_online", "friend_offline", "me_status"))
+    presence_notify = [k.strip() for k in os.getenv("PRESENCE_NOTIFY", "").lower().split(",") if k.strip()]
+    presence_notify = [("friend_" + k if "friend_" + k in PRESENCE_KINDS else k) for k in presence_notify]
 
     # Ayarlar (ENV)
-    cfg = {
+    cfg = ConfigStore({
         "announce":      os.getenv("ANNOUNCE_CMDS", "true").lower()  in ("1","true","on","yes"),
         "silent_group":  os.getenv("SILENT_GROUP",  "false").lower() in ("1","true","on","yes"),
         "quiet":         os.getenv("QUIET",         "false").lower() in ("1","true","on","yes"),
@@ -495,23 +485,24 @@ def main():
         "auto_pick_enabled": os.getenv("AUTO_PICK_ENABLED", "false").lower() in ("1","true","on","yes"),
         "auto_pick_lock":    os.getenv("AUTO_PICK_LOCK",    "true").lower()  in ("1","true","on","yes"),
         "auto_pick_list":    os.getenv("AUTO_PICK",         "").strip(),   # "Ahri,Annie,Katarina"
-        "auto_pick_ids":     [],  # isimler id'ye çevrilip buraya doldurulacak
-    }
-
-    # Auto-pick isimlerini id'ye çevir
-    def _hydrate_pick_ids():
-        names = [x.strip() for x in (cfg["auto_pick_list"] or "").split(",") if x.strip()]
-        ids = []
-        for nm in names:
-            cid = cs.champion_id_from_text(nm)
-            if cid and cid not in ids:
-                ids.append(cid)
-        cfg["auto_pick_ids"] = ids
-    _hydrate_pick_ids()
+        "auto_pick_ids":     [],  # türetilmiş: bind_pick_resolver isimleri id'ye çevirir
+        "auto_pick_unknown": [],
+        # --- AUTOBAN + kurallar (pick_rules.py) ---
+        "auto_ban_enabled":  os.getenv("AUTO_BAN_ENABLED",  "false").lower() in ("1","true","on","yes"),
+        "auto_ban_list":     os.getenv("AUTO_BAN",          "").strip(),   # "Yasuo,Zed"
+        "auto_ban_ids":      [],
+        "auto_ban_unknown":  [],
+        "pick_rules":        os.getenv("PICK_RULES",        "").strip(),   # pick_rules.json
+        "bench_snipe":       os.getenv("BENCH_SNIPE",       "false").lower() in ("1","true","on","yes"),
+        # --- BASLAT onayı (Telegram) ---
+        "start_approval_ttl":     float(os.getenv("START_APPROVAL_TTL", "60") or 60),
+        "start_approval_default": os.getenv("START_APPROVAL_DEFAULT", "deny").lower() in ("1","true","on","yes","approve"),
+    })
+    bind_pick_resolver(cs, cfg)
 
     if cfg["fallback_click"] and not CLICKER_AVAILABLE:
         log_once("READY", "AUTO_READY_FALLBACK_CLICK sadece Windows'ta desteklenir; devre dışı bırakıldı.")
-        cfg["fallback_click"] = False
+        cfg.update(fallback_click=False)
 
     log_once("CFG",
         f"announce={cfg['announce']} silent_group={cfg['silent_group']} "
@@ -519,93 +510,191 @@ def main():
         f"fallback_click={cfg['fallback_click']} "
         f"auto_pick_enabled={cfg['auto_pick_enabled']} "
         f"auto_pick_lock={cfg['auto_pick_lock']} "
-        f"auto_pick_list={cfg['auto_pick_list']} ids={cfg['auto_pick_ids']}"
+        f"auto_pick_list={cfg['auto_pick_list']} "
+        f"auto_ban_enabled={cfg['auto_ban_enabled']} auto_ban_list={cfg['auto_ban_list']} "
+        f"pick_rules={cfg['pick_rules'] or '-'} bench_snipe={cfg['bench_snipe']} "
+        f"start_approval_ttl={cfg['start_approval_ttl']} start_approval_default={cfg['start_approval_default']}"
     )
 
+    # --- Paralel warm-up: kimlik, şampiyon kataloğu ve Telegram birbirini beklemez ---
+    def _refresh_me():
+        cs.refresh_me()
+        log_once("SELF", str(cs.ME))
+
+    # Tam katalog indirilince ENV'deki auto-pick isimlerini id'ye çevir
+    def _hydrate_pick_ids():
+        cs.champion_catalog()
+        cfg.renotify("auto_pick_list", "auto_ban_list")
+
+    me_ready = boot.submit("refresh_me", _refresh_me)
+    boot.submit("champion_catalog", _hydrate_pick_ids)
+
+    # Komutlar watcher thread'inde değil havuzda çalışır: konuşma içinde sıralı, konuşmalar arası paralel
+    global CMD_POOL
+    CMD_POOL = cmd_pool = CommandPool(workers=int(os.getenv("CMD_WORKERS", "4") or 4),
+                                      deadline=float(os.getenv("CMD_DEADLINE", "10") or 10))
+    if os.getenv("CMD_DEDUP", "").strip():
+        log_once("DEDUP", f"pencereler: {DEDUP.configure(os.getenv('CMD_DEDUP', ''))}")
+
     dm_callbacks = []
 
-    def _dm_command_callback(friend_key: str, friend_name: str, body: str, is_me: bool):
-        if is_me:
-            return
+    def _dm_command(friend_key: str, friend_name: str, body: str):
         if handle_dm_party_command(cs, friend_key, friend_name, body, cfg=cfg):
             who = friend_name or friend_key
             log_once("DM-CMD", f"{who} → {body}")
 
+    def _dm_command_callback(friend_key: str, friend_name: str, body: str, is_me: bool):
+        if is_me:
+            return
+        cmd_pool.submit(f"dm:{friend_key}", command_kind(body), _dm_command, friend_key, friend_name, body)
+
     dm_callbacks.append(_dm_command_callback)
 
-    # Telegram köprü (varsa)
+    # Telegram köprü (varsa) — python-telegram-bot yalnızca yapılandırılmışsa import edilir
     BOT = os.getenv("TELEGRAM_BOT_TOKEN", "")
     OWNER = int(os.getenv("TELEGRAM_OWNER_ID", "0") or 0)
     FORUM = os.getenv("TELEGRAM_FORUM_ID", "")  # -100... forum
-    tb: Optional[TelegramBridge] = None
-    if BOT and OWNER:
+    API_URL = os.getenv("TELEGRAM_API_URL", "").strip() or None  # sahte/yerel Bot API
+    # Group watcher, köprü hazır olunca start_manager'ı buradan okur
+    tg: dict = {"tb": None, "start_manager": None, "ready": None}
+
+    def _start_telegram():
+        from telegram_bridge import TelegramBridge
         tb = TelegramBridge(cs, owner_id=OWNER, bot_token=BOT,
-                            forum_chat_id=(int(FORUM) if FORUM else None))
+                            forum_chat_id=(int(FORUM) if FORUM else None), base_url=API_URL)
         tb.start_in_thread()
         if not tb.wait_until_ready(10.0):
             log_once("TG", "Telegram bridge hazır olamadı (10 sn timeout)")
+        tg["tb"] = tb
+        tg["start_manager"] = StartApprovalManager(cs, cfg, tb)
         dm_callbacks.append(tb.on_dm_from_lol)
+        if presence is not None and presence_notify:
+            presence.subscribe(lambda ev: tb.notify(format_event(ev)), kinds=presence_notify)
         log_once("TG", "Telegram bridge aktif (main üzerinden).")
+
+    if BOT and OWNER:
+        tg["ready"] = boot.submit("telegram", _start_telegram)
     else:
         log_once("TG", "Pasif: TELEGRAM_BOT_TOKEN / TELEGRAM_OWNER_ID set değil.")
 
-    start_manager = StartApprovalManager(cs, cfg, tb) if tb else None
-
     def _dm_dispatcher(friend_key: str, friend_name: str, body: str, is_me: bool):
-        for cb in dm_callbacks:
+        for cb in list(dm_callbacks):
             try:
                 cb(friend_key, friend_name, body, is_me)
             except Exception as e:
                 log_once("DM-CB", f"err={e}")
 
-    threading.Thread(target=cs.watch_dms, args=(_dm_dispatcher,), daemon=True).start()
-    log_once("DM", "DM watcher aktif.")
-
-    # Lobby & queue watcher (ID/solo/phase/readycheck logları)
-    # Lobby grup mesajlarını izle → komutları işle
-    threading.Thread(
-        target=lambda: cs.watch_group_messages(
-            lambda cid, body, frm: handle_group_command(
-                cs,
-                cid,
-                body,
-                frm,
-                cfg,
-                start_request_handler=(start_manager.maybe_request if start_manager else None),
+    def _start_request(conv_id, requester, reply_fn):
+        sm = tg["start_manager"]
+        if sm is None and tg["ready"] is not None:
+            # Group watcher köprüden önce başlar: açılıştaki BASLAT onaysız geçmesin diye köprüyü
+            # (komutun son tarihi kadar) bekle
+            futures_wait([tg["ready"]], timeout=max(0.0, min(remaining(), TELEGRAM_READY_WAIT)))
+            sm = tg["start_manager"]
+            if sm is None:
+                log_once("TG", "BASLAT: Telegram köprüsü hazır değil, onay istenemedi")
+        return sm.maybe_request(conv_id, requester, reply_fn) if sm else False
+
+    # Mesaj watcher'ları kimliğe (ME) ihtiyaç duyar: _is_me doğru çalışsın diye refresh_me'yi bekler
+    def _start_dm_watcher():
+        threading.Thread(target=cs.watch_dms, args=(_dm_dispatcher,), name="dm-watcher", daemon=True).start()
+        log_once("DM", "DM watcher aktif.")
+
+    def _start_group_watcher():
+        # Lobby grup mesajlarını izle → komutları işle
+        threading.Thread(
+            target=lambda: cs.watch_group_messages(
+                lambda cid, body, frm: cmd_pool.submit(
+                    cid,
+                    command_kind(body),
+                    handle_group_command,
+                    cs,
+                    cid,
+                    body,
+                    frm,
+                    cfg,
+                    start_request_handler=_start_request,
+                ),
+                0.8,  # interval
+                True,  # include_self → SOLO desteği
+                True  # debug → her mesajı GRP-SEE olarak yaz
             ),
-            0.8,  # interval
-            True,  # include_self → SOLO desteği
-            True  # debug → her mesajı GRP-SEE olarak yaz
-        ),
-        daemon=True
-    ).start()
+            name="group-watcher",
+            daemon=True
+        ).start()
+
+    watchers = boot.mark_after([boot.after(me_ready, "dm_watcher", _start_dm_watcher),
+                                boot.after(me_ready, "group_watcher", _start_group_watcher)], "watchers")
+
+    def _check_watchers(fut):
+        took = fut.result()
+        if took > StartupPipeline.WATCHERS_TARGET:
+            log_once("BOOT", f"watcher'lar {took:.2f} sn'de başladı (hedef < {StartupPipeline.WATCHERS_TARGET:.0f} sn)")
+    watchers.add_done_callback(_check_watchers)
 
     # Ready-check watcher
     stop_flag = {'stop': False}
-    threading.Thread(target=ready_check_watcher, args=(cs, cfg, stop_flag), daemon=True).start()
+    threading.Thread(target=ready_check_watcher, args=(cs, cfg, stop_flag), name="ready-check", daemon=True).start()
+
+    if presence is not None:
+        threading.Thread(target=presence.run, args=(stop_flag,), name="presence", daemon=True).start()
 
-    # Champ Select watcher
-    threading.Thread(target=champ_select_watcher, args=(cs, cfg, stop_flag), daemon=True).start()
+    # Champ Select watcher (auto_pick_ids katalog gelince dolar)
+    threading.Thread(target=champ_select_watcher, args=(cs, cfg, stop_flag), name="champ-select", daemon=True).start()
+
+    # ARAM bench sniping (bench_snipe açıkken champ select session'ını sık yoklar)
+    global BENCH_SNIPER
+    BENCH_SNIPER = BenchSniper(cs, cfg)
+    threading.Thread(target=BENCH_SNIPER.run, args=(stop_flag,), name="bench-sniper", daemon=True).start()
 
     # Ekran tıklayıcı (şimdilik pasif)
     CLICK_STATE["active"] = False
     if CLICKER_AVAILABLE:
-        threading.Thread(target=clicker_worker, daemon=True).start()
+        threading.Thread(target=clicker_worker, name="ui-clicker", daemon=True).start()
     else:
         log_once("CLICK", "UI clicker thread'i başlatılmadı (Windows dışı platform).")
 
-    # Acil durdurma hotkey
-    threading.Thread(target=emergency_hotkey, args=(stop_flag,), daemon=True).start()
+    # Acil durdurma hotkey (daemon modda ekran/klavye yok)
+    if not daemon:
+        threading.Thread(target=emergency_hotkey, args=(stop_flag,), name="hotkey", daemon=True).start()
+
+    # Uzak ajan modu (controller'lar ağ üzerinden komut gönderebilir)
+    AGENT_LISTEN = os.getenv("AGENT_LISTEN", "").strip()  # örn. 0.0.0.0:8765
+    if AGENT_LISTEN:
+        AGENT_TOKEN = os.getenv("AGENT_TOKEN", "")
+        if not AGENT_TOKEN:
+            log_once("AGENT", "AGENT_LISTEN set ama AGENT_TOKEN yok; ajan başlatılmadı.")
+        else:
+            from remote_agent import AgentServer
+            host, _, port = AGENT_LISTEN.rpartition(":")
+            boot.run("agent", lambda: AgentServer(cs, AGENT_TOKEN, host=host or "0.0.0.0",
+                                                  port=int(port), cfg=cfg).start_in_thread())
+
+    # Yerel HTTP kontrol API'si + SSE durum akışı (daemon modda varsayılan olarak açık)
+    HTTP_LISTEN = os.getenv("HTTP_LISTEN", "127.0.0.1:8787" if daemon else "").strip()
+    if HTTP_LISTEN and HTTP_LISTEN.lower() not in ("off", "0", "false", "no"):
+        from control_api import start_control_api
+        try:
+            boot.run("control_api", start_control_api, cs, cfg,
+                     lambda cmd, out: execute_cli_command(cs, cfg, cmd, out), HTTP_LISTEN,
+                     token=os.getenv("API_TOKEN", ""), help_fn=_print_help,
+                     on_quit=lambda: stop_flag.update(stop=True),
+                     cors_origin=os.getenv("API_CORS_ORIGIN", "").strip())
+        except Exception as e:
+            log_once("API", f"başlatılamadı ({HTTP_LISTEN}): {e}")
 
     # Lobby sohbetini otomatik takip et ve ilk anonsu isteğe bağlı gönder
     def _auto_follow():
         last = None
         while not stop_flag['stop']:
+            loop_tick()
+            if not cs.wait_online():
+                continue
             try:
                 if cs.follow_lobby_chat() and cs.active_group_id != last:
                     log_once("GRP", f"Lobby sohbeti takipte: {cs.active_group_id}")
                     if cs.is_party_leader() and cfg.get("announce", True):
-                        cs.send(cs.active_group_id,
+                        cs.reply(cs.active_group_id,
                                 "Komutlar: BASLAT | DURDUR | PICKLIST <ad,ad> | PICK ON|OFF | LOCK ON|OFF")
                         members = cs.group_members_with_status(cs.active_group_id)
                         for i, (name, tag) in enumerate(members, 1):
@@ -614,7 +703,29 @@ def main():
             except Exception as e:
                 log_once("GRP", f"auto err: {e}")
             time.sleep(2.0)
-    threading.Thread(target=_auto_follow, daemon=True).start()
+    threading.Thread(target=_auto_follow, name="lobby-follow", daemon=True).start()
+
+    boot.report_when_done()
+
+    if replay_path:
+        def _replay_end():
+            while not stop_flag['stop'] and not lcu.finished():
+                time.sleep(0.5)
+            miss = sum(lcu.misses.values())
+            log_once("REPLAY", f"kayıt sonu: {lcu.served} yanıt, kayıtta olmayan {miss} istek")
+            if daemon:
+                stop_flag.update(stop=True)
+        threading.Thread(target=_replay_end, daemon=True).start()
+
+    if daemon:
+        import signal
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try: signal.signal(sig, lambda *_: stop_flag.update(stop=True))
+            except Exception: pass
+        while not stop_flag['stop']:
+            time.sleep(0.5)
+        log_once("EXIT", "daemon durduruldu.")
+        return
 
     # -------- CLI döngüsü --------
     while not stop_flag['stop']:
@@ -622,181 +733,356 @@ def main():
             cmd = input('> ').strip()
         except (EOFError, KeyboardInterrupt):
             break
-        low = cmd.lower()
-
-        if low in ("quit","exit","stop","dur","bitir"):
+        if cmd.lower() in QUIT_WORDS:
             break
+        execute_cli_command(cs, cfg, cmd)
 
-        elif low in ("help","/help","?"):
-            _print_help()
 
-        elif low == "status":
-            print({"me": cs.ME, "cfg": cfg})
+QUIT_WORDS = ("quit","exit","stop","dur","bitir")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5") or 5) / 1000.0
+TRACE_FILE = os.getenv("TRACE_FILE", "off").strip()
 
-        elif low in ("/friends","/friend","/all-friend"):
-            print_friends(cs)
 
-        elif low == "/online-friend":
-            print_friends(cs, only="online")
+def execute_cli_command(cs: ChatService, cfg: ConfigStore, cmd: str, out: Callable[[str], None] = print) -> bool:
+    """Tek bir CLI komutunu çalıştırır; çıktıyı out(...) ile yazar (CLI: print, HTTP API: liste).
 
-        elif low == "/offline-friend":
-            print_friends(cs, only="offline")
+    Tanınmayan komutta False döner.
+    """
+    cmd = (cmd or "").strip()
+    low = cmd.lower()
 
-        elif low == "/chat-groups":
-            groups = cs.list_groups()
-            for i,g in enumerate(groups,1):
-                print(f"[{i}] id={g.get('id')} name={g.get('name')}")
+    if low in ("help","/help","?"):
+        _print_help(out)
 
-        elif low.startswith("/chat-group "):
-            key = cmd.split(" ",1)[1].strip()
-            g = cs.select_group(key)
-            if not g:
-                print("(grup bulunamadı)")
-            else:
-                members = cs.group_members_with_status(g['id'])
-                print("KING")
-                for i,(name, tag) in enumerate(members,1):
-                    print(f"[{i}] {tag} {name}")
-
-        elif low == "/group-log":
-            if not cs.active_group_id:
-                print("(aktif grup seçilmedi)")
-            else:
-                msgs = cs.messages(cs.active_group_id, limit=50)
-                for m in msgs:
-                    is_me = False
-                    if m.get('isSelf') is True: is_me=True
-                    if str(m.get('fromSummonerId') or '') == str(cs.ME.get('summonerId') or ''): is_me=True
-                    pid = (m.get('fromPid') or '').split('@',1)[0]
-                    if pid and pid == (cs.ME.get('puuid') or ''): is_me=True
-                    body = (m.get('body') or '').replace('\r\n',' ').replace('\n',' ').replace('\r',' ')
-                    print(("ME=>YOU " if is_me else "YOU=>ME ") + body)
-
-        elif low.startswith("/sayg "):
-            text = cmd.split(" ",1)[1]
-            if not cs.active_group_id:
-                print("(aktif grup yok)")
-            else:
-                ok = cs.send(cs.active_group_id, text)
-                print("(gönderildi)" if ok else "(gönderilemedi)")
+    elif low == "status":
+        out(str({"me": cs.ME, "cfg": dict(cfg.snapshot())}))
 
-        elif low.startswith("/dm "):
-            try:
-                _, rest = cmd.split(" ", 1)
-                name, text = rest.split(" ", 1)
-            except ValueError:
-                print("Kullanım: /dm <kullanıcı-adı> <mesaj>"); continue
-            ok = cs.dm_send(name, text)
-            print("(gönderildi)" if ok else "(gönderilemedi)")
-
-        elif low.startswith("/dm-log "):
-            name = cmd.split(" ",1)[1].strip()
-            for line in cs.dm_log(name, limit=30):
-                print(line)
-
-        elif low == "/geo":
-            print(cs.geoinfo_quick() or "(boş yanıt)")
-
-        elif low == "/geo-json":
-            import json
-            data = cs.geoinfo()
-            print(json.dumps(data, ensure_ascii=False, indent=2) if data else "(boş yanıt)")
-
-        elif low == "/bench":
-            ids = cs.cs_bench_list()
-            if not ids:
-                print("(bench boş)")
-            else:
-                cat = cs.champion_catalog()["by_id"]
-                names = [cat.get(i, {}).get("name") or str(i) for i in ids]
-                print("BENCH:", ", ".join(names))
-
-        elif low.startswith("/bench-pick "):
-            name = cmd.split(" ", 1)[1].strip()
-            cid = cs.champion_id_from_text(name)
-            if not cid:
-                print(f'Bilinmeyen şampiyon: "{name}"');
-            else:
-                ok = cs.bench_swap(cid)
-                print("(bench swap OK)" if ok else "(bench swap FAIL)")
+    elif low in ("/friends","/friend","/all-friend"):
+        print_friends(cs, out=out)
 
-        elif low.startswith("/auto-ready"):
-            parts = cmd.split()
-            if len(parts) == 1:
-                print(f"auto-ready = {'on' if cfg['auto_ready'] else 'off'}")
-            else:
-                val = parts[1].lower()
-                if val in ("on","true","1","yes","evet","aç","ac"):
-                    cfg["auto_ready"] = True;  print("auto-ready ON")
-                elif val in ("off","false","0","no","hayir","kapat","kapalı","kapali"):
-                    cfg["auto_ready"] = False; print("auto-ready OFF")
-                else:
-                    print("Kullanım: /auto-ready on|off")
+    elif low == "/online-friend":
+        print_friends(cs, only="online", out=out)
+
+    elif low == "/offline-friend":
+        print_friends(cs, only="offline", out=out)
+
+    elif low == "/chat-groups":
+        groups = cs.list_groups()
+        for i,g in enumerate(groups,1):
+            out(f"[{i}] id={g.get('id')} name={g.get('name')}")
+
+    elif low.startswith("/chat-group "):
+        key = cmd.split(" ",1)[1].strip()
+        g = cs.select_group(key)
+        if not g:
+            out("(grup bulunamadı)")
+        else:
+            members = cs.group_members_with_status(g['id'])
+            out("KING")
+            for i,(name, tag) in enumerate(members,1):
+                out(f"[{i}] {tag} {name}")
+
+    elif low == "/group-log":
+        if not cs.active_group_id:
+            out("(aktif grup seçilmedi)")
+        else:
+            for m in cs.history(cs.active_group_id, limit=50):
+                out(("ME=>YOU " if m["is_me"] else "YOU=>ME ") + m["body"])
+
+    elif low.startswith("/search "):
+        text = cmd.split(" ", 1)[1].strip()
+        if not cs.store:
+            out("(sohbet geçmişi kapalı: CHAT_DB)")
+        else:
+            hits = cs.search_history(text, limit=20)
+            if not hits:
+                out("(eşleşme yok)")
+            for m in hits:
+                out(f"[{cs._fmt_epoch(m['ts'])}] {m['conv_id'].split('@', 1)[0][:12]} {m['sender']}: {m['body']}")
+
+    elif low.startswith("/sayg "):
+        text = cmd.split(" ",1)[1]
+        if not cs.active_group_id:
+            out("(aktif grup yok)")
+        else:
+            ok = cs.send(cs.active_group_id, text)
+            out("(gönderildi)" if ok else "(gönderilemedi)")
+
+    elif low.startswith("/dm "):
+        try:
+            _, rest = cmd.split(" ", 1)
+            name, text = rest.split(" ", 1)
+        except ValueError:
+            out("Kullanım: /dm <kullanıcı-adı> <mesaj>"); return True
+        ok = cs.dm_send(name, text)
+        out("(gönderildi)" if ok else "(gönderilemedi)")
+
+    elif low.startswith("/dm-log "):
+        name = cmd.split(" ",1)[1].strip()
+        for line in cs.dm_log(name, limit=30):
+            out(line)
+
+    elif low == "/geo":
+        out(cs.geoinfo_quick() or "(boş yanıt)")
+
+    elif low == "/geo-json":
+        import json
+        data = cs.geoinfo()
+        out(json.dumps(data, ensure_ascii=False, indent=2) if data else "(boş yanıt)")
+
+    elif low == "/bench":
+        ids = cs.cs_bench_list()
+        if not ids:
+            out("(bench boş)")
+        else:
+            cat = cs.champion_catalog()["by_id"]
+            names = [cat.get(i, {}).get("name") or str(i) for i in ids]
+            out("BENCH: " + ", ".join(names))
+
+    elif low.startswith("/bench-pick "):
+        name = cmd.split(" ", 1)[1].strip()
+        cid = cs.champion_id_from_text(name)
+        if not cid:
+            out(f'Bilinmeyen şampiyon: "{name}"');
+        else:
+            ok = cs.bench_swap(cid)
+            out("(bench swap OK)" if ok else "(bench swap FAIL)")
 
-        elif low.startswith("/auto-pick-lock"):
-            parts = cmd.split()
-            if len(parts) == 1:
-                print(f"auto-pick-lock = {'on' if cfg['auto_pick_lock'] else 'off'}")
+    elif low.startswith("/auto-ready"):
+        parts = cmd.split()
+        if len(parts) == 1:
+            out(f"auto-ready = {'on' if cfg['auto_ready'] else 'off'}")
+        else:
+            val = parts[1].lower()
+            if val in ("on","true","1","yes","evet","aç","ac"):
+                cfg.update(auto_ready=True);  out("auto-ready ON")
+            elif val in ("off","false","0","no","hayir","kapat","kapalı","kapali"):
+                cfg.update(auto_ready=False); out("auto-ready OFF")
             else:
-                val = parts[1].lower()
-                if val in ("on","true","1","yes","ac","aç"):
-                    cfg["auto_pick_lock"] = True;  print("auto-pick-lock ON (hover + lock)")
-                elif val in ("off","false","0","no","kapat"):
-                    cfg["auto_pick_lock"] = False; print("auto-pick-lock OFF (sadece hover)")
-                else:
-                    print("Kullanım: /auto-pick-lock on|off")
+                out("Kullanım: /auto-ready on|off")
 
-        elif low.startswith("/auto-pick"):
-            parts = cmd.split(" ", 1)
-            if len(parts) == 1:
-                print(f"auto-pick = {'on' if cfg['auto_pick_enabled'] else 'off'}, lock={'on' if cfg['auto_pick_lock'] else 'off'}, list={cfg['auto_pick_list']} ids={cfg['auto_pick_ids']}")
+    elif low.startswith("/auto-pick-lock"):
+        parts = cmd.split()
+        if len(parts) == 1:
+            out(f"auto-pick-lock = {'on' if cfg['auto_pick_lock'] else 'off'}")
+        else:
+            val = parts[1].lower()
+            if val in ("on","true","1","yes","ac","aç"):
+                cfg.update(auto_pick_lock=True);  out("auto-pick-lock ON (hover + lock)")
+            elif val in ("off","false","0","no","kapat"):
+                cfg.update(auto_pick_lock=False); out("auto-pick-lock OFF (sadece hover)")
             else:
-                arg = parts[1].strip()
-                if arg.lower() in ("on","true","1","yes","ac","aç"):
-                    cfg["auto_pick_enabled"] = True
-                    print("auto-pick ON")
-                elif arg.lower() in ("off","false","0","no","kapat"):
-                    cfg["auto_pick_enabled"] = False
-                    print("auto-pick OFF")
-                else:
-                    # Liste güncelle (virgüllü isimler)
-                    cfg["auto_pick_list"] = arg
-                    # id'leri güncelle
-                    names = [x.strip() for x in arg.split(",") if x.strip()]
-                    ids = []
-                    for nm in names:
-                        cid = cs.champion_id_from_text(nm)
-                        if cid and cid not in ids:
-                            ids.append(cid)
-                    cfg["auto_pick_ids"] = ids
-                    print(f"auto-pick list set → {cfg['auto_pick_list']}  ids={ids}")
-
-        elif low.startswith("/announce"):
-            val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
-            if   val in ("on","1","true","yes","ac","aç"): cfg["announce"]=True;  print("announce=ON")
-            elif val in ("off","0","false","no","kapat"):  cfg["announce"]=False; print("announce=OFF")
-            else: print(f"announce={cfg['announce']}")
-
-        elif low.startswith("/silent-group"):
-            val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
-            if   val in ("on","1","true","yes","ac","aç"): cfg["silent_group"]=True;  print("silent_group=ON")
-            elif val in ("off","0","false","no","kapat"):  cfg["silent_group"]=False; print("silent_group=OFF")
-            else: print(f"silent_group={cfg['silent_group']}")
-
-        elif low.startswith("/quiet"):
-            val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
-            if   val in ("on","1","true","yes","ac","aç"): cfg["quiet"]=True;  print("quiet=ON")
-            elif val in ("off","0","false","no","kapat"):  cfg["quiet"]=False; print("quiet=OFF")
-            else: print(f"quiet={cfg['quiet']}")
-
-        elif low.startswith("/sayl "):  # say to lobby
-            txt = cmd.split(" ", 1)[1]
-            ok = cs.send_to_lobby(txt)
-            print("(lobiye gönderildi)" if ok else "(lobi sohbeti bulunamadı)")
+                out("Kullanım: /auto-pick-lock on|off")
 
+    elif low.startswith("/auto-pick"):
+        parts = cmd.split(" ", 1)
+        if len(parts) == 1:
+            out(f"auto-pick = {'on' if cfg['auto_pick_enabled'] else 'off'}, lock={'on' if cfg['auto_pick_lock'] else 'off'}, list={cfg['auto_pick_list']} ids={list(cfg['auto_pick_ids'])}")
+        else:
+            arg = parts[1].strip()
+            if arg.lower() in ("on","true","1","yes","ac","aç"):
+                cfg.update(auto_pick_enabled=True)
+                out("auto-pick ON")
+            elif arg.lower() in ("off","false","0","no","kapat"):
+                cfg.update(auto_pick_enabled=False)
+                out("auto-pick OFF")
+            else:
+                # Liste güncelle (virgüllü isimler); id'ler abonelikle aynı çağrıda çözülür
+                snap = cfg.update(auto_pick_list=arg)
+                out(f"auto-pick list set → {snap['auto_pick_list']}  ids={list(snap['auto_pick_ids'])}")
+
+    elif low.startswith("/auto-ban"):
+        parts = cmd.split(" ", 1)
+        if len(parts) == 1:
+            out(f"auto-ban = {'on' if cfg['auto_ban_enabled'] else 'off'}, list={cfg['auto_ban_list']} ids={list(cfg['auto_ban_ids'])}")
+        else:
+            arg = parts[1].strip()
+            if arg.lower() in ("on","true","1","yes","ac","aç"):
+                cfg.update(auto_ban_enabled=True)
+                out("auto-ban ON")
+            elif arg.lower() in ("off","false","0","no","kapat"):
+                cfg.update(auto_ban_enabled=False)
+                out("auto-ban OFF")
+            else:
+                snap = cfg.update(auto_ban_list=arg)
+                out(f"auto-ban list set → {snap['auto_ban_list']}  ids={list(snap['auto_ban_ids'])}")
+
+    elif low.startswith("/pick-rules"):
+        arg = cmd.split(" ", 1)[1].strip() if " " in cmd else ""
+        if arg.lower() == "reload":
+            out("kurallar yeniden yüklendi" if get_rules(cfg["pick_rules"]).reload() else "yeniden yüklenemedi")
+        elif arg:
+            cfg.update(pick_rules=arg)
+        snap = cfg.snapshot()
+        view = SessionView.from_session(cs.cs_session())
+        planner = ChampSelectPlanner(cs)
+        out(f"kurallar: {snap['pick_rules'] or '-'}")
+        out(planner.plan_for(view, snap).describe(planner.name_of))
+
+    elif low.startswith("/bench-snipe"):
+        val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
+        if   val in ("on","1","true","yes","ac","aç"): cfg.update(bench_snipe=True);  out("bench-snipe ON")
+        elif val in ("off","0","false","no","kapat"):  cfg.update(bench_snipe=False); out("bench-snipe OFF")
         else:
-            if not cfg.get("quiet", False):
-                _print_help()
+            out(f"bench-snipe = {'on' if cfg['bench_snipe'] else 'off'}")
+            if BENCH_SNIPER is not None:
+                out(str(BENCH_SNIPER.stats()))
+
+    elif low.startswith("/announce"):
+        val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
+        if   val in ("on","1","true","yes","ac","aç"): cfg.update(announce=True);  out("announce=ON")
+        elif val in ("off","0","false","no","kapat"):  cfg.update(announce=False); out("announce=OFF")
+        else: out(f"announce={cfg['announce']}")
+
+    elif low.startswith("/silent-group"):
+        val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
+        if   val in ("on","1","true","yes","ac","aç"): cfg.update(silent_group=True);  out("silent_group=ON")
+        elif val in ("off","0","false","no","kapat"):  cfg.update(silent_group=False); out("silent_group=OFF")
+        else: out(f"silent_group={cfg['silent_group']}")
+
+    elif low.startswith("/quiet"):
+        val = (cmd.split(" ",1)[1].strip().lower() if " " in cmd else "")
+        if   val in ("on","1","true","yes","ac","aç"): cfg.update(quiet=True);  out("quiet=ON")
+        elif val in ("off","0","false","no","kapat"):  cfg.update(quiet=False); out("quiet=OFF")
+        else: out(f"quiet={cfg['quiet']}")
+
+    elif low == "/profile" or low.startswith("/profile "):
+        parts = low.split()
+        try:
+            secs = float(parts[1]) if len(parts) > 1 else 10.0
+        except ValueError:
+            out("Kullanım: /profile [saniye] [wall]"); return True
+        if SamplingProfiler._busy.locked():
+            out("(başka bir profil zaten çalışıyor)"); return True
+        prof = SamplingProfiler(interval=PROFILE_INTERVAL, mode="wall" if "wall" in parts[2:] else "cpu")
+        path = os.path.join(PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+
+        def _profile():
+            # örnekleme arka planda: CLI / HTTP API komut kilidi süre boyunca tutulmaz
+            try:
+                res = prof.run(secs, path)
+            except Exception as e:
+                log_once("PROFILE", f"profil alınamadı: {e}"); return
+            log_once("PROFILE", f"{res['samples']} örnek, {res['stacks']} yığın, "
+                                f"örnekleyici yükü %{res['overhead_pct']} → {path}")
+            for name, pct in list(res["thread_cpu_pct"].items())[:8]:
+                log_once("PROFILE", f"  CPU %{pct:5.1f}  {name}")
+            for frame, n in prof.top_frames(8):
+                log_once("PROFILE", f"  {n:6d}  {frame}")
+
+        threading.Thread(target=_profile, name="profile", daemon=True).start()
+        out(f"(profil alınıyor: {min(secs, 300):g} sn, kip={prof.mode}; bitince özet loglanır → {path})")
+
+    elif low == "/threads" or low.startswith("/threads "):
+        want = cmd.split(" ", 1)[1].strip().lower() if " " in cmd else ""
+        for t in thread_report():
+            if want and want not in t["name"].lower():
+                continue
+            rate = f"{t['loop_rate']:.2f} tur/sn" if t["loop_rate"] is not None else "-"
+            cpu = f"{t['cpu_s']:.2f} sn" if t["cpu_s"] is not None else "-"
+            out(f"[{t['name']}] {'daemon ' if t['daemon'] else ''}döngü={rate} ({t['loops'] or 0}) cpu={cpu}")
+            for fr in t["stack"][:None if want else 4]:
+                out(f"    {fr}")
+
+    elif low == "/mem" or low.startswith("/mem "):
+        if low.endswith(" stop"):
+            MEM.stop(); out("(tracemalloc durduruldu)"); return True
+        res = MEM.snapshot()
+        if res["started"]:
+            out("(tracemalloc başlatıldı; farkı görmek için /mem'i tekrar çalıştırın)"); return True
+        out(f"izlenen={res['current_kib']:,.0f} KiB tepe={res['peak_kib']:,.0f} KiB")
+        out("en çok ayıranlar:")
+        for where, kib, n in res["top"]:
+            out(f"  {kib:9,.1f} KiB {n:7d} blok  {where}")
+        if res["diff"]:
+            out("önceki görüntüye göre:")
+            for where, kib, n in res["diff"]:
+                out(f"  {kib:+9,.1f} KiB {n:+7d} blok  {where}")
+
+    elif low == "/traces" or low.startswith("/traces "):
+        arg = cmd.split(" ", 1)[1].strip() if " " in cmd else ""
+        if arg.lower().startswith("export"):
+            path = arg[6:].strip() or time.strftime("traces-%Y%m%d-%H%M%S.jsonl")
+            out(f"{TRACER.export(path)} span → {path}")
+            return True
+        n = int(arg) if arg.isdigit() else 10
+        traces = TRACER.slowest(n)
+        if not traces:
+            out("(henüz trace yok)")
+        for tr in traces:
+            r = tr.root
+            attrs = " ".join(f"{k}={v}" for k, v in r.attrs.items())
+            out(f"{tr.trace_id[:8]} {tr.duration * 1000:8.1f} ms  {len(tr.spans):3d} span  "
+                f"{time.strftime('%H:%M:%S', time.localtime(tr.start))}  {r.name} {attrs}")
+
+    elif low.startswith("/trace "):
+        tr = TRACER.find(cmd.split(" ", 1)[1].strip())
+        if not tr:
+            out("(trace bulunamadı)")
+        else:
+            out(f"{tr.trace_id} {tr.duration * 1000:.1f} ms")
+            for ln in format_trace(tr):
+                out(ln)
+
+    elif low == "/cmdq":
+        if CMD_POOL is None:
+            out("(komut havuzu kapalı)"); return True
+        st = CMD_POOL.stats()
+        if not st["kinds"]:
+            out("(henüz komut yok)")
+        for kind, k in sorted(st["kinds"].items(), key=lambda kv: -kv[1]["run"]["p95_ms"]):
+            w, r = k["wait"], k["run"]
+            out(f"{kind:10s} {k['done']:5d} iş  bekleme p50={w['p50_ms']:.1f} p95={w['p95_ms']:.1f} max={w['max_ms']:.1f} ms  "
+                f"çalışma p50={r['p50_ms']:.1f} p95={r['p95_ms']:.1f} max={r['max_ms']:.1f} ms"
+                + (f"  hata={k['errors']}" if k["errors"] else "")
+                + (f"  süresi-doldu={k['expired']}" if k["expired"] else "")
+                + (f"  geç={k['late']}" if k["late"] else "")
+                + (f"  düşen={k['dropped']}" if k["dropped"] else ""))
+        busy = {key: n for key, n in st["pending"].items() if n}
+        out(f"bekleyen: {busy or '-'}  en derin kuyruk={st['max_depth']}")
+
+    elif low == "/dedup" or low.startswith("/dedup "):
+        arg = cmd.split(" ", 1)[1].strip() if " " in cmd else ""
+        if arg:
+            DEDUP.configure(arg)
+        st = DEDUP.stats()
+        out("pencere: " + ", ".join(f"{k}={v:g} sn" for k, v in st["windows"].items()))
+        for k in sorted(set(st["passed"]) | set(st["suppressed"])):
+            out(f"  {k:10s} işlenen={st['passed'].get(k, 0)} yutulan={st['suppressed'].get(k, 0)}")
+        out(f"kaçınılan LCU çağrısı={st['avoided_lcu_calls']} kayıt={st['keys']}")
+
+    elif low == "/outbox":
+        if cs.outbox is None:
+            out("(giden kuyruk kapalı; yanıtlar doğrudan gönderiliyor)"); return True
+        st = cs.outbox.stats()
+        w, c = st["wait"], st["call"]
+        out(f"hız={st['rate']:g}/sn kova={st['burst']:g} birleştirme={st['merge_ms']} ms")
+        out(f"yanıt={st['posted']} mesaj={st['sent']} birleştirilen={st['merged']} hız-sınırı={st['throttled']} "
+            f"hata={st['failed']} düşen={st['dropped']}")
+        out(f"kuyrukta bekleme p50={w['p50_ms']:.1f} p95={w['p95_ms']:.1f} max={w['max_ms']:.1f} ms  "
+            f"POST p50={c['p50_ms']:.1f} p95={c['p95_ms']:.1f} max={c['max_ms']:.1f} ms")
+        out(f"bekleyen: {st['pending'] or '-'}")
+
+    elif low == "/presence":
+        if cs.presence is None:
+            out("(presence izleyici kapalı)"); return True
+        st = cs.presence.stats()
+        age = f"{st['age_s']:g} sn önce" if st["age_s"] is not None else "henüz yok"
+        out(f"arkadaş={st['friends']} çevrimiçi={st['online']} son güncelleme={age}")
+        out(f"yoklama={st['polls']} değişmeyen gövde={st['unchanged']} çözülen={st['decoded']}")
+        out(f"olaylar: {st['events'] or '-'}")
+
+    elif low.startswith("/sayl "):  # say to lobby
+        txt = cmd.split(" ", 1)[1]
+        ok = cs.send_to_lobby(txt)
+        out("(lobiye gönderildi)" if ok else "(lobi sohbeti bulunamadı)")
+
+    else:
+        if not cfg.get("quiet", False):
+            _print_help(out)
+        return False
+    return True
 
 if __name__ == "__main__":
     main()
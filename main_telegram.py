@@ -2,20 +2,25 @@
 import os, time, threading
 from lcu_session import LcuSession
 from chat_service import ChatService
+from cursor_store import CursorStore
 from telegram_bridge import TelegramBridge
 
 BOT = os.getenv("TELEGRAM_BOT_TOKEN", "")
 OWNER = int(os.getenv("TELEGRAM_OWNER_ID", "0") or 0)
 FORUM = os.getenv("TELEGRAM_FORUM_ID", "-CHAR_ID")  # opsiyonel
+API_URL = os.getenv("TELEGRAM_API_URL", "").strip() or None  # opsiyonel (telegram_fake_api)
 
 if not BOT or not OWNER:
     raise SystemExit("TELEGRAM_BOT_TOKEN ve TELEGRAM_OWNER_ID gerekli.")
 
 lcu = LcuSession()
-cs = ChatService(lcu)
+STATE_PATH = os.getenv("WATCH_STATE", "watch_state.json").strip()
+cursors = CursorStore(STATE_PATH) if STATE_PATH and STATE_PATH.lower() not in ("off", "0", "false", "no") else None
+cs = ChatService(lcu, cursors=cursors)
 cs.refresh_me()
 
-tb = TelegramBridge(cs, owner_id=OWNER, bot_token=BOT, forum_chat_id=(int(FORUM) if FORUM else None))
+tb = TelegramBridge(cs, owner_id=OWNER, bot_token=BOT, forum_chat_id=(int(FORUM) if FORUM else None),
+                    base_url=API_URL)
 tb.start_in_thread()
 
 # *** KRİTİK ***: DM watcher'ı kesinlikle başlat
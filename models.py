@@ -0,0 +1,262 @@
+"""LCU yanıtları için hafif, __slots__'lu modeller.
+
+Ham JSON sözlükleri her poll'da tekrar tekrar `.get(...)` zincirleriyle okunuyordu
+(`f.get('name') or f.get('gameName') or ...`, `(pid or '').split('@', 1)[0]`, ISO
+zaman damgası çözme, is-me kontrolü). Modeller her yanıtı bir kez normalize eder:
+
+    me = Identity.from_me(cs.ME)
+    msgs = [Message.from_raw(m, me) for m in raw]     # ts ve is_me burada bir kez
+    msgs[-1].ts, msgs[-1].is_me, msgs[-1].body        # body ilk erişimde temizlenir
+
+Pahalı olmayan alanlar kurulumda çözülür; yalnızca bazen gereken alanlar (temiz
+mesaj gövdesi, arkadaş etiketi) ilk erişimde hesaplanıp slot'ta saklanır. Sık kullanılan
+ve çok sayıda olan Message ham sözlüğü tutmaz; az sayıdaki Friend/Conversation/
+LobbyMember/ChampSelectSession geriye uyumluluk için `raw` alanında ham veriyi taşır
+(remote agent / HTTP API JSON döndürmeye devam eder).
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import parse_ts_iso, status_tag
+
+ONLINE_AVAILABILITY = frozenset(("chat", "online", "mobile"))
+
+
+def pid_key(pid: Optional[str]) -> str:
+    """"<puuid>@pvp.net" → "<puuid>" (conv id / pid / fromPid için ortak)."""
+    return (pid or "").split("@", 1)[0]
+
+
+def _first(d: dict, *keys: str) -> str:
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return ""
+
+
+class Identity:
+    """Aktif hesabın is-me karşılaştırması için ön-normalize edilmiş kimliği."""
+
+    __slots__ = ("summoner_id", "puuid")
+
+    def __init__(self, summoner_id: str = "", puuid: str = ""):
+        self.summoner_id = summoner_id
+        self.puuid = puuid
+
+    @classmethod
+    def from_me(cls, me: Optional[dict]) -> "Identity":
+        me = me or {}
+        return cls(str(me.get("summonerId") or ""), me.get("puuid") or "")
+
+
+class Friend:
+    __slots__ = ("key", "pid", "puuid", "name", "availability", "raw", "_label")
+
+    def __init__(self, key: str, pid: str, puuid: str, name: str, availability: str, raw: dict):
+        self.key = key                    # pid'in @ öncesi (yoksa puuid)
+        self.pid = pid
+        self.puuid = puuid
+        self.name = name
+        self.availability = availability  # küçük harf
+        self.raw = raw
+        self._label = None
+
+    @classmethod
+    def from_raw(cls, d: dict) -> "Friend":
+        pid = d.get("pid") or ""
+        puuid = d.get("puuid") or ""
+        return cls(pid_key(pid) or puuid, pid, puuid,
+                   _first(d, "name", "gameName", "displayName"),
+                   _first(d, "availability", "availabilityStatus").lower(), d)
+
+    def matches_key(self, key: str) -> bool:
+        return key == pid_key(self.pid) or key == self.puuid
+
+    @property
+    def display_name(self) -> str:
+        return self.name or "Unknown"
+
+    @property
+    def is_online(self) -> bool:
+        return self.availability in ONLINE_AVAILABILITY
+
+    @property
+    def status(self) -> str:
+        return status_tag(self.availability)
+
+    @property
+    def label(self) -> str:
+        if self._label is None:
+            self._label = f"{self.status} {self.display_name}"
+        return self._label
+
+    def __repr__(self) -> str:
+        return f"Friend({self.name!r}, {self.availability!r})"
+
+
+class Conversation:
+    __slots__ = ("id", "type", "name", "raw")
+
+    def __init__(self, id: str, type: str, name: str, raw: dict):
+        self.id = id
+        self.type = type          # "chat" | "groupchat" | ... (küçük harf)
+        self.name = name
+        self.raw = raw
+
+    @classmethod
+    def from_raw(cls, d: dict) -> "Conversation":
+        return cls(d.get("id") or "", (d.get("type") or "").lower(), d.get("name") or "", d)
+
+    @property
+    def is_dm(self) -> bool:
+        return self.type == "chat"
+
+    @property
+    def is_group(self) -> bool:
+        return self.type == "groupchat"
+
+    def __repr__(self) -> str:
+        return f"Conversation({self.id!r}, {self.type!r})"
+
+
+class Message:
+    """Tek sohbet mesajı; ts (epoch sn) ve is_me kurulumda bir kez hesaplanır."""
+
+    __slots__ = ("id", "ts", "is_me", "from_name", "from_pid", "from_summoner_id", "text", "_body")
+
+    def __init__(self, id: Any, ts: float, is_me: bool, from_name: str, from_pid: str,
+                 from_summoner_id: str, text: str):
+        self.id = id
+        self.ts = ts
+        self.is_me = is_me
+        self.from_name = from_name
+        self.from_pid = from_pid              # @ öncesi
+        self.from_summoner_id = from_summoner_id
+        self.text = text                      # ham gövde
+        self._body = None
+
+    @classmethod
+    def from_raw(cls, m: dict, me: Identity, ts: Optional[float] = None) -> "Message":
+        """ts verilirse (örn. TsMemo'dan) zaman damgası tekrar çözülmez."""
+        pid = pid_key(m.get("fromPid"))
+        sid = str(m.get("fromSummonerId") or "")
+        is_me = (m.get("isSelf") is True
+                 or sid == me.summoner_id
+                 or bool(pid and pid == me.puuid))
+        if ts is None:
+            ts = parse_ts_iso(m.get("timestamp"))
+        return cls(m.get("id"), ts, is_me,
+                   _first(m, "fromSummonerName", "fromName", "senderName", "sender"),
+                   pid, sid, m.get("body") or "")
+
+    @property
+    def body(self) -> str:
+        """Tek satıra indirgenmiş gövde (log / store için)."""
+        if self._body is None:
+            self._body = self.text.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+        return self._body
+
+    @property
+    def sender(self) -> str:
+        """DM göndereni: isim → pid → summonerId."""
+        return self.from_name or self.from_pid or self.from_summoner_id or "?"
+
+    @property
+    def group_sender(self) -> str:
+        return self.from_name or "Unknown"
+
+    def to_row(self, conv_id: str, sender: Optional[str] = None) -> dict:
+        """ChatStore satırı biçimi (history() dönüşü)."""
+        return {"conv_id": conv_id, "msg_id": str(self.id or ""), "ts": self.ts,
+                "sender": sender if sender is not None else self.sender,
+                "is_me": self.is_me, "body": self.body}
+
+    def __repr__(self) -> str:
+        return f"Message({self.id!r}, ts={self.ts}, me={self.is_me})"
+
+
+class LobbyMember:
+    __slots__ = ("puuid", "summoner_id", "summoner_name", "is_leader", "raw")
+
+    def __init__(self, puuid: str, summoner_id: int, summoner_name: str, is_leader: bool, raw: dict):
+        self.puuid = puuid                  # küçük harf
+        self.summoner_id = summoner_id
+        self.summoner_name = summoner_name
+        self.is_leader = is_leader
+        self.raw = raw
+
+    @classmethod
+    def from_raw(cls, d: dict) -> "LobbyMember":
+        try:
+            sid = int(d.get("summonerId") or 0)
+        except (TypeError, ValueError):
+            sid = 0
+        return cls((d.get("puuid") or "").lower().strip(), sid, d.get("summonerName") or "",
+                   bool(d.get("isLeader")), d)
+
+    def __repr__(self) -> str:
+        return f"LobbyMember({self.summoner_name!r})"
+
+
+class ChampSelectSession:
+    """/lol-champ-select/v1/session'ın sık okunan kısmı: kendi hücrem, bench, action'lar."""
+
+    __slots__ = ("my_cell", "my_champion", "bench", "bench_enabled", "actions", "raw")
+
+    def __init__(self, my_cell: Optional[int], my_champion: int, bench: Tuple[int, ...],
+                 bench_enabled: bool, actions: List[dict], raw: dict):
+        self.my_cell = my_cell
+        self.my_champion = my_champion
+        self.bench = bench
+        self.bench_enabled = bench_enabled
+        self.actions = actions            # düzleştirilmiş action listesi
+        self.raw = raw
+
+    @classmethod
+    def from_raw(cls, sess: Optional[dict]) -> Optional["ChampSelectSession"]:
+        if not sess:
+            return None
+        me = sess.get("localPlayerCellId")
+        mine = 0
+        for m in sess.get("myTeam") or []:
+            if m.get("cellId") == me:
+                try:
+                    mine = int(m.get("championId") or 0)
+                except (TypeError, ValueError):
+                    mine = 0
+                break
+        bench: List[int] = []
+        for b in sess.get("benchChampions") or sess.get("bench") or []:
+            try:
+                cid = int(b.get("championId") or b.get("id") or 0)
+            except (TypeError, ValueError, AttributeError):
+                continue
+            if cid:
+                bench.append(cid)
+        actions = [a for row in (sess.get("actions") or []) for a in row]
+        return cls(me, mine, tuple(bench), bool(sess.get("benchEnabled", bool(bench))), actions, sess)
+
+    def my_action(self, kind: str = "pick") -> Optional[dict]:
+        """Sıradaki tamamlanmamış pick/ban action'ım (yoksa None)."""
+        for act in self.actions:
+            if (act.get("actorCellId") == self.my_cell
+                    and (act.get("type") or "").lower() == kind
+                    and not act.get("completed", False)):
+                return act
+        return None
+
+    def __repr__(self) -> str:
+        return f"ChampSelectSession(cell={self.my_cell}, champ={self.my_champion}, bench={self.bench})"
+
+
+def index_friends(friends: List[Friend]) -> Dict[str, Friend]:
+    """key ve puuid → Friend (friend_by_key'in O(1) karşılığı)."""
+    out: Dict[str, Friend] = {}
+    for f in friends:
+        if f.puuid:
+            out.setdefault(f.puuid, f)
+        k = pid_key(f.pid)
+        if k:
+            out[k] = f
+    return out
@@ -0,0 +1,117 @@
+"""Konuşma mesajları için koşullu / değişiklik-duyarlı çekme katmanı.
+
+`/lol-chat/v1/conversations/{id}/messages` tüm geçmişi döner; meşgul bir grup
+sohbetinde her tick'te tamamını indirip JSON çözmek, tek yeni satır için bile
+pahalıdır. MessageFetcher konuşma başına son yanıtın durumunu tutar:
+
+  1. Sunucu ETag gönderiyorsa sonraki isteklerde If-None-Match yollar; 304 gelirse
+     hiç gövde inmez, önbellekteki liste döner.
+  2. ETag yoksa (LCU çoğu sürümde göndermez) ham gövde baytlarının parmak izi
+     (uzunluk + crc32) alınır; değişmediyse JSON çözülmez, önbellekteki liste döner.
+
+    fetcher = MessageFetcher(lcu)            # LcuSession / FakeLcu
+    data, changed = fetcher.fetch(conv_id)    # changed=False → önceki listeyle aynı
+    fetcher.stats()   # {"requests", "bytes", "not_modified", "unchanged", "decoded", "decode_cpu_ms", ...}
+
+Dönen liste önbellekle paylaşılır; çağıranlar değiştirmemeli (ChatService.messages
+dilimleyerek kopyalar).
+"""
+from __future__ import annotations
+import threading, time, zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from json_codec import loads
+
+MAX_CONVS = 256   # önbellekte tutulan konuşma sayısı (LRU)
+
+
+class _ConvState:
+    __slots__ = ("etag", "snap")
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.snap: Optional[Tuple[tuple, list]] = None   # (gövde parmak izi, çözülmüş liste) — tek atamada değişir
+
+
+class MessageFetcher:
+    def __init__(self, lcu, max_convs: int = MAX_CONVS, timeout: float = 3):
+        self.lcu = lcu
+        self.max_convs = max_convs
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._convs: "OrderedDict[str, _ConvState]" = OrderedDict()
+        self.requests = 0
+        self.bytes = 0
+        self.not_modified = 0     # 304 (ETag eşleşti)
+        self.unchanged = 0        # 200 ama gövde hash'i aynı → çözülmedi
+        self.decoded = 0
+        self.decode_cpu = 0.0     # sn (thread CPU zamanı)
+        self.hash_cpu = 0.0
+
+    def _state(self, conv_id: str) -> _ConvState:
+        with self._lock:
+            st = self._convs.get(conv_id)
+            if st is None:
+                st = self._convs[conv_id] = _ConvState()
+                while len(self._convs) > self.max_convs:
+                    self._convs.popitem(last=False)
+            else:
+                self._convs.move_to_end(conv_id)
+            return st
+
+    def forget(self, conv_id: str) -> None:
+        with self._lock:
+            self._convs.pop(conv_id, None)
+
+    def fetch(self, conv_id: str) -> Tuple[Optional[list], bool]:
+        """(mesaj listesi | None, değişti mi). None: istek başarısız / konuşma yok."""
+        s, base = self.lcu.get()
+        if not s:
+            return None, False
+        st = self._state(conv_id)
+        snap = st.snap
+        uid = quote(conv_id, safe='@._-')
+        headers = {"If-None-Match": st.etag} if st.etag and snap is not None else None
+        r = s.get(f"{base}/lol-chat/v1/conversations/{uid}/messages", headers=headers, timeout=self.timeout)
+        self.requests += 1
+        if r is None:
+            return None, False
+        if r.status_code == 304 and snap is not None:
+            self.not_modified += 1
+            return snap[1], False
+        if r.status_code != 200:
+            return None, False
+
+        body = r.content or b""
+        self.bytes += len(body)
+        st.etag = (getattr(r, "headers", None) or {}).get("ETag")
+        t0 = time.thread_time()
+        # (uzunluk, crc32): blake2b'den ~7x ucuz; mesajlar eklendikçe uzunluk da değişir,
+        # aynı uzunlukta crc32 çakışması pratikte yok sayılabilir
+        digest = (len(body), zlib.crc32(body))
+        self.hash_cpu += time.thread_time() - t0
+        if snap is not None and digest == snap[0]:
+            self.unchanged += 1
+            return snap[1], False
+
+        t0 = time.thread_time()
+        data = loads(body) if body else []
+        self.decode_cpu += time.thread_time() - t0
+        self.decoded += 1
+        data = data or []
+        st.snap = (digest, data)
+        return data, True
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "decoded": self.decoded,
+            "decode_cpu_ms": round(self.decode_cpu * 1000.0, 3),
+            "hash_cpu_ms": round(self.hash_cpu * 1000.0, 3),
+            "convs": len(self._convs),
+        }
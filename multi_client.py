@@ -0,0 +1,371 @@
+"""Tek süreçte N League istemcisini süren çoklu istemci (multi-tenant) çalışma zamanı.
+
+Her istemci kendi lockfile'ı, LcuSession / ChatService'i, cfg'si ve log dosyası ile
+izole çalışır. Watcher'lar istemci başına thread açmak yerine ortak bir zamanlayıcıda
+(sabit boyutlu worker havuzu) periyodik görev olarak döner; HTTP keep-alive havuzu,
+sohbet arşivi ve imleç dosyası tüm istemcilerce paylaşılır.
+
+Kullanım:
+    python multi_client.py --discover
+    python multi_client.py "C:/Riot Games/League of Legends/lockfile" ~/.wine-alt/drive_c/.../lockfile
+    python multi_client.py --config clients.json
+
+clients.json:
+    {"clients": [
+        {"name": "main", "lockfile": ".../lockfile", "auto_ready": true, "auto_pick": "Ahri,Annie"},
+        {"name": "smurf", "lockfile": ".../lockfile", "silent_group": true}
+    ]}
+"""
+from __future__ import annotations
+import argparse, heapq, itertools, json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from utils import log_once, log_client
+from lcu_session import LcuSession, discover_lockfiles
+from chat_service import ChatService
+from chat_store import ChatStore
+from cursor_store import CursorStore
+from config import ConfigStore
+from pick_rules import ChampSelectPlanner, SessionView
+from party_commands import bind_pick_resolver, handle_dm_party_command, handle_group_command
+
+DEFAULT_CLIENT_CFG = {
+    "announce": False,
+    "silent_group": False,
+    "quiet": True,
+    "auto_ready": True,
+    "fallback_click": False,
+    "auto_pick_enabled": False,
+    "auto_pick_lock": True,
+    "auto_pick_list": "",
+    "auto_pick_ids": [],
+    "auto_pick_unknown": [],
+    "auto_ban_enabled": False,
+    "auto_ban_list": "",
+    "auto_ban_ids": [],
+    "auto_ban_unknown": [],
+    "pick_rules": "",
+}
+
+
+class Scheduler:
+    """Tek dispatcher thread + sabit worker havuzu ile periyodik görev zamanlayıcı.
+
+    Bir görev bitmeden yeniden kuyruklanmaz (aynı görev asla üst üste binmez);
+    sonraki çalışma bitişten `interval` sn sonra planlanır.
+    """
+
+    def __init__(self, workers: int = 8):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sched")
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._stopped = False
+        self._runs_lock = threading.Lock()
+        self.runs = 0
+
+    def every(self, interval: float, fn: Callable[[], None], name: str = "", delay: float = 0.0) -> None:
+        with self._cv:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), interval, fn, name))
+            self._cv.notify()
+
+    def start(self) -> "Scheduler":
+        threading.Thread(target=self._dispatch, daemon=True, name="sched-dispatch").start()
+        return self
+
+    def stop(self) -> None:
+        with self._cv:
+            self._stopped = True
+            self._cv.notify_all()
+        self._pool.shutdown(wait=False)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cv:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    self._cv.wait(None if not self._heap else max(0.0, self._heap[0][0] - time.monotonic()))
+                if self._stopped:
+                    return
+                _, _, interval, fn, name = heapq.heappop(self._heap)
+            self._pool.submit(self._run, interval, fn, name)
+
+    def _run(self, interval: float, fn: Callable[[], None], name: str) -> None:
+        try:
+            fn()
+        except Exception as e:
+            log_once("SCHED", f"{name} err: {e}")
+        finally:
+            with self._runs_lock:   # havuz thread'lerinden eşzamanlı artırılır
+                self.runs += 1
+            if not self._stopped:
+                self.every(interval, fn, name, delay=interval)
+
+
+class ClientRuntime:
+    """Tek bir League istemcisinin izole durumu ve periyodik görevleri."""
+
+    def __init__(self, name: str, lockfile: str, cfg: Optional[dict] = None,
+                 store: Optional[ChatStore] = None, cursors: Optional[CursorStore] = None,
+                 log_dir: Optional[str] = None):
+        self.name = name
+        self.lockfile = lockfile
+        self.cfg = ConfigStore(dict(DEFAULT_CLIENT_CFG, **(cfg or {})))
+        self.lcu = LcuSession(lockfile_path=lockfile)
+        self.cs = ChatService(self.lcu, store=_NamespacedStore(store, name) if store else None,
+                              cursors=_NamespacedCursors(cursors, name) if cursors else None)
+        bind_pick_resolver(self.cs, self.cfg)
+        self._planner = ChampSelectPlanner(self.cs)
+        self._grp_last_seen: dict = {}
+        self._last_phase = ""
+        self._last_accept = 0.0
+        self._last_pick_action = None
+        self._last_pick_ts = 0.0
+        self._identity_ok = False
+        self.sink = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self.sink = open(os.path.join(log_dir, f"{name}.log"), "a", encoding="utf-8", buffering=1)
+
+    # ---- görevler ----
+    def _wrap(self, fn: Callable[[], None]) -> Callable[[], None]:
+        def _task():
+            if not self.lcu.online:   # istemci kapalı: lcu-offline thread'i yokluyor, turu atla
+                return
+            with log_client(self.name, self.sink):
+                fn()
+        return _task
+
+    def close(self) -> None:
+        if self.sink is not None:
+            sink, self.sink = self.sink, None
+            sink.close()
+
+    def register(self, sched: Scheduler, stagger: float = 0.0) -> None:
+        sched.every(5.0, self._wrap(self.tick_identity), f"{self.name}:identity", delay=stagger)
+        sched.every(2.0, self._wrap(self.tick_dms), f"{self.name}:dm", delay=stagger + 0.1)
+        sched.every(0.8, self._wrap(self.tick_groups), f"{self.name}:grp", delay=stagger + 0.2)
+        sched.every(0.5, self._wrap(self.tick_gameflow), f"{self.name}:gameflow", delay=stagger + 0.3)
+        sched.every(2.0, self._wrap(self.tick_follow), f"{self.name}:follow", delay=stagger + 0.4)
+
+    def tick_identity(self) -> None:
+        if self._identity_ok:
+            return
+        self.cs.refresh_me()
+        if not self.cs.ME.get("puuid"):
+            return
+        self._identity_ok = True
+        log_once("SELF", str(self.cs.ME))
+        self.cs.champion_catalog()
+        self.cfg.renotify("auto_pick_list", "auto_ban_list")
+
+    def tick_dms(self) -> None:
+        if self._identity_ok:
+            self.cs.poll_dms_once(self._on_dm)
+
+    def tick_groups(self) -> None:
+        if self._identity_ok:
+            self.cs.poll_groups_once(self._on_group, self._grp_last_seen, True, not self.cfg.get("quiet", True))
+
+    def tick_follow(self) -> None:
+        if self.cs.follow_lobby_chat():
+            log_once("GRP", f"Lobby sohbeti takipte: {self.cs.active_group_id}")
+
+    def tick_gameflow(self) -> None:
+        snap = self.cfg.snapshot()
+        phase = self.cs.gameflow_phase()
+        if phase != self._last_phase:
+            log_once("PHASE", phase)
+            self._last_phase = phase
+            self._last_pick_action = None
+            self._planner.reset()
+        if phase == "ReadyCheck" and snap.get("auto_ready"):
+            info = self.cs.ready_check_status() or {}
+            state = (info.get("state") or "").lower()
+            my_resp = (info.get("playerResponse") or "").lower()
+            now = time.time()
+            if state in ("inprogress", "in_progress") and my_resp in ("", "none") and now - self._last_accept >= 1.0:
+                self._last_accept = now
+                ok, code, _ = self.cs.ready_check_accept_verbose()
+                log_once("READY", "✔ Otomatik kabul gönderildi." if ok else f"✖ Kabul POST başarısız (code={code})")
+        elif phase == "ChampSelect" and (snap.get("auto_pick_enabled") or snap.get("auto_ban_enabled")):
+            view = SessionView.from_session(self.cs.cs_session())
+            if not view.action:
+                return
+            aid = int(view.action.get("id"))
+            if aid == self._last_pick_action and time.time() - self._last_pick_ts < 0.8:
+                return
+            self._last_pick_action, self._last_pick_ts = aid, time.time()
+            kind, ok, how, info = self._planner.act(view, snap)
+            if how != "disabled":
+                log_once("BAN" if kind == "ban" else "PICK",
+                         f"{how.upper()} (actionId={aid}) {info}" if ok else f"fail={how} (actionId={aid}) {info}")
+
+    # ---- komut callback'leri ----
+    def _on_dm(self, friend_key: str, friend_name: str, body: str, is_me: bool) -> None:
+        if is_me:
+            return
+        if handle_dm_party_command(self.cs, friend_key, friend_name, body, cfg=self.cfg):
+            log_once("DM-CMD", f"{friend_name or friend_key} → {body}")
+
+    def _on_group(self, cid: str, body: str, frm: str) -> None:
+        handle_group_command(self.cs, cid, body, frm, self.cfg)
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "lockfile": self.lockfile,
+            "online": self.lcu.online and self.lcu.get()[0] is not None,
+            "me": self.cs.ME.get("displayName") or "",
+            "phase": self._last_phase,
+            "group": self.cs.active_group_id,
+        }
+
+
+class _NamespacedCursors:
+    """Paylaşılan CursorStore üzerinde istemci başına ayrı anahtar alanı."""
+
+    def __init__(self, inner: CursorStore, prefix: str):
+        self.inner = inner
+        self.prefix = prefix
+
+    def get(self, kind: str, conv_id: str):
+        return self.inner.get(f"{self.prefix}:{kind}", conv_id)
+
+    def set(self, kind: str, conv_id: str, ts: float, mid=None) -> None:
+        self.inner.set(f"{self.prefix}:{kind}", conv_id, ts, mid)
+
+
+class _NamespacedStore:
+    """Paylaşılan ChatStore üzerinde istemci başına ayrı geçmiş: satırlar "<istemci>:<conv_id>" ile yazılır.
+
+    İki hesap aynı arkadaşla konuşsa da /dm-log ve /search yalnızca kendi istemcisinin satırlarını görür.
+    """
+
+    def __init__(self, inner: ChatStore, prefix: str):
+        self.inner = inner
+        self.prefix = f"{prefix}:"
+
+    def __getattr__(self, name):   # flush, count, has_fts, ...
+        return getattr(self.inner, name)
+
+    def _strip(self, rows: List[dict]) -> List[dict]:
+        n = len(self.prefix)
+        for row in rows:
+            row["conv_id"] = row["conv_id"][n:]
+        return rows
+
+    def add(self, conv_id: str, msg_id, ts: float, sender: str, is_me: bool, body: str) -> None:
+        if conv_id:
+            self.inner.add(self.prefix + conv_id, msg_id, ts, sender, is_me, body)
+
+    def recent(self, conv_id: str, limit: int = 50) -> List[dict]:
+        return self._strip(self.inner.recent(self.prefix + conv_id, limit))
+
+    def search(self, text: str, limit: int = 20, conv_id: Optional[str] = None) -> List[dict]:
+        return self._strip(self.inner.search(text, limit=limit, conv_id=self.prefix + conv_id if conv_id else None,
+                                             conv_prefix=self.prefix))
+
+
+class MultiClientRuntime:
+    """N istemciyi ortak zamanlayıcı, sohbet arşivi ve imleç dosyasıyla çalıştırır."""
+
+    def __init__(self, workers: int = 8, chat_db: Optional[str] = "chat_history.db",
+                 state_path: Optional[str] = "watch_state.json", log_dir: Optional[str] = "logs"):
+        self.sched = Scheduler(workers=workers)
+        self.store = ChatStore(chat_db) if chat_db else None
+        self.cursors = CursorStore(state_path) if state_path else None
+        self.log_dir = log_dir
+        self.clients: Dict[str, ClientRuntime] = {}
+
+    def add(self, name: str, lockfile: str, cfg: Optional[dict] = None) -> ClientRuntime:
+        if name in self.clients:
+            raise ValueError(f"istemci adı tekrar ediyor: {name}")
+        rt = ClientRuntime(name, lockfile, cfg, store=self.store, cursors=self.cursors, log_dir=self.log_dir)
+        self.clients[name] = rt
+        return rt
+
+    def start(self) -> None:
+        # İstemcileri zamana yay: hepsi aynı anda LCU'ya vurmasın
+        n = max(1, len(self.clients))
+        for i, rt in enumerate(self.clients.values()):
+            rt.register(self.sched, stagger=i * (0.5 / n))
+        self.sched.start()
+        log_once("MULTI", f"{len(self.clients)} istemci başlatıldı")
+
+    def stop(self) -> None:
+        self.sched.stop()
+        if self.cursors:
+            self.cursors.flush()
+        if self.store:
+            self.store.flush()
+        for rt in self.clients.values():
+            rt.close()
+
+    def status(self) -> List[dict]:
+        return [rt.status() for rt in self.clients.values()]
+
+
+def _load_config(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    clients = data.get("clients") if isinstance(data, dict) else data
+    out = []
+    for i, c in enumerate(clients or []):
+        c = dict(c)
+        lockfile = c.pop("lockfile", "")
+        name = c.pop("name", "") or f"client{i + 1}"
+        if "auto_pick" in c:
+            c["auto_pick_list"] = c.pop("auto_pick")
+            c.setdefault("auto_pick_enabled", bool(c["auto_pick_list"]))
+        out.append({"name": name, "lockfile": lockfile, "cfg": c})
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Birden çok League istemcisini tek süreçte yönet")
+    ap.add_argument("lockfiles", nargs="*", help="lockfile yolları")
+    ap.add_argument("--discover", action="store_true", help="Bilinen dizinlerde tüm lockfile'ları ara")
+    ap.add_argument("--config", help="İstemci başına ayarlar (JSON)")
+    ap.add_argument("--workers", type=int, default=8, help="Ortak worker havuzu boyutu")
+    ap.add_argument("--log-dir", default="logs", help="İstemci başına log dosyaları (boş → kapalı)")
+    args = ap.parse_args()
+
+    specs: List[dict] = []
+    if args.config:
+        specs += _load_config(args.config)
+    paths = list(args.lockfiles) + (discover_lockfiles() if args.discover else [])
+    known = {os.path.realpath(s["lockfile"]) for s in specs}
+    for p in paths:
+        if os.path.realpath(p) not in known:
+            known.add(os.path.realpath(p))
+            specs.append({"name": f"client{len(specs) + 1}", "lockfile": p, "cfg": {}})
+    if not specs:
+        raise SystemExit("İstemci yok: lockfile yolu ver, --discover veya --config kullan.")
+
+    chat_db = os.getenv("CHAT_DB", "chat_history.db").strip()
+    state_path = os.getenv("WATCH_STATE", "watch_state.json").strip()
+    off = ("", "off", "0", "false", "no")
+    rt = MultiClientRuntime(
+        workers=args.workers,
+        chat_db=None if chat_db.lower() in off else chat_db,
+        state_path=None if state_path.lower() in off else state_path,
+        log_dir=args.log_dir or None,
+    )
+    for s in specs:
+        rt.add(s["name"], s["lockfile"], s["cfg"])
+        log_once("MULTI", f"{s['name']}: {s['lockfile']}")
+    rt.start()
+    try:
+        while True:
+            time.sleep(30)
+            for st in rt.status():
+                log_once("MULTI", " ".join(f"{k}={v}" for k, v in st.items() if k != "lockfile"))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        rt.stop()
+
+
+if __name__ == "__main__":
+    main()
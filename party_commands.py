@@ -0,0 +1,281 @@
+"""Lobi sohbeti ve DM'den gelen parti komutları (BASLAT, DURDUR, BAN, ODADEVRET, PICKLIST, ...).
+
+main.py (tek istemci) ve multi_client.py (N istemci) aynı işleyicileri kullanır:
+
+    bind_pick_resolver(cs, cfg)                              # auto_pick_list → auto_pick_ids
+    handle_group_command(cs, conv_id, body, from_name, cfg)  # lobi sohbeti mesajı
+    handle_dm_party_command(cs, friend_key, friend_name, body, cfg=cfg)
+
+İşleyiciler komut havuzunda (command_pool) çalışabilir: geç kalan değişiklikler expired()
+ile atlanır, aynı anda gelen kopyalar DEDUP ile tek kez işlenir.
+"""
+from __future__ import annotations
+from typing import Callable, Optional
+
+from utils import log_once
+from chat_service import ChatService
+from config import ConfigStore
+from tracing import root_span, span
+from command_pool import expired
+from command_dedup import DEDUP
+
+
+# ------------ Paylaşılan lobi / DM komutları ------------
+def _first_claim(cs: ChatService, cmd: str, arg: Optional[str], conv_id: Optional[str]) -> bool:
+    """Aynı lobide (lobi sohbeti veya DM) aynı komut+argüman pencere içinde ilk kez mi geldi?"""
+    return DEDUP.claim(cmd, arg, lobby=conv_id or cs.active_group_id, scope=id(cs))
+
+
+def handle_party_management_command(
+    cs: ChatService,
+    txt: str,
+    from_name: str,
+    send_feedback: Callable[[str], None],
+    *,
+    context: str = "group",
+    sender_puuid: Optional[str] = None,
+    conv_id: Optional[str] = None,
+    start_request_handler: Optional[Callable[[Optional[str], str, Callable[[str], None]], bool]] = None,
+    cfg: Optional[ConfigStore] = None,
+) -> bool:
+    text = (txt or "").strip()
+    if not text:
+        return False
+    low = text.lower()
+
+    def reply(msg: str):
+        if send_feedback and msg:
+            send_feedback(msg)
+
+    # BASLAT / START
+    if low in ("baslat", "start", "/l"):
+        log_once("GRP-CMD", f"{from_name} → BASLAT")
+        if context == "dm" and not cs.is_puuid_in_lobby(sender_puuid):
+            reply("lobbye katilmadiginiz icin oyun baslatma yetkini bulunmamaktadir")
+            return True
+        # Lobi sohbeti + DM'den (veya birkaç üyeden) aynı anda gelen BASLAT tek kez çalışır
+        if not _first_claim(cs, "baslat", "", conv_id):
+            return True
+        with span("leader_check"):
+            leader = cs.is_party_leader()
+        if leader:
+            if start_request_handler:
+                with span("start.approval_request"):
+                    if start_request_handler(conv_id, from_name, reply):
+                        return True
+            if expired():
+                reply("BASLAT çok geç işlendi, yok sayıldı.")
+                return True
+            reply("Matchmaking başlatılıyor…")
+            with span("start_matchmaking"):
+                ok = cs.start_matchmaking()
+            log_once("QUEUE", f"START_CALL={'OK' if ok else 'FAIL'}")
+        else:
+            reply(f"{from_name} başlat dedi ama lider değilim.")
+        return True
+
+    # BAN <isim>
+    if low.startswith("ban "):
+        target = text.split(" ", 1)[1].strip()
+        log_once("GRP-CMD", f"{from_name} → BAN \"{target}\"")
+        if not _first_claim(cs, "ban", target, conv_id):
+            return True
+        if not cs.is_party_leader():
+            reply(f"{from_name} ban istedi ama lider değilim.")
+            return True
+        m = cs.find_member_by_name(target)
+        if not m:
+            reply(f'Kullanıcı bulunamadı: "{target}"')
+            return True
+        if expired():   # kuyrukta/LCU'da çok beklendi: geç bir kick yapma
+            reply(f'BAN "{target}" çok geç işlendi, yok sayıldı.')
+            return True
+        ok = cs.kick_member_by_id(m.get("summonerId"))
+        reply(
+            f'{m.get("summonerName")} lobiden atıldı.' if ok else "Ban başarısız."
+        )
+        return True
+
+    # ODADEVRET [isim]
+    if low.startswith("odadevret"):
+        parts = text.split(" ", 1)
+        target = parts[1].strip() if len(parts) == 2 else (from_name or "")
+        log_once("GRP-CMD", f"{from_name} → ODADEVRET \"{target}\"")
+        if not _first_claim(cs, "odadevret", target, conv_id):
+            return True
+        if not cs.is_party_leader():
+            reply(f"{from_name} devir istedi ama lider değilim.")
+            return True
+        if not target:
+            reply("ODADEVRET için hedef yok.")
+            return True
+        m = cs.find_member_by_name(target)
+        if not m:
+            reply(f'Liderlik devri için kullanıcı yok: "{target}"')
+            return True
+        if expired():
+            reply(f'ODADEVRET "{target}" çok geç işlendi, yok sayıldı.')
+            return True
+        ok = cs.promote_member_by_id(m.get("summonerId"))
+        reply(
+            f'Liderlik {m.get("summonerName")} kullanıcısına devredildi.'
+            if ok
+            else "Devir başarısız."
+        )
+        return True
+
+    return False
+
+
+def handle_dm_party_command(cs: ChatService, friend_key: str, friend_name: str, body: str, cfg: Optional[ConfigStore] = None) -> bool:
+    name = friend_name or friend_key or "?"
+
+    def dm_feedback(msg: str):
+        if msg:
+            cs.dm_reply(friend_key, msg)
+
+    with root_span("dm.command", sender=name, cmd=(body or "").strip().split(" ", 1)[0][:24].lower()):
+        return handle_party_management_command(
+            cs,
+            body,
+            name,
+            dm_feedback,
+            context="dm",
+            sender_puuid=friend_key,
+            conv_id=None,
+            start_request_handler=None,
+            cfg=cfg,
+        )
+
+
+# ------------ Auto-pick listesi → şampiyon id'leri ------------
+def resolve_pick_list(cs: ChatService, text: Optional[str]) -> tuple[list[str], list[int], list[str]]:
+    """"Ahri, Annie" → (isimler, id'ler, bilinmeyen isimler)."""
+    names = [x.strip() for x in (text or "").split(",") if x.strip()]
+    ids, bad = [], []
+    for nm in names:
+        cid = cs.champion_id_from_text(nm)
+        if not cid:
+            bad.append(nm)
+        elif cid not in ids:
+            ids.append(cid)
+    return names, ids, bad
+
+
+def bind_pick_resolver(cs: ChatService, cfg: ConfigStore) -> None:
+    """auto_pick_list / auto_ban_list değişince türetilmiş *_ids / *_unknown alanlarını yeniden hesaplar."""
+    def _resolve(_old, new, changed):
+        if "auto_pick_list" in changed:
+            names, ids, bad = resolve_pick_list(cs, new.get("auto_pick_list"))
+            cfg.update(auto_pick_ids=ids, auto_pick_unknown=bad)
+            if names:
+                log_once("PICK", f"list={new.get('auto_pick_list')} ids={ids}")
+        if "auto_ban_list" in changed:
+            names, ids, bad = resolve_pick_list(cs, new.get("auto_ban_list"))
+            cfg.update(auto_ban_ids=ids, auto_ban_unknown=bad)
+            if names:
+                log_once("BAN", f"list={new.get('auto_ban_list')} ids={ids}")
+    cfg.subscribe(_resolve, keys=("auto_pick_list", "auto_ban_list"))
+
+
+# ------------ Grup komutları (Lobby sohbeti) ------------
+_CMD_KINDS = {
+    "baslat": "baslat", "start": "baslat", "/l": "baslat", "ban": "ban", "odadevret": "odadevret",
+    "durdur": "durdur", "stop": "durdur", "geo": "geo", "bolge": "geo", "picklist": "picklist",
+    "pick": "pick", "lock": "lock", "kilit": "lock",
+}
+
+
+def command_kind(body: str) -> str:
+    """Komut havuzu metrikleri için tür: ilk kelime → komut adı; komut değilse "chat"."""
+    return _CMD_KINDS.get((body or "").strip().split(" ", 1)[0].lower(), "chat")
+
+
+def handle_group_command(cs: ChatService, conv_id: str, body: str, from_name: str, cfg: ConfigStore,
+                         start_request_handler: Optional[Callable[[Optional[str], str, Callable[[str], None]], bool]] = None):
+    # Her lobi mesajı bir trace kökü açar; LCU çağrısı yapmayan (komut olmayan) mesajlar atılır
+    cmd = (body or "").strip().split(" ", 1)[0][:24].lower()
+    with root_span("grp.command", conv=conv_id.split("@", 1)[0][:12], sender=from_name, cmd=cmd):
+        _group_command(cs, conv_id, body, from_name, cfg, start_request_handler)
+
+
+def _group_command(cs: ChatService, conv_id: str, body: str, from_name: str, cfg: ConfigStore,
+                   start_request_handler=None):
+    txt = (body or "").strip()
+    low = txt.lower()
+
+    def info_to_group(msg: str):
+        if not cfg.get("silent_group", False):
+            cs.reply(conv_id, msg)
+
+    if handle_party_management_command(
+        cs,
+        txt,
+        from_name,
+        info_to_group,
+        conv_id=conv_id,
+        start_request_handler=start_request_handler,
+        cfg=cfg,
+    ):
+        return
+
+    # DURDUR / STOP
+    if low in ("durdur","stop"):
+        log_once("GRP-CMD", f'{from_name} → DURDUR')
+        if not _first_claim(cs, "durdur", "", conv_id):
+            return
+        if cs.is_party_leader():
+            ok = cs.stop_matchmaking()
+            info_to_group("Matchmaking durduruldu." if ok else "Durdurma başarısız.")
+            log_once("QUEUE", f"STOP_CALL={'OK' if ok else 'FAIL'}")
+        else:
+            info_to_group(f"{from_name} durdur dedi ama lider değilim.")
+        return
+
+    # GEO (kısa geoinfo)
+    if low in ("geo","bolge"):
+        info = cs.geoinfo_quick()
+        log_once("GRP-CMD", f'{from_name} → GEO')
+        info_to_group(f"GeoInfo: {info}")
+        return
+
+    # --- AUTO-PICK (sadece lobi sohbetinden kontrol) ---
+    # PICKLIST Shaco,Teemo,Trundle
+    if low.startswith("picklist "):
+        names_str = txt.split(" ", 1)[1].strip()
+        names = [s.strip() for s in names_str.split(",") if s.strip()]
+        if not _first_claim(cs, "picklist", ",".join(names), conv_id):
+            return
+        # id'ler bind_pick_resolver aboneliğiyle aynı çağrıda yeniden hesaplanır
+        snap = cfg.update(auto_pick_list=",".join(names))
+        bad = snap.get("auto_pick_unknown") or ()
+        ok_part = (", ".join(names) if names else "∅")
+        msg = f"Auto-pick listesi güncellendi: {ok_part}"
+        if bad:
+            msg += f" | Bilinmeyen: {', '.join(bad)}"
+        info_to_group(msg)
+        return
+
+    # PICK ON / PICK OFF  → otomatik seçim aç/kapat
+    if low in ("pick on", "pick aç", "pick ac"):
+        cfg.update(auto_pick_enabled=True)
+        log_once("PICK", "auto-pick = ON")
+        info_to_group("Auto-pick: ON")
+        return
+    if low in ("pick off", "pick kapat"):
+        cfg.update(auto_pick_enabled=False)
+        log_once("PICK", "auto-pick = OFF")
+        info_to_group("Auto-pick: OFF")
+        return
+
+    # LOCK ON / LOCK OFF  → pick sonrası lock davranışı
+    if low in ("lock on", "kilit on", "kilit aç", "kilit ac"):
+        cfg.update(auto_pick_lock=True)
+        log_once("PICK", "auto-pick-lock = ON")
+        info_to_group("Auto-pick lock: ON (hover + lock)")
+        return
+    if low in ("lock off", "kilit off", "kilit kapat"):
+        cfg.update(auto_pick_lock=False)
+        log_once("PICK", "auto-pick-lock = OFF")
+        info_to_group("Auto-pick lock: OFF (sadece hover)")
+        return
@@ -0,0 +1,332 @@
+"""Champ select için bildirimsel pick/ban kuralları.
+
+Kurallar kuyruk (queueId) ve atanmış pozisyona göre yazılır; champ select başında
+(kuyruk + pozisyon belli olunca) bir kez öncelik dizilerine derlenir. Her session
+güncellemesinde yalnızca O(ban + pick) bir süzme yapılır; kurallar yeniden yorumlanmaz.
+
+Dosya biçimi (PICK_RULES=pick_rules.json):
+
+    {
+      "default": {"picks": ["Ahri", "Annie"], "bans": ["Yasuo"]},
+      "queues": {
+        "420": {
+          "bans": ["Zed"],
+          "positions": {
+            "middle":  {"picks": ["Syndra", {"champion": "Malzahar", "if_enemy": ["Yasuo", "Yone"]}]},
+            "utility": {"picks": ["Lulu", {"champion": "Yuumi", "unless_ally": ["Draven"]}],
+                        "bans": ["Blitzcrank"]}
+          }
+        },
+        "450": {"picks": ["Ziggs", "Lux"]}
+      }
+    }
+
+Öncelik sırası (en özelden genele, tekrarlar atılır):
+    queues[q].positions[pos] → queues[q] → default.positions[pos] → default → cfg listesi
+cfg listesi: PICKLIST / /auto-pick ve /auto-ban ile verilen düz listeler.
+
+Koşullar (yalnızca kilitlenmiş şampiyonlara bakar):
+    if_ally / if_enemy         → listeden en az biri kilitlenmişse aday
+    unless_ally / unless_enemy → listeden hiçbiri kilitlenmemişse aday
+Ban'ler takım arkadaşlarının niyet/hover ettiği şampiyonları asla seçmez.
+"""
+from __future__ import annotations
+import json, threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from utils import log_once
+
+Resolver = Callable[[str], Optional[int]]
+
+POSITION_ALIASES = {
+    "mid": "middle", "middle": "middle",
+    "top": "top",
+    "jg": "jungle", "jungle": "jungle",
+    "adc": "bottom", "bot": "bottom", "bottom": "bottom",
+    "sup": "utility", "support": "utility", "utility": "utility",
+}
+CONDITION_KEYS = ("if_ally", "unless_ally", "if_enemy", "unless_enemy")
+
+# (if_ally, unless_ally, if_enemy, unless_enemy) — boş frozenset = koşul yok
+Condition = Tuple[FrozenSet[int], FrozenSet[int], FrozenSet[int], FrozenSet[int]]
+
+
+def normalize_position(pos: Optional[str]) -> str:
+    p = (pos or "").strip().lower()
+    return POSITION_ALIASES.get(p, p)
+
+
+class SessionView:
+    """/lol-champ-select/v1/session'ın tek geçişte çıkarılmış özeti."""
+
+    __slots__ = ("my_cell", "position", "action", "banned", "ally_locked", "enemy_locked", "ally_intent")
+
+    def __init__(self):
+        self.my_cell = None
+        self.position = ""
+        self.action: Optional[dict] = None   # sırası gelmiş (isInProgress) kendi pick/ban action'ım
+        self.banned: set = set()
+        self.ally_locked: set = set()
+        self.enemy_locked: set = set()
+        self.ally_intent: set = set()        # takım arkadaşlarının hover/niyetleri
+
+    @classmethod
+    def from_session(cls, sess: dict) -> "SessionView":
+        v = cls()
+        sess = sess or {}
+        me = v.my_cell = sess.get("localPlayerCellId")
+        allies = set()
+        for m in sess.get("myTeam") or []:
+            cell = m.get("cellId")
+            allies.add(cell)
+            if cell == me:
+                v.position = normalize_position(m.get("assignedPosition"))
+            else:
+                intent = int(m.get("championPickIntent") or 0)
+                if intent:
+                    v.ally_intent.add(intent)
+        bans = sess.get("bans") or {}
+        for key in ("myTeamBans", "theirTeamBans"):
+            v.banned.update(int(c) for c in (bans.get(key) or []) if c)
+        for row in sess.get("actions") or []:
+            for a in row:
+                cid = int(a.get("championId") or 0)
+                kind = (a.get("type") or "").lower()
+                actor = a.get("actorCellId")
+                if actor == me:
+                    if v.action is None and a.get("isInProgress") and not a.get("completed") \
+                            and kind in ("pick", "ban"):
+                        v.action = a
+                    continue
+                if not cid:
+                    continue
+                if kind == "ban":
+                    if a.get("completed"):
+                        v.banned.add(cid)
+                elif kind == "pick":
+                    if actor in allies:
+                        (v.ally_locked if a.get("completed") else v.ally_intent).add(cid)
+                    elif a.get("completed"):
+                        v.enemy_locked.add(cid)
+        return v
+
+    @property
+    def unavailable(self) -> set:
+        return self.banned | self.ally_locked | self.enemy_locked
+
+
+class CompiledPlan:
+    """Bir (kuyruk, pozisyon) için derlenmiş öncelik dizileri."""
+
+    __slots__ = ("queue_id", "position", "picks", "bans", "conds")
+
+    def __init__(self, queue_id, position: str, picks: Tuple[int, ...], bans: Tuple[int, ...],
+                 conds: Dict[Tuple[str, int], Condition]):
+        self.queue_id = queue_id
+        self.position = position
+        self.picks = picks
+        self.bans = bans
+        self.conds = conds  # yalnızca koşullu girdiler; ("pick"|"ban", id) → Condition
+
+    def _ok(self, kind: str, cid: int, view: SessionView) -> bool:
+        c = self.conds.get((kind, cid))
+        if c is None:
+            return True
+        if_ally, unless_ally, if_enemy, unless_enemy = c
+        if if_ally and if_ally.isdisjoint(view.ally_locked):
+            return False
+        if unless_ally and not unless_ally.isdisjoint(view.ally_locked):
+            return False
+        if if_enemy and if_enemy.isdisjoint(view.enemy_locked):
+            return False
+        if unless_enemy and not unless_enemy.isdisjoint(view.enemy_locked):
+            return False
+        return True
+
+    def pick_candidates(self, view: SessionView) -> List[int]:
+        """Öncelik sırasıyla şu an seçilebilecek adaylar."""
+        gone = view.unavailable
+        return [cid for cid in self.picks if cid not in gone and self._ok("pick", cid, view)]
+
+    def ban_choice(self, view: SessionView, bannable: Optional[Iterable[int]] = None) -> Optional[int]:
+        allowed = set(bannable) if bannable else None
+        skip = view.banned | view.ally_intent | view.ally_locked | view.enemy_locked
+        for cid in self.bans:
+            if cid in skip or (allowed is not None and cid not in allowed):
+                continue
+            if self._ok("ban", cid, view):
+                return cid
+        return None
+
+    def describe(self, name_of: Callable[[int], str] = str) -> str:
+        return (f"queue={self.queue_id} pos={self.position or '-'} "
+                f"picks=[{', '.join(name_of(c) for c in self.picks)}] "
+                f"bans=[{', '.join(name_of(c) for c in self.bans)}]")
+
+
+class PickBanRules:
+    """Kural ağacı + (kuyruk, pozisyon, cfg listeleri) anahtarlı derlenmiş plan önbelleği."""
+
+    def __init__(self, data: Optional[dict] = None, path: Optional[str] = None):
+        self.path = path
+        self.data: dict = data or {}
+        self.version = 0
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, CompiledPlan] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "PickBanRules":
+        rules = cls(path=path)
+        rules.reload()
+        return rules
+
+    def reload(self) -> bool:
+        if not self.path:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("kök bir JSON nesnesi olmalı")
+        except FileNotFoundError:
+            log_once("RULES", f"kural dosyası yok ({self.path}); yalnızca cfg listeleri kullanılacak.")
+            data = {}
+        except Exception as e:
+            log_once("RULES", f"okunamadı ({self.path}): {e}")
+            return False
+        with self._lock:
+            self.data = data
+            self.version += 1
+            self._cache.clear()
+        log_once("RULES", f"kurallar yüklendi ({self.path}): {len(data.get('queues') or {})} kuyruk")
+        return True
+
+    # ---------- derleme ----------
+    def _layers(self, queue_id, position: str) -> List[dict]:
+        out = []
+        q = (self.data.get("queues") or {}).get(str(queue_id)) if queue_id is not None else None
+        d = self.data.get("default") or {}
+        for block in (q, d):
+            if not isinstance(block, dict):
+                continue
+            positions = {normalize_position(k): v for k, v in (block.get("positions") or {}).items()}
+            if position and isinstance(positions.get(position), dict):
+                out.append(positions[position])
+            out.append(block)
+        return out
+
+    @staticmethod
+    def _compile_list(kind: str, entries: Iterable[Any], resolve: Resolver,
+                      order: List[int], conds: Dict[Tuple[str, int], Condition]) -> None:
+        seen = set(order)
+        for e in entries or []:
+            if isinstance(e, dict):
+                name, raw = e.get("champion"), e
+            else:
+                name, raw = e, None
+            cid = name if isinstance(name, int) else resolve(str(name or ""))
+            if not cid or cid in seen:
+                if not cid:
+                    log_once("RULES", f"bilinmeyen şampiyon: {name}")
+                continue
+            seen.add(cid)
+            order.append(cid)
+            if raw is not None:
+                sets = []
+                for k in CONDITION_KEYS:
+                    ids = (resolve(str(x)) if not isinstance(x, int) else x for x in (raw.get(k) or []))
+                    sets.append(frozenset(i for i in ids if i))
+                if any(sets):
+                    conds[(kind, cid)] = tuple(sets)  # type: ignore[assignment]
+
+    def compile(self, queue_id, position: Optional[str], resolve: Resolver,
+                extra_picks: Iterable[int] = (), extra_bans: Iterable[int] = ()) -> CompiledPlan:
+        pos = normalize_position(position)
+        extra_picks, extra_bans = tuple(extra_picks or ()), tuple(extra_bans or ())
+        with self._lock:
+            key = (queue_id, pos, extra_picks, extra_bans, self.version)
+            plan = self._cache.get(key)
+            if plan is not None:
+                return plan
+            layers = self._layers(queue_id, pos)
+        picks: List[int] = []
+        bans: List[int] = []
+        conds: Dict[Tuple[str, int], Condition] = {}
+        for layer in layers:
+            self._compile_list("pick", layer.get("picks"), resolve, picks, conds)
+            self._compile_list("ban", layer.get("bans"), resolve, bans, conds)
+        self._compile_list("pick", extra_picks, resolve, picks, conds)
+        self._compile_list("ban", extra_bans, resolve, bans, conds)
+        plan = CompiledPlan(queue_id, pos, tuple(picks), tuple(bans), conds)
+        with self._lock:
+            if len(self._cache) > 64:
+                self._cache.clear()
+            self._cache[key] = plan
+        return plan
+
+
+_REGISTRY: Dict[str, PickBanRules] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_rules(path: Optional[str]) -> PickBanRules:
+    """Yol başına tek PickBanRules (watcher, CLI ve çoklu istemciler aynı nesneyi paylaşır)."""
+    key = (path or "").strip()
+    with _REGISTRY_LOCK:
+        rules = _REGISTRY.get(key)
+        if rules is None:
+            rules = _REGISTRY[key] = PickBanRules.from_file(key) if key else PickBanRules()
+        return rules
+
+
+class ChampSelectPlanner:
+    """Tek bir champ select oturumu için plan önbelleği + pick/ban adımı.
+
+    cs: ChatService (current_queue_id, champion_id_from_text, bannable_ids, cs_ban,
+    autopick_try_with_bench kullanılır). Faz değişince reset() çağrılmalı.
+    """
+
+    def __init__(self, cs):
+        self.cs = cs
+        self.reset()
+
+    def reset(self) -> None:
+        self.plan: Optional[CompiledPlan] = None
+        self.queue_id = None
+        self._key = None
+
+    def name_of(self, cid: int) -> str:
+        return (self.cs.champion_catalog()["by_id"].get(cid) or {}).get("name") or str(cid)
+
+    def plan_for(self, view: SessionView, snap) -> CompiledPlan:
+        rules = get_rules(snap.get("pick_rules"))
+        key = (view.position, rules.version, snap.get("auto_pick_ids"), snap.get("auto_ban_ids"))
+        if self.plan is None or key != self._key:
+            if self.queue_id is None:
+                self.queue_id = self.cs.current_queue_id()
+            self.plan = rules.compile(self.queue_id, view.position, self.cs.champion_id_from_text,
+                                      snap.get("auto_pick_ids") or (), snap.get("auto_ban_ids") or ())
+            self._key = key
+            log_once("RULES", self.plan.describe(self.name_of))
+        return self.plan
+
+    def act(self, view: SessionView, snap) -> Tuple[str, bool, str, str]:
+        """Sırası gelmiş action için ban/pick yapar. Döner: (tür, ok, sonuç, ayrıntı)."""
+        act = view.action or {}
+        kind = (act.get("type") or "").lower()
+        aid = int(act.get("id") or 0)
+        plan = self.plan_for(view, snap)
+        if kind == "ban":
+            if not snap.get("auto_ban_enabled", False):
+                return kind, False, "disabled", ""
+            cid = plan.ban_choice(view, self.cs.bannable_ids())
+            if cid is None:
+                return kind, False, "no_candidate", ""
+            ok = self.cs.cs_ban(aid, cid)
+            return kind, ok, "banned" if ok else "ban_failed", self.name_of(cid)
+        if not snap.get("auto_pick_enabled", False):
+            return kind, False, "disabled", ""
+        ids = plan.pick_candidates(view)
+        if not ids:
+            return kind, False, "no_candidate", ""
+        ok, how = self.cs.autopick_try_with_bench(ids, do_lock=snap.get("auto_pick_lock", True))
+        return kind, ok, how, f"ids={ids}"
@@ -0,0 +1,245 @@
+"""Presence izleyici: arkadaş listesi + kendi durumum için önbellek ve fark (diff) olayları.
+
+Arkadaş listesi (/lol-chat/v1/friends) ve /lol-chat/v1/me tek bir "presence" thread'inde
+yoklanır; tüketiciler GET atmak yerine son durumu okur ya da olaylara abone olur:
+
+    pt = PresenceTracker(cs, interval=3.0)
+    cs.presence = pt                       # cs.friends() / cs.my_availability() önbellekten
+    pt.subscribe(lambda ev: print(ev), kinds=("friend_online", "me_status"))
+    threading.Thread(target=pt.run, args=(stop_flag,), daemon=True).start()
+
+Fark ucuzdur: yanıt gövdesinin parmak izi (uzunluk + crc32) değişmediyse JSON hiç
+çözülmez; değiştiyse her arkadaş için ilgili alanların hash'i (friend_hash) önceki
+turla karşılaştırılır, yalnızca hash'i değişenler için olay üretilir.
+
+Olaylar: friend_online, friend_offline, friend_status (çevrimiçiyken durum/oyun
+değişti), friend_added, friend_removed, me_status. "Çevrimiçi" uygulamanın geri kalanıyla
+(/friends, Telegram seçici) aynıdır: Friend.is_online (chat/online/mobile); away/dnd sayılmaz. İlk tur yalnızca temel durumu
+kurar, olay üretmez. Abone çağrıları presence thread'inde yapılır.
+"""
+from __future__ import annotations
+import threading, time, zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils import log_once
+from profiler import loop_tick
+from json_codec import decode_response, loads_models
+from models import Friend
+
+DEFAULT_INTERVAL = 3.0   # sn
+
+KINDS = ("friend_online", "friend_offline", "friend_status", "friend_added", "friend_removed", "me_status")
+
+
+def _lol(raw: dict) -> dict:
+    lol = raw.get("lol")
+    return lol if isinstance(lol, dict) else {}
+
+
+def friend_hash(f: Friend) -> int:
+    """Olay üretmeye değer alanların hash'i (icon, tarihçe gibi gürültülü alanlar hariç)."""
+    raw, lol = f.raw, _lol(f.raw)
+    return hash((f.availability, f.name, raw.get("statusMessage") or "", raw.get("productName") or "",
+                 lol.get("gameStatus") or "", lol.get("gameQueueType") or "", lol.get("championId") or ""))
+
+
+def _avail(me: dict) -> str:
+    return (me.get("availability") or me.get("availabilityStatus") or "").lower()
+
+
+def _game(f: Friend) -> str:
+    return _lol(f.raw).get("gameStatus") or ""
+
+
+class PresenceEvent:
+    __slots__ = ("kind", "key", "name", "old", "new", "ts")
+
+    def __init__(self, kind: str, key: str, name: str, old: str, new: str):
+        self.kind = kind
+        self.key = key
+        self.name = name
+        self.old = old     # önceki durum: availability[/gameStatus]
+        self.new = new
+        self.ts = time.time()
+
+    def __repr__(self) -> str:
+        return f"PresenceEvent({self.kind}, {self.name!r}, {self.old!r} → {self.new!r})"
+
+
+def _state(f: Friend) -> str:
+    g = _game(f)
+    return f"{f.availability}/{g}" if g else f.availability
+
+
+_TEXT = {
+    "friend_online": "{name} çevrimiçi oldu ({new})",
+    "friend_offline": "{name} çevrimdışı oldu",
+    "friend_status": "{name}: {old} → {new}",
+    "friend_added": "{name} arkadaş listesine eklendi",
+    "friend_removed": "{name} arkadaş listesinden çıktı",
+    "me_status": "durumum: {old} → {new}",
+}
+
+
+def format_event(ev: PresenceEvent) -> str:
+    return _TEXT.get(ev.kind, "{name} {old} → {new}").format(name=ev.name, old=ev.old or "-", new=ev.new or "-")
+
+
+class PresenceTracker:
+    def __init__(self, cs, interval: float = DEFAULT_INTERVAL, max_age: Optional[float] = None):
+        self.cs = cs
+        self.interval = max(0.5, float(interval))
+        # Önbellek bu süreden eskiyse okuyucular None alır (→ doğrudan GET'e döner)
+        self.max_age = 2 * self.interval + 1.0 if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._roster: Dict[str, Tuple[int, Friend]] = {}   # key → (hash, Friend)
+        self._friends: List[Friend] = []
+        self._friends_fp: Optional[tuple] = None
+        self._friends_ts = 0.0        # monotonic; 0 → hiç yüklenmedi
+        self._me: dict = {}
+        self._me_fp: Optional[tuple] = None
+        self._me_ts = 0.0
+        self._subs: List[Tuple[Callable[[PresenceEvent], None], Optional[frozenset]]] = []
+        self.polls = self.unchanged = self.decoded = 0
+        self.events: Counter = Counter()
+
+    # ---------- abonelik ----------
+    def subscribe(self, fn: Callable[[PresenceEvent], None], kinds: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        entry = (fn, frozenset(kinds) if kinds else None)
+        with self._lock:
+            self._subs.append(entry)
+
+        def _unsubscribe():
+            with self._lock:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+        return _unsubscribe
+
+    def _publish(self, events: List[PresenceEvent]) -> None:
+        with self._lock:
+            subs = list(self._subs)
+        for ev in events:
+            self.events[ev.kind] += 1
+            for fn, kinds in subs:
+                if kinds is not None and ev.kind not in kinds:
+                    continue
+                try:
+                    fn(ev)
+                except Exception as e:
+                    log_once("PRESENCE", f"abone hatası ({ev.kind}): {e}")
+
+    # ---------- önbellekten okuma ----------
+    def friends(self) -> Optional[List[Friend]]:
+        """Son arkadaş listesi; önbellek yoksa / bayatsa None."""
+        with self._lock:
+            if self._friends_ts and time.monotonic() - self._friends_ts <= self.max_age:
+                return list(self._friends)
+        return None
+
+    def me(self) -> Optional[dict]:
+        with self._lock:
+            if self._me_ts and time.monotonic() - self._me_ts <= self.max_age:
+                return self._me
+        return None
+
+    def my_availability(self) -> Optional[str]:
+        me = self.me()
+        return None if me is None else _avail(me)
+
+    # ---------- yoklama ----------
+    @staticmethod
+    def _fingerprint(r) -> tuple:
+        body = r.content or b""
+        return (len(body), zlib.crc32(body))
+
+    def poll(self) -> List[PresenceEvent]:
+        """Tek tur: arkadaşlar + ben; üretilen olayları yayınlar ve döner."""
+        self.polls += 1
+        events = self._poll_friends() + self._poll_me()
+        if events:
+            self._publish(events)
+        return events
+
+    def _poll_friends(self) -> List[PresenceEvent]:
+        r = self.cs._get("/lol-chat/v1/friends")
+        if not r or r.status_code != 200:
+            return []
+        fp = self._fingerprint(r)
+        now = time.monotonic()
+        if fp == self._friends_fp:
+            self.unchanged += 1
+            with self._lock:
+                self._friends_ts = now
+            return []
+        friends = loads_models(r.content, Friend.from_raw)
+        self.decoded += 1
+        first = not self._friends_ts
+        events: List[PresenceEvent] = []
+        roster: Dict[str, Tuple[int, Friend]] = {}
+        old = self._roster
+        for f in friends:
+            h = friend_hash(f)
+            roster[f.key] = (h, f)
+            prev = old.get(f.key)
+            if first or (prev is not None and prev[0] == h):
+                continue
+            if prev is None:
+                events.append(PresenceEvent("friend_added", f.key, f.display_name, "", _state(f)))
+                continue
+            pf = prev[1]
+            was, now_on = pf.is_online, f.is_online
+            if was != now_on:
+                kind = "friend_online" if now_on else "friend_offline"
+            elif now_on and _state(pf) != _state(f):
+                kind = "friend_status"
+            else:
+                continue   # ad / durum mesajı gibi alanlar: önbellek güncellenir, olay yok
+            events.append(PresenceEvent(kind, f.key, f.display_name, _state(pf), _state(f)))
+        if not first:
+            for key, (_h, pf) in old.items():
+                if key not in roster:
+                    events.append(PresenceEvent("friend_removed", key, pf.display_name, _state(pf), ""))
+        with self._lock:
+            self._roster, self._friends = roster, friends
+            self._friends_fp, self._friends_ts = fp, now
+        return events
+
+    def _poll_me(self) -> List[PresenceEvent]:
+        r = self.cs._get("/lol-chat/v1/me")
+        if not r or r.status_code != 200:
+            return []
+        fp = self._fingerprint(r)
+        now = time.monotonic()
+        if fp == self._me_fp:
+            with self._lock:
+                self._me_ts = now
+            return []
+        me = decode_response(r) or {}
+        first = not self._me_ts
+        with self._lock:
+            prev = self._me
+            self._me, self._me_fp, self._me_ts = me, fp, now
+        old, new = _avail(prev), _avail(me)
+        if first or old == new:
+            return []
+        return [PresenceEvent("me_status", "me", me.get("gameName") or me.get("name") or "ben", old, new)]
+
+    def run(self, stop_flag: dict) -> None:
+        while not stop_flag.get("stop"):
+            loop_tick()
+            if not self.cs.wait_online():
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                log_once("PRESENCE", f"poll err: {e}")
+            time.sleep(self.interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            online = sum(1 for f in self._friends if f.is_online)
+            total = len(self._friends)
+        return {"polls": self.polls, "unchanged": self.unchanged, "decoded": self.decoded,
+                "friends": total, "online": online, "events": dict(self.events),
+                "age_s": round(time.monotonic() - self._friends_ts, 1) if self._friends_ts else None}
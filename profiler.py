@@ -0,0 +1,272 @@
+"""Çalışan süreç içi teşhis: örneklemeli profiler, thread yığınları, bellek anlık görüntüleri.
+
+Uzun süre açık kalan bir makinede hangi watcher döngüsünün CPU yediğini görmek için:
+
+    loop_tick()                          # her watcher döngü turunda bir kez (çok ucuz)
+    prof = SamplingProfiler(interval=0.005)
+    res = prof.run(10, "profiles/x.folded")   # 10 sn örnekle → flamegraph.pl / speedscope girdisi
+    thread_report()                      # her thread: ad, döngü hızı, CPU %, güncel yığın
+    MEM.snapshot()                       # tracemalloc: en çok ayıranlar + önceki görüntüyle fark
+
+Örnekleme sys._current_frames() ile yapılır; profil edilen thread'lere hiçbir kanca
+takılmaz (setprofile/settrace yok), maliyet örnekleyici thread'inde kalır. Linux'ta
+thread başına CPU saati (pthread_getcpuclockid) okunur: "cpu" kipinde yalnızca iki örnek
+arasında CPU harcamış thread'lerin yığınları sayılır, uyuyan döngüler grafiği doldurmaz.
+"""
+from __future__ import annotations
+import os, sys, threading, time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+MAX_SECONDS = 300.0
+STACK_DEPTH = 12     # /threads çıktısında thread başına gösterilen kare sayısı
+RATE_WINDOW = 1.0    # sn — daha sık /threads çağrılarında son ölçülen hız gösterilir
+
+_ticks: Dict[int, int] = {}
+_rate_prev: Dict[int, Tuple[float, int, float]] = {}   # ident → (ölçüm anı, tur, hız)
+_started = time.monotonic()
+
+
+def loop_tick() -> None:
+    """Çağıran thread'in döngü sayacını artırır (thread başına tek yazar → kilitsiz)."""
+    ident = threading.get_ident()
+    _ticks[ident] = _ticks.get(ident, 0) + 1
+
+
+def _cpu_clock(ident: int) -> Optional[int]:
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError):
+        return None
+
+
+def _cpu_time(clock: Optional[int]) -> Optional[float]:
+    if clock is None:
+        return None
+    try:
+        return time.clock_gettime(clock)
+    except OSError:   # thread bu arada bitti
+        return None
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}"
+
+
+def _collapse(frame, depth: int = 128) -> List[str]:
+    out = []
+    while frame is not None and len(out) < depth:
+        out.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+def _thread_names() -> Dict[int, str]:
+    return {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+
+
+class SamplingProfiler:
+    """Tüm thread'leri sabit aralıkla örnekler; yığınları katlanmış (collapsed) biçimde sayar."""
+
+    _busy = threading.Lock()   # aynı anda tek profil
+
+    def __init__(self, interval: float = 0.005, mode: str = "cpu"):
+        self.interval = max(0.001, float(interval))
+        self.mode = mode if mode in ("cpu", "wall") else "cpu"
+        if self.mode == "cpu" and _cpu_clock(threading.get_ident()) is None:
+            self.mode = "wall"   # thread CPU saati yok (Windows/macOS) → duvar saati
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.thread_cpu: Counter = Counter()    # ad → sn
+        self.overhead = 0.0                     # örnekleyicinin kendi CPU süresi (sn)
+        self.elapsed = 0.0
+
+    def run(self, seconds: float, out_path: str = "") -> dict:
+        seconds = min(max(0.1, float(seconds)), MAX_SECONDS)
+        if not self._busy.acquire(blocking=False):
+            raise RuntimeError("başka bir profil zaten çalışıyor")
+        try:
+            self._sample_for(seconds)
+        finally:
+            self._busy.release()
+        if out_path:
+            self.write_folded(out_path)
+        return self.summary(out_path)
+
+    def _sample_for(self, seconds: float) -> None:
+        me = threading.get_ident()
+        clocks: Dict[int, Optional[int]] = {}
+        last_cpu: Dict[int, float] = {}
+        names = _thread_names()
+        t_cpu0 = time.thread_time()
+        t0 = time.perf_counter()
+        deadline = t0 + seconds
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            frames = sys._current_frames()
+            self.samples += 1
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names = _thread_names()
+                    name = names.get(ident, f"thread-{ident}")
+                if ident not in clocks:
+                    clocks[ident] = _cpu_clock(ident)
+                cpu = _cpu_time(clocks[ident])
+                if cpu is not None:
+                    prev = last_cpu.get(ident)
+                    last_cpu[ident] = cpu
+                    spent = cpu - prev if prev is not None else 0.0
+                    self.thread_cpu[name] += spent
+                    if self.mode == "cpu" and spent <= 0:
+                        continue
+                self.stacks[";".join([name] + _collapse(frame))] += 1
+            del frames
+            time.sleep(max(0.0, min(self.interval, deadline - time.perf_counter())))
+        self.elapsed = time.perf_counter() - t0
+        self.overhead = time.thread_time() - t_cpu0
+
+    def write_folded(self, path: str) -> None:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+    def top_frames(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Kendi (self) örnek sayısına göre en sıcak kareler: thread;...;kare."""
+        leaf: Counter = Counter()
+        for stack, k in self.stacks.items():
+            parts = stack.split(";")
+            leaf[f"{parts[0]} → {parts[-1]}"] += k
+        return leaf.most_common(n)
+
+    def summary(self, out_path: str = "") -> dict:
+        return {
+            "mode": self.mode,
+            "seconds": round(self.elapsed, 2),
+            "samples": self.samples,
+            "stacks": sum(self.stacks.values()),
+            "overhead_pct": round(100.0 * self.overhead / self.elapsed, 2) if self.elapsed else 0.0,
+            "thread_cpu_pct": {k: round(100.0 * v / self.elapsed, 1)
+                               for k, v in self.thread_cpu.most_common()} if self.elapsed else {},
+            "file": out_path,
+        }
+
+
+def thread_report(depth: int = STACK_DEPTH) -> List[dict]:
+    """Her thread için ad, daemon, döngü hızı (tur/sn), toplam CPU sn ve güncel yığın.
+
+    Döngü hızı bir önceki çağrıdan bu yana ölçülür (ilk çağrıda süreç ömrü boyunca ortalama;
+    RATE_WINDOW'dan kısa aralıkla çağrılırsa son ölçülen hız döner).
+    """
+    now = time.monotonic()
+    frames = sys._current_frames()
+    out = []
+    for t in threading.enumerate():
+        ident = t.ident
+        ticks = _ticks.get(ident)
+        rate = None
+        if ticks is not None:
+            prev_t, prev_n, rate = _rate_prev.get(ident, (_started, 0, None))
+            if now - prev_t >= RATE_WINDOW or rate is None:
+                rate = (ticks - prev_n) / max(now - prev_t, 1e-6)
+                _rate_prev[ident] = (now, ticks, rate)
+        frame = frames.get(ident)
+        stack = _walk(frame, depth) if frame is not None else []
+        out.append({
+            "name": t.name,
+            "daemon": t.daemon,
+            "loops": ticks,
+            "loop_rate": round(rate, 2) if rate is not None else None,
+            "cpu_s": _round(_cpu_time(_cpu_clock(ident))),
+            "stack": stack,
+        })
+    del frames
+    return out
+
+
+def _walk(frame, depth: int) -> List[str]:
+    out = []
+    while frame is not None and len(out) < depth:
+        code = frame.f_code
+        out.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    return out
+
+
+def _round(v: Optional[float]) -> Optional[float]:
+    return round(v, 2) if v is not None else None
+
+
+class MemTracker:
+    """tracemalloc üzerine ince sarmalayıcı; ardışık anlık görüntülerin farkını tutar."""
+
+    FILTERS = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+    def __init__(self, frames: int = 10):
+        self.frames = frames
+        self._prev = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        import tracemalloc
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        import tracemalloc
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._prev = self._take()
+
+    def stop(self) -> None:
+        import tracemalloc
+        with self._lock:
+            tracemalloc.stop()
+            self._prev = None
+
+    def _take(self):
+        import tracemalloc
+        snap = tracemalloc.take_snapshot()
+        flt = [tracemalloc.Filter(False, p) for p in self.FILTERS]
+        flt.append(tracemalloc.Filter(False, tracemalloc.__file__))
+        return snap.filter_traces(flt)
+
+    def snapshot(self, top: int = 10) -> dict:
+        """En çok ayıran satırlar + önceki görüntüye göre en çok büyüyenler. İzleme kapalıysa başlatır."""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            self.start()
+            return {"started": True, "top": [], "diff": []}
+        with self._lock:
+            snap = self._take()
+            prev, self._prev = self._prev, snap
+        cur, peak = tracemalloc.get_traced_memory()
+        res = {
+            "started": False,
+            "current_kib": round(cur / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+            "top": [(_stat_where(s.traceback), round(s.size / 1024, 1), s.count)
+                    for s in snap.statistics("lineno")[:top]],
+            "diff": [],
+        }
+        if prev is not None:
+            res["diff"] = [(_stat_where(s.traceback), round(s.size_diff / 1024, 1), s.count_diff)
+                           for s in snap.compare_to(prev, "lineno")[:top] if s.size_diff]
+        return res
+
+
+def _stat_where(tb) -> str:
+    fr = tb[0]
+    return f"{os.path.basename(fr.filename)}:{fr.lineno}"
+
+
+MEM = MemTracker()
@@ -0,0 +1,450 @@
+"""Birden çok makinedeki istemcileri tek merkezden yönetmek için uzak ajan protokolü.
+
+Ajan (agent) tarafı bir ChatService'in işlemlerini ve durum/olay akışını yerel ağda
+kimlik doğrulamalı bir RPC olarak sunar; denetleyici (controller) tarafı birçok ajana
+bağlanır, heartbeat ile canlılığı izler, kopunca üstel bekleme ile yeniden bağlanır ve
+komutları ajanlara dağıtır (fan-out).
+
+Taşıma: TCP üzerinde satır başına bir JSON (NDJSON). Yalnızca standart kütüphane
+kullanılır; ek WebSocket bağımlılığı gerekmez.
+
+Kimlik doğrulama (paylaşılan AGENT_TOKEN ile HMAC-SHA256 challenge/response):
+    ajan → {"type":"hello","agent":<ad>,"nonce":<hex>}
+    ctl  → {"type":"auth","mac":hmac(token, nonce)}
+    ajan → {"type":"welcome","agent":<ad>}          (yanlışsa bağlantı kapanır)
+
+Mesajlar:
+    ctl  → {"type":"call","id":n,"method":"send","params":{...}}
+    ajan → {"type":"result","id":n,"ok":true,"result":...} | {"type":"result","id":n,"ok":false,"error":"..."}
+    ctl  → {"type":"ping","t":...}   ajan → {"type":"pong","t":...}
+    ajan → {"type":"event","event":"state","data":{...}}  (yalnızca değişen alanlar)
+
+Kullanım:
+    AGENT_LISTEN=0.0.0.0:8765 AGENT_TOKEN=... python main.py       # main.py içinde ajan
+    python remote_agent.py demo --agents 3                          # localhost + FakeLcu
+"""
+from __future__ import annotations
+import argparse, asyncio, hashlib, hmac, itertools, json, os, secrets, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import log_once
+from config import ConfigStore, as_store
+
+# Uzaktan çağrılabilecek ChatService metotları (başka hiçbir şey çağrılamaz)
+AGENT_METHODS = {
+    "refresh_me", "list_friends", "list_friends_online", "list_groups", "list_dms",
+    "my_presence", "my_availability", "send", "dm_send", "send_to_lobby", "dm_log",
+    "start_matchmaking", "stop_matchmaking", "is_party_leader", "gameflow_phase",
+    "ready_check_status", "ready_check_accept", "ready_check_decline",
+    "cs_bench_list", "bench_swap", "geoinfo_quick", "select_group", "follow_lobby_chat",
+}
+
+HEARTBEAT_INTERVAL = 5.0
+STATE_INTERVAL = 1.0
+MAX_LINE = 1 << 20
+
+
+def _mac(token: str, nonce: str) -> str:
+    return hmac.new(token.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+
+
+async def _send(writer: asyncio.StreamWriter, obj: dict) -> None:
+    writer.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+
+
+async def _recv(reader: asyncio.StreamReader, timeout: Optional[float] = None) -> Optional[dict]:
+    line = await asyncio.wait_for(reader.readline(), timeout) if timeout else await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# =====================================================================
+# Ajan
+# =====================================================================
+class AgentServer:
+    """Bir ChatService'i ağ üzerinden sunar. start_in_thread() kendi event loop'unu açar."""
+
+    def __init__(self, cs, token: str, host: str = "0.0.0.0", port: int = 8765,
+                 name: Optional[str] = None, cfg: Optional[ConfigStore] = None):
+        if not token:
+            raise ValueError("AGENT_TOKEN boş olamaz")
+        self.cs = cs
+        self.cfg = None if cfg is None else as_store(cfg)
+        self.token = token
+        self.host = host
+        self.port = port
+        self.name = name or (cs.ME or {}).get("displayName") or f"agent-{os.getpid()}"
+        self._clients: List[asyncio.StreamWriter] = []
+        self._state: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+
+    def start_in_thread(self) -> "AgentServer":
+        def _runner():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            loop.run_until_complete(self._serve())
+        threading.Thread(target=_runner, daemon=True, name="agent").start()
+        self._ready.wait(5.0)
+        return self
+
+    async def _serve(self) -> None:
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.port = server.sockets[0].getsockname()[1]
+        log_once("AGENT", f"{self.name} dinliyor: {self.host}:{self.port}")
+        self._ready.set()
+        asyncio.ensure_future(self._state_loop())
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        try:
+            nonce = secrets.token_hex(16)
+            await _send(writer, {"type": "hello", "agent": self.name, "nonce": nonce})
+            auth = await _recv(reader, timeout=5.0)
+            if not auth or auth.get("type") != "auth" or not hmac.compare_digest(
+                    str(auth.get("mac") or ""), _mac(self.token, nonce)):
+                log_once("AGENT", f"kimlik doğrulama başarısız: {peer}")
+                return
+            await _send(writer, {"type": "welcome", "agent": self.name})
+            if not self._clients:   # durum döngüsü boştaydı: bayat görüntü yerine tazesini gönder
+                await self._refresh_state()
+            await _send(writer, {"type": "event", "event": "state", "data": dict(self._state), "full": True})
+            self._clients.append(writer)
+            log_once("AGENT", f"controller bağlandı: {peer}")
+            while True:
+                msg = await _recv(reader)
+                if msg is None:
+                    break
+                kind = msg.get("type")
+                if kind == "ping":
+                    await _send(writer, {"type": "pong", "t": msg.get("t")})
+                elif kind == "call":
+                    asyncio.ensure_future(self._call(writer, msg))
+        except (asyncio.TimeoutError, ConnectionError, json.JSONDecodeError) as e:
+            log_once("AGENT", f"bağlantı hatası {peer}: {e}")
+        finally:
+            if writer in self._clients:
+                self._clients.remove(writer)
+            writer.close()
+
+    def _invoke(self, method: str, params: dict):
+        if method == "cfg_get":
+            return dict(self.cfg.snapshot()) if self.cfg is not None else {}
+        if method == "cfg_set":
+            if self.cfg is None:
+                raise ValueError("cfg yok")
+            snap = self.cfg.snapshot()
+            changes = {k: v for k, v in (params or {}).items() if k in snap and not k.startswith("_")}
+            return dict(self.cfg.update(changes))
+        if method == "state":
+            return dict(self._state)
+        if method not in AGENT_METHODS:
+            raise ValueError(f"izin verilmeyen metot: {method}")
+        return getattr(self.cs, method)(**(params or {}))
+
+    async def _call(self, writer: asyncio.StreamWriter, msg: dict) -> None:
+        rid = msg.get("id")
+        try:
+            res = await asyncio.get_running_loop().run_in_executor(
+                None, self._invoke, str(msg.get("method") or ""), msg.get("params") or {})
+            reply = {"type": "result", "id": rid, "ok": True, "result": _jsonable(res)}
+        except Exception as e:
+            reply = {"type": "result", "id": rid, "ok": False, "error": str(e)}
+        try:
+            await _send(writer, reply)
+        except ConnectionError:
+            pass
+
+    def _snapshot(self) -> Dict[str, Any]:
+        lob = self.cs._lobby() or {}
+        return {
+            "me": (self.cs.ME or {}).get("displayName") or "",
+            "phase": self.cs.gameflow_phase(),
+            "lobby_members": sorted((m.get("summonerName") or "") for m in (lob.get("members") or [])),
+            "leader": bool((lob.get("localMember") or {}).get("isLeader")),
+            "group": self.cs.active_group_id,
+        }
+
+    async def _refresh_state(self) -> None:
+        try:
+            self._state = await asyncio.get_running_loop().run_in_executor(None, self._snapshot)
+        except Exception as e:
+            log_once("AGENT", f"state err: {e}")
+
+    async def _state_loop(self) -> None:
+        """Bağlı controller yokken LCU'ya istek atılmaz (control_api.StateHub gibi)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._clients:
+                await asyncio.sleep(STATE_INTERVAL)
+                continue
+            try:
+                snap = await loop.run_in_executor(None, self._snapshot)
+                diff = {k: v for k, v in snap.items() if self._state.get(k) != v}
+                if diff:
+                    self._state.update(diff)
+                    for w in list(self._clients):
+                        try:
+                            await _send(w, {"type": "event", "event": "state", "data": diff})
+                        except ConnectionError:
+                            pass
+            except Exception as e:
+                log_once("AGENT", f"state err: {e}")
+            await asyncio.sleep(STATE_INTERVAL)
+
+
+def _jsonable(v):
+    if isinstance(v, (set, frozenset, tuple)):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, list):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, dict):
+        return {str(k): _jsonable(x) for k, x in v.items()}
+    return v
+
+
+# =====================================================================
+# Denetleyici
+# =====================================================================
+class _AgentLink:
+    def __init__(self, name: str, host: str, port: int):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = False
+        self.remote_name = ""
+        self.state: Dict[str, Any] = {}
+        self.last_pong = 0.0
+        self.rtt_ms = 0.0
+        self.reconnects = 0
+        self.pending: Dict[int, asyncio.Future] = {}
+
+
+class Controller:
+    """Birçok ajana bağlanır; heartbeat, yeniden bağlanma ve komut dağıtımı yapar.
+
+    Tüm public metotlar thread-safe ve senkrondur (kendi event loop thread'ini kullanır).
+    """
+
+    def __init__(self, token: str, heartbeat: float = HEARTBEAT_INTERVAL):
+        self.token = token
+        self.heartbeat = heartbeat
+        self.links: Dict[str, _AgentLink] = {}
+        self._ids = itertools.count(1)
+        self._listeners: List[Callable[[str, str, dict], None]] = []
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True, name="controller").start()
+
+    # ---- public ----
+    def add_agent(self, name: str, host: str, port: int) -> None:
+        link = _AgentLink(name, host, int(port))
+        self.links[name] = link
+        asyncio.run_coroutine_threadsafe(self._maintain(link), self._loop)
+
+    def on_event(self, cb: Callable[[str, str, dict], None]) -> None:
+        """cb(agent_name, event, data)"""
+        self._listeners.append(cb)
+
+    def wait_connected(self, timeout: float = 5.0, names: Optional[List[str]] = None) -> bool:
+        deadline = time.monotonic() + timeout
+        names = names or list(self.links)
+        while time.monotonic() < deadline:
+            if all(self.links[n].connected for n in names):
+                return True
+            time.sleep(0.02)
+        return False
+
+    def call(self, name: str, method: str, timeout: float = 10.0, **params):
+        return self.call_async(name, method, timeout, **params).result(timeout + 1)
+
+    def call_async(self, name: str, method: str, timeout: float = 10.0, **params) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._call(self.links[name], method, params, timeout), self._loop)
+
+    def fan_out(self, method: str, names: Optional[List[str]] = None, timeout: float = 10.0, **params) -> Dict[str, Any]:
+        """Komutu (varsayılan: bağlı tüm) ajanlara paralel gönderir. Döner: {ajan: sonuç | Exception}."""
+        targets = names or [n for n, l in self.links.items() if l.connected]
+        futs = {n: self.call_async(n, method, timeout, **params) for n in targets}
+        out: Dict[str, Any] = {}
+        for n, f in futs.items():
+            try:
+                out[n] = f.result(timeout + 1)
+            except Exception as e:
+                out[n] = e
+        return out
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            n: {"connected": l.connected, "agent": l.remote_name, "rtt_ms": round(l.rtt_ms, 2),
+                "reconnects": l.reconnects, "state": dict(l.state)}
+            for n, l in self.links.items()
+        }
+
+    # ---- iç ----
+    async def _call(self, link: _AgentLink, method: str, params: dict, timeout: float):
+        if not (link.connected and link.writer):
+            raise ConnectionError(f"{link.name} bağlı değil")
+        rid = next(self._ids)
+        fut = self._loop.create_future()
+        link.pending[rid] = fut
+        try:
+            await _send(link.writer, {"type": "call", "id": rid, "method": method, "params": params})
+            msg = await asyncio.wait_for(fut, timeout)
+        finally:
+            link.pending.pop(rid, None)
+        if not msg.get("ok"):
+            raise RuntimeError(msg.get("error") or "agent error")
+        return msg.get("result")
+
+    async def _maintain(self, link: _AgentLink) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(link.host, link.port, limit=MAX_LINE), 5.0)
+                hello = await _recv(reader, timeout=5.0)
+                if not hello or hello.get("type") != "hello":
+                    raise ConnectionError("hello yok")
+                await _send(writer, {"type": "auth", "mac": _mac(self.token, str(hello.get("nonce") or ""))})
+                welcome = await _recv(reader, timeout=5.0)
+                if not welcome or welcome.get("type") != "welcome":
+                    raise ConnectionError("kimlik doğrulama reddedildi")
+                link.writer, link.connected, link.remote_name = writer, True, hello.get("agent") or ""
+                link.last_pong = time.monotonic()
+                backoff = 0.5
+                log_once("CTL", f"{link.name} bağlandı ({link.remote_name})")
+                hb = asyncio.ensure_future(self._heartbeat(link))
+                try:
+                    await self._read_loop(link, reader)
+                finally:
+                    hb.cancel()
+            except (OSError, asyncio.TimeoutError, ConnectionError, json.JSONDecodeError) as e:
+                if link.connected or not link.reconnects:
+                    log_once("CTL", f"{link.name} bağlantı yok: {e}")
+            if link.connected:
+                log_once("CTL", f"{link.name} koptu")
+            link.connected = False
+            if link.writer:
+                link.writer.close()
+                link.writer = None
+            for f in link.pending.values():
+                if not f.done():
+                    f.set_exception(ConnectionError(f"{link.name} koptu"))
+            link.pending.clear()
+            link.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _read_loop(self, link: _AgentLink, reader: asyncio.StreamReader) -> None:
+        while True:
+            msg = await _recv(reader)
+            if msg is None:
+                return
+            kind = msg.get("type")
+            if kind == "result":
+                fut = link.pending.get(msg.get("id"))
+                if fut and not fut.done():
+                    fut.set_result(msg)
+            elif kind == "pong":
+                link.last_pong = time.monotonic()
+                try:
+                    link.rtt_ms = (time.monotonic() - float(msg.get("t"))) * 1000.0
+                except (TypeError, ValueError):
+                    pass
+            elif kind == "event":
+                data = msg.get("data") or {}
+                if msg.get("event") == "state":
+                    if msg.get("full"):
+                        link.state = dict(data)
+                    else:
+                        link.state.update(data)
+                for cb in list(self._listeners):
+                    try:
+                        cb(link.name, msg.get("event") or "", data)
+                    except Exception as e:
+                        log_once("CTL", f"event cb err: {e}")
+
+    async def _heartbeat(self, link: _AgentLink) -> None:
+        while link.connected and link.writer:
+            try:
+                await _send(link.writer, {"type": "ping", "t": time.monotonic()})
+            except ConnectionError:
+                return
+            await asyncio.sleep(self.heartbeat)
+            if time.monotonic() - link.last_pong > 3 * self.heartbeat:
+                log_once("CTL", f"{link.name} heartbeat zaman aşımı")
+                link.writer.close()
+                return
+
+
+# =====================================================================
+# Demo: localhost'ta N ajan (FakeLcu) + controller
+# =====================================================================
+def _demo(n_agents: int) -> None:
+    from chat_service import ChatService
+    from fake_lcu import FakeLcu
+
+    token = secrets.token_hex(16)
+    ctl = Controller(token, heartbeat=1.0)
+    lcus = []
+    for i in range(n_agents):
+        lcu = FakeLcu(name=f"Summoner{i + 1}", summoner_id=2000 + i)
+        lcu.create_lobby(members=[f"Mate{i}"])
+        cs = ChatService(lcu)
+        cs.refresh_me()
+        agent = AgentServer(cs, token, host="127.0.0.1", port=0, name=f"agent{i + 1}",
+                            cfg={"auto_ready": False}).start_in_thread()
+        ctl.add_agent(f"agent{i + 1}", "127.0.0.1", agent.port)
+        lcus.append(lcu)
+    ctl.on_event(lambda a, ev, d: log_once("CTL", f"{a} {ev} {d}"))
+    if not ctl.wait_connected(5.0):
+        raise SystemExit(f"ajanlar bağlanamadı: {ctl.status()}")
+
+    t0 = time.perf_counter()
+    res = ctl.fan_out("start_matchmaking")
+    log_once("CTL", f"fan-out start_matchmaking {(time.perf_counter() - t0) * 1000:.1f} ms → {res}")
+    log_once("CTL", f"phase: {ctl.fan_out('gameflow_phase')}")
+    log_once("CTL", f"cfg_set: {ctl.fan_out('cfg_set', auto_ready=True)}")
+    try:
+        ctl.call("agent1", "__class__")
+    except RuntimeError as e:
+        log_once("CTL", f"beklenen red: {e}")
+    time.sleep(2.5)
+    for n, st in ctl.status().items():
+        log_once("CTL", f"{n}: {st}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Uzak ajan / controller")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("demo", help="localhost'ta sahte LCU'lu ajanlar + controller")
+    d.add_argument("--agents", type=int, default=3)
+    c = sub.add_parser("call", help="ajanlara komut gönder")
+    c.add_argument("method")
+    c.add_argument("agents", nargs="+", help="host:port")
+    c.add_argument("--params", default="{}", help="JSON parametreler")
+    args = ap.parse_args()
+
+    if args.cmd == "demo":
+        _demo(args.agents)
+        return
+    token = os.getenv("AGENT_TOKEN", "")
+    if not token:
+        raise SystemExit("AGENT_TOKEN gerekli.")
+    ctl = Controller(token)
+    for a in args.agents:
+        host, port = a.rsplit(":", 1)
+        ctl.add_agent(a, host, int(port))
+    ctl.wait_connected(5.0)
+    for name, res in ctl.fan_out(args.method, **json.loads(args.params)).items():
+        print(f"{name}: {res}")
+
+
+if __name__ == "__main__":
+    main()
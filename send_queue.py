@@ -0,0 +1,196 @@
+"""Bot yanıtları için giden sohbet kuyruğu: konuşma başına token bucket + mesaj birleştirme.
+
+    q = SendQueue(rate=1.0, burst=3, merge=0.3)
+    q.post(conv_id, "Matchmaking başlatılıyor…", lambda text: cs.send(conv_id, text))
+
+Küçük bir "chat-send" thread havuzu (workers) konuşmaları boşaltır; bir konuşmada aynı anda
+en fazla bir POST uçuştadır, böylece yavaş bir POST (3 sn zaman aşımı) diğer konuşmaları bekletmez:
+  - her konuşmanın kendi kovası vardır (rate mesaj/sn, en fazla burst birikir);
+    kova boşsa konuşma bekler, bu bir "throttle" olayı olarak sayılır;
+  - sessiz bir konuşmaya giden ilk yanıt hemen çıkar; son merge sn içinde zaten
+    mesaj gönderilmiş bir konuşmada yanıtlar merge sn biriktirilir ve (MAX_LEN'e
+    kadar) tek mesajda SEP ile birleştirilir; art arda aynı metin tek kez yazılır.
+    Kova beklerken gelen yanıtlar da aynı şekilde birleşir.
+Konuşma içinde sıra korunur. Gönderim, yanıtı üreten trace'e "chat.send" span'i olarak eklenir.
+"""
+from __future__ import annotations
+import threading, time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from utils import latency_dist, log_once
+from profiler import loop_tick
+from tracing import Span, attach, current, span
+
+SEP = " | "
+MAX_LEN = 480          # birleştirilmiş mesajın üst sınırı (karakter)
+MAX_PENDING = 100      # konuşma başına bekleyen yanıt sınırı (taşarsa yeni yanıt düşer)
+IDLE_FORGET = 60.0     # sn — boşta kalan konuşmanın kovası unutulur
+DEFAULT_WORKERS = 3    # eşzamanlı gönderim (farklı konuşmalar)
+SAMPLES = 256
+
+Sender = Callable[[str], bool]
+
+
+class _Item:
+    __slots__ = ("text", "t_in", "trace")
+
+    def __init__(self, text: str, trace: Optional[Span]):
+        self.text = text
+        self.t_in = time.monotonic()
+        self.trace = trace
+
+
+class _Conv:
+    __slots__ = ("key", "send", "tokens", "t_tok", "items", "last_sent", "throttled", "busy")
+
+    def __init__(self, key: str, send: Sender, burst: float):
+        self.key = key
+        self.send = send
+        self.tokens = burst
+        self.t_tok = time.monotonic()
+        self.items: Deque[_Item] = deque()
+        self.last_sent = 0.0
+        self.throttled = False   # başındaki yanıt kova yüzünden bekledi
+        self.busy = False        # bu konuşmanın POST'u uçuşta (sıra korunur)
+
+
+class SendQueue:
+    def __init__(self, rate: float = 1.0, burst: float = 3.0, merge: float = 0.3, workers: int = DEFAULT_WORKERS):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.merge = max(0.0, float(merge))
+        self.workers = max(1, int(workers))
+        self._cv = threading.Condition()
+        self._convs: Dict[str, _Conv] = {}
+        self._threads: List[threading.Thread] = []
+        self.posted = self.sent = self.merged = self.failed = self.dropped = self.throttled = 0
+        self.wait: Deque[float] = deque(maxlen=SAMPLES)   # kuyruğa giriş → POST başlangıcı
+        self.call: Deque[float] = deque(maxlen=SAMPLES)   # POST süresi
+
+    def post(self, key: str, text: str, send: Sender) -> bool:
+        """Yanıtı key (konuşma) kuyruğuna ekler; send(text) gönderimde chat-send thread'inde çağrılır."""
+        if not text:
+            return False
+        with self._cv:
+            c = self._convs.get(key)
+            if c is None:
+                c = self._convs[key] = _Conv(key, send, self.burst)
+            else:
+                c.send = send
+            if len(c.items) >= MAX_PENDING:
+                self.dropped += 1
+                full = True
+            else:
+                full = False
+                c.items.append(_Item(text, current()))
+                self.posted += 1
+                self._cv.notify()
+            if not self._threads:
+                for i in range(self.workers):
+                    t = threading.Thread(target=self._run, name=f"chat-send-{i}", daemon=True)
+                    self._threads.append(t)
+                    t.start()
+        if full:
+            log_once("OUTBOX", f"{key[:24]} kuyruğu dolu ({MAX_PENDING}); yanıt düştü")
+        return not full
+
+    # ---------- gönderici ----------
+    def _ready(self, c: _Conv, now: float) -> float:
+        """c hemen gönderilebilirse 0, değilse beklenecek süre (sn). self._cv tutulurken çağrılır."""
+        c.tokens = min(self.burst, c.tokens + (now - c.t_tok) * self.rate)
+        c.t_tok = now
+        if c.tokens < 1.0:
+            c.throttled = True
+            return (1.0 - c.tokens) / self.rate
+        first = c.items[0].t_in
+        if now - c.last_sent < self.merge and now < first + self.merge:
+            return first + self.merge - now   # patlama sürüyor: biraz biriktir
+        return 0.0
+
+    def _take(self, c: _Conv) -> Tuple[str, List[_Item]]:
+        """Baştaki yanıtları MAX_LEN'e kadar tek metinde birleştirir. self._cv tutulurken çağrılır."""
+        parts: List[str] = []
+        taken: List[_Item] = []
+        size = 0
+        while c.items:
+            it = c.items[0]
+            if parts and it.text == parts[-1]:
+                taken.append(c.items.popleft())   # art arda aynı yanıt
+                continue
+            add = len(it.text) + (len(SEP) if parts else 0)
+            if parts and size + add > MAX_LEN:
+                break
+            parts.append(it.text)
+            size += add
+            taken.append(c.items.popleft())
+        return SEP.join(parts), taken
+
+    def _next(self) -> Tuple[_Conv, str, List[_Item], bool]:
+        with self._cv:
+            while True:
+                now = time.monotonic()
+                best: Optional[_Conv] = None
+                sleep: Optional[float] = None
+                for key, c in list(self._convs.items()):
+                    if c.busy:
+                        continue   # POST'u başka worker'da sürüyor; bitince notify gelir
+                    if not c.items:
+                        if now - c.last_sent > max(IDLE_FORGET, self.burst / self.rate):   # kova zaten dolmuştur
+                            del self._convs[key]
+                        continue
+                    w = self._ready(c, now)
+                    if w <= 0:
+                        if best is None or c.items[0].t_in < best.items[0].t_in:
+                            best = c
+                    elif sleep is None or w < sleep:
+                        sleep = w
+                if best is not None:
+                    best.tokens -= 1.0
+                    best.busy = True
+                    throttled, best.throttled = best.throttled, False
+                    text, items = self._take(best)
+                    return best, text, items, throttled
+                self._cv.wait(sleep)
+
+    def _run(self) -> None:
+        while True:
+            loop_tick()
+            c, text, items, throttled = self._next()
+            t0 = time.monotonic()
+            ok = False
+            with attach(items[0].trace), span("chat.send", merged=len(items),
+                                              waited_ms=round((t0 - items[0].t_in) * 1000.0, 1)):
+                try:
+                    ok = bool(c.send(text))
+                except Exception as e:
+                    log_once("OUTBOX", f"gönderim hatası: {e}")
+            t1 = time.monotonic()
+            with self._cv:
+                c.busy = False
+                c.last_sent = t1
+                self.sent += 1
+                self.merged += len(items) - 1
+                self.failed += not ok
+                self.throttled += throttled
+                self.call.append(t1 - t0)
+                for it in items:
+                    self.wait.append(t0 - it.t_in)
+                self._cv.notify_all()   # bu konuşmada bekleyen yanıt varsa bir worker alsın
+            if throttled:
+                log_once("OUTBOX", f"{c.key[:24]} hız sınırına takıldı: {len(items)} yanıt, "
+                                   f"{(t0 - items[0].t_in) * 1000.0:.0f} ms bekledi")
+
+    def pending(self) -> Dict[str, int]:
+        with self._cv:
+            return {k: len(c.items) for k, c in self._convs.items() if c.items}
+
+    def stats(self) -> dict:
+        with self._cv:
+            return {
+                "rate": self.rate, "burst": self.burst, "merge_ms": round(self.merge * 1000.0), "workers": self.workers,
+                "posted": self.posted, "sent": self.sent, "merged": self.merged,
+                "failed": self.failed, "dropped": self.dropped, "throttled": self.throttled,
+                "wait": latency_dist(self.wait), "call": latency_dist(self.call),
+                "pending": {k: len(c.items) for k, c in self._convs.items() if c.items},
+            }
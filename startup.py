@@ -0,0 +1,115 @@
+"""Başlangıç (warm-up) hattı: aşama bazlı süre ölçümü + bağımsız işlerin paralel çalışması.
+
+    boot = StartupPipeline()
+    boot.run("lcu", LcuSession)                   # senkron aşama
+    me = boot.submit("refresh_me", cs.refresh_me)  # arka planda
+    dm = boot.after(me, "dm_watcher", start_dm)    # me bitince başlat
+    boot.mark("config")                            # kilometre taşı (şimdi)
+    boot.mark_after([dm], "watchers")              # kilometre taşı (dm başlayınca)
+    boot.report_when_done()                        # hepsi bitince dökümü logla
+"""
+from __future__ import annotations
+import threading, time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, List, Tuple
+from utils import log_once
+
+
+class StartupPipeline:
+    WATCHERS_TARGET = 1.0  # sn — soğuk başlangıçta watcher'ların çalışıyor olması hedefi
+
+    def __init__(self, max_workers: int = 4):
+        self.t0 = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        # (ad, başlangıç ofseti sn, süre sn, ok)
+        self.stages: List[Tuple[str, float, float, bool]] = []
+
+    def _record(self, name: str, start: float, ok: bool) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            self.stages.append((name, start - self.t0, end - start, ok))
+
+    def run(self, name: str, fn: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            res = fn(*args, **kwargs)
+            ok = True
+            return res
+        finally:
+            self._record(name, start, ok)
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        def _job():
+            try:
+                return self.run(name, fn, *args, **kwargs)
+            except Exception as e:
+                log_once("BOOT", f"{name} err: {e}")
+                raise
+        fut = self._pool.submit(_job)
+        with self._lock:
+            self._futures.append(fut)
+        return fut
+
+    def after(self, dep: Future, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """dep tamamlanınca (başarısız olsa bile) fn'i çalıştırır."""
+        out: Future = Future()
+
+        def _go(_):
+            try:
+                out.set_result(self.run(name, fn, *args, **kwargs))
+            except Exception as e:
+                log_once("BOOT", f"{name} err: {e}")
+                out.set_exception(e)
+        dep.add_done_callback(_go)
+        with self._lock:
+            self._futures.append(out)
+        return out
+
+    def mark(self, name: str) -> float:
+        """Kilometre taşı: t0'dan bu yana geçen süreyi kaydeder ve döner."""
+        now = time.perf_counter()
+        with self._lock:
+            self.stages.append((name, now - self.t0, 0.0, True))
+        return now - self.t0
+
+    def mark_after(self, deps: List[Future], name: str) -> Future:
+        """deps'in hepsi bitince (başarısız olsa bile) kilometre taşı koyar; sonuç t0'dan geçen süre."""
+        out: Future = Future()
+        left = [len(deps)]
+
+        def _one(_):
+            with self._lock:
+                left[0] -= 1
+                last = left[0] == 0
+            if last:
+                out.set_result(self.mark(name))
+        with self._lock:
+            self._futures.append(out)
+        for dep in deps:
+            dep.add_done_callback(_one)
+        if not deps:
+            out.set_result(self.mark(name))
+        return out
+
+    def report(self) -> None:
+        with self._lock:
+            stages = sorted(self.stages, key=lambda s: s[1])
+        total = time.perf_counter() - self.t0
+        for name, off, dur, ok in stages:
+            if dur:
+                log_once("BOOT", f"{name:<16} +{off*1000:7.1f} ms  {dur*1000:7.1f} ms{'' if ok else '  FAIL'}")
+            else:
+                log_once("BOOT", f"{name:<16} @{off*1000:7.1f} ms")
+        log_once("BOOT", f"toplam {total*1000:.1f} ms")
+
+    def report_when_done(self, timeout: float = 30.0) -> None:
+        def _wait():
+            with self._lock:
+                futs = list(self._futures)
+            wait(futs, timeout=timeout)
+            self.report()
+            self._pool.shutdown(wait=False)
+        threading.Thread(target=_wait, daemon=True).start()
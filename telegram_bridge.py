@@ -1,16 +1,21 @@
 from __future__ import annotations
-import json, threading, asyncio
+import threading, asyncio, concurrent.futures
 from typing import Optional, Dict, Callable
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
 from utils import log_once
+import json_codec
+from tracing import attach, current, span
 
 class TelegramBridge:
     def __init__(self, chat_service, owner_id: int, bot_token: str,
-                 forum_chat_id: Optional[int] = None, topics_db: str = "topics.json"):
+                 forum_chat_id: Optional[int] = None, topics_db: str = "topics.json",
+                 base_url: Optional[str] = None):
         self.cs = chat_service
         self.owner_id = int(owner_id)
         self.bot_token = bot_token
+        # Bot API kökü; None → api.telegram.org. Offline testte telegram_fake_api.FakeBotApi.base_url
+        self.base_url = base_url
         self.forum_chat_id = int(forum_chat_id) if forum_chat_id else None
         self.current_target_key: Optional[str] = None
         self.app = None
@@ -37,21 +42,24 @@ class TelegramBridge:
 
     def _load_topics(self) -> Dict[str, int]:
         try:
-            with open(self.topics_db, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.topics_db, 'rb') as f:
+                return json_codec.loads(f.read())
         except Exception:
             return {}
 
     def _save_topics(self):
         try:
-            with open(self.topics_db, 'w', encoding='utf-8') as f:
-                json.dump(self.topics, f, ensure_ascii=False, indent=2)
+            with open(self.topics_db, 'wb') as f:
+                f.write(json_codec.dumps(self.topics))
             self._rebuild_reverse_index()
         except Exception:
             pass
 
     def _build(self):
-        self.app = ApplicationBuilder().token(self.bot_token).build()
+        builder = ApplicationBuilder().token(self.bot_token)
+        if self.base_url:
+            builder = builder.base_url(self.base_url)
+        self.app = builder.build()
         self.app.add_handler(CommandHandler("start", self._cmd_start))
         self.app.add_handler(CommandHandler(["to", "who", "friends"], self._cmd_router))
         self.app.add_handler(CallbackQueryHandler(self._on_select_friend, pattern=r"^to:"))
@@ -115,17 +123,16 @@ class TelegramBridge:
             name = parts[1].strip()
 
             f = None
-            for fr in self.cs.list_friends():
-                dn = fr.get('name') or fr.get('gameName') or fr.get('displayName') or ''
-                if dn.lower() == name.lower(): f = fr; break
+            friends = self.cs.friends()
+            for fr in friends:
+                if fr.name.lower() == name.lower(): f = fr; break
             if not f:
-                for fr in self.cs.list_friends():
-                    dn = fr.get('name') or fr.get('gameName') or fr.get('displayName') or ''
-                    if dn.lower().startswith(name.lower()): f = fr; break
+                for fr in friends:
+                    if fr.name.lower().startswith(name.lower()): f = fr; break
             if not f:
                 await update.message.reply_text("Arkadaş bulunamadı"); return
 
-            key = (f.get('pid') or '').split('@',1)[0] or (f.get('puuid') or '')
+            key = f.key
             if not key:
                 await update.message.reply_text("Arkadaş anahtarı yok"); return
 
@@ -134,13 +141,13 @@ class TelegramBridge:
             return
 
         if cmd == "/friends":
-            friends = self.cs.list_friends_online()
+            friends = [f for f in self.cs.friends() if f.is_online]
             if not friends:
                 await update.message.reply_text("Şu an online arkadaş yok."); return
             kb, row = [], []
             for fr in friends:
-                dn = self.cs.friend_display_label(fr)
-                key = (fr.get('pid') or '').split('@',1)[0] or (fr.get('puuid') or '')
+                dn = fr.label
+                key = fr.key
                 if not key: continue
                 row.append(InlineKeyboardButton(dn[:32], callback_data=f"to:{key}"))
                 if len(row)==2: kb.append(row); row=[]
@@ -212,14 +219,28 @@ class TelegramBridge:
             log_once("TG", "loop not ready; dropping DM"); return
         asyncio.run_coroutine_threadsafe(_send(), self._loop)
 
+    def notify(self, text: str):
+        """Sahibine düz bilgi mesajı (presence olayları vb.)."""
+        async def _send():
+            await self.app.bot.send_message(chat_id=self.owner_id, text=text)
+        if not (self._loop and self.app):
+            log_once("TG", "loop not ready; dropping notice"); return
+        asyncio.run_coroutine_threadsafe(_send(), self._loop)
+
     def request_start_confirmation(
         self,
         request_id: str,
         requester: str,
         availability: str,
         callback: Callable[[bool], None],
+        on_send_error: Optional[Callable[[Exception], None]] = None,
     ) -> bool:
-        """Telegram üzerinden BASLAT isteği için onay ister."""
+        """Telegram üzerinden BASLAT isteği için onay ister.
+
+        Bloklamaz: mesaj bot loop'una kuyruklanır ve hemen True döner. Gönderim
+        sonradan başarısız olursa callback kaydı silinir ve on_send_error(exc) çağrılır.
+        Loop hazır değilse False döner (hiçbir şey kaydedilmez).
+        """
 
         if not (self._loop and self.app):
             log_once("TG", "loop not ready; BASLAT isteği gönderilemedi")
@@ -228,6 +249,7 @@ class TelegramBridge:
         with self._start_callbacks_lock:
             self._start_callbacks[request_id] = callback
         avail_txt = availability.upper() if availability else "bilinmiyor"
+        parent = current()   # gönderim bot loop'unda çalışır; trace bağlamını taşı
 
         async def _send():
             text = (
@@ -239,14 +261,40 @@ class TelegramBridge:
                     InlineKeyboardButton("❌ Reddet", callback_data=f"start:{request_id}:no"),
                 ]
             ])
-            await self.app.bot.send_message(chat_id=self.owner_id, text=text, reply_markup=kb)
+            with attach(parent), span("tg.send_message", kind="start_confirm"):
+                await self.app.bot.send_message(chat_id=self.owner_id, text=text, reply_markup=kb)
 
-        fut = asyncio.run_coroutine_threadsafe(_send(), self._loop)
-        try:
-            fut.result(timeout=5)
-            return True
-        except Exception as exc:
-            log_once("TG", f"start request send err: {exc}")
+        def _done(fut):
+            # bot loop thread'inde çalışır: burada bloklayan iş yapma
+            if fut.cancelled():
+                exc: BaseException = concurrent.futures.CancelledError("gönderim iptal edildi")
+            else:
+                exc = fut.exception()
+                if exc is None:
+                    return
+            log_once("TG", f"start request send err: {exc!r}")
             with self._start_callbacks_lock:
                 self._start_callbacks.pop(request_id, None)
-            return False
+            if not on_send_error:
+                return
+
+            def _fire():
+                try:
+                    on_send_error(exc)
+                except Exception as cb_exc:
+                    log_once("TG", f"start send-error cb err: {cb_exc}")
+
+            # on_send_error yedek yola (ör. LCU'ya matchmaking isteği) düşebilir; loop'u bekletmesin
+            threading.Thread(target=_fire, daemon=True).start()
+
+        asyncio.run_coroutine_threadsafe(_send(), self._loop).add_done_callback(_done)
+        return True
+
+    def cancel_start_confirmation(self, request_id: str) -> bool:
+        """Bekleyen BASLAT onayını düşürür (TTL doldu vb.). Kayıt varsa True döner."""
+        with self._start_callbacks_lock:
+            return self._start_callbacks.pop(request_id, None) is not None
+
+    def pending_start_confirmations(self) -> int:
+        with self._start_callbacks_lock:
+            return len(self._start_callbacks)
@@ -0,0 +1,301 @@
+"""Yerel sahte Telegram Bot API sunucusu (offline köprü testleri ve benchmark için).
+
+TelegramBridge'in kullandığı uç noktaları taklit eder: getMe, getUpdates (long-poll),
+sendMessage, answerCallbackQuery ve forum topic çağrıları. Test kodu update / callback
+query enjekte edebilir ve botun gönderdiği mesajları bekleyebilir.
+
+Kullanım:
+    api = FakeBotApi().start()
+    tb = TelegramBridge(cs, owner_id=1, bot_token="123:fake", base_url=api.base_url)
+    ...
+    api.inject_text(1, "/friends")
+    msg = api.wait_for_message(lambda m: "Hedef" in m["text"])
+    api.stop()
+"""
+from __future__ import annotations
+import json, threading, time, itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, List, Callable, Any
+from urllib.parse import parse_qs
+
+# Form-encoded isteklerde JSON olarak çözülmesi gereken alanlar (PTB bunları json.dumps ile yollar)
+_JSON_FIELDS = {
+    "chat_id", "message_thread_id", "reply_markup", "offset", "limit", "timeout",
+    "allowed_updates", "show_alert", "cache_time", "icon_color", "disable_notification",
+    "drop_pending_updates", "entities", "reply_to_message_id",
+}
+
+_BOT_USER = {
+    "id": 424242,
+    "is_bot": True,
+    "first_name": "FakeBot",
+    "username": "fake_bot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": False,
+}
+
+
+class FakeBotApi:
+    """Thread-safe, bellek içi Bot API taklidi."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._cond = threading.Condition()
+        self._updates: List[dict] = []
+        self._update_seq = itertools.count(1)
+        self._message_seq = itertools.count(1)
+        self._callback_seq = itertools.count(1)
+        self._topic_seq = itertools.count(100)
+        self.sent_messages: List[dict] = []
+        self.answered_callbacks: List[dict] = []
+        self.topics: Dict[int, dict] = {}
+        self.calls: Dict[str, int] = {}
+
+    # ---- yaşam döngüsü ----
+    @property
+    def base_url(self) -> str:
+        """ApplicationBuilder.base_url için kök (token sona eklenir)."""
+        return f"http://{self.host}:{self.port}/bot"
+
+    def start(self) -> "FakeBotApi":
+        api = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                self._dispatch()
+
+            def _dispatch(self):
+                method = self.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                params = _parse_params(self.headers.get("Content-Type") or "", raw)
+                result = api._handle(method, params)
+                body = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            with self._cond:
+                self._cond.notify_all()
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---- senaryo (test) API'si ----
+    def _user(self, user_id: int) -> dict:
+        return {"id": int(user_id), "is_bot": False, "first_name": f"user{user_id}"}
+
+    def _push_update(self, payload: dict) -> int:
+        with self._cond:
+            uid = next(self._update_seq)
+            payload["update_id"] = uid
+            self._updates.append(payload)
+            self._cond.notify_all()
+        return uid
+
+    def inject_text(self, user_id: int, text: str, chat_id: Optional[int] = None,
+                    thread_id: Optional[int] = None) -> int:
+        """Kullanıcıdan bota metin mesajı gelmiş gibi update kuyruğa ekler."""
+        chat_id = int(chat_id if chat_id is not None else user_id)
+        msg = {
+            "message_id": next(self._message_seq),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id == int(user_id) else "supergroup"},
+            "from": self._user(user_id),
+            "text": text,
+        }
+        if text.startswith("/"):
+            cmd_len = len(text.split(" ", 1)[0])
+            msg["entities"] = [{"type": "bot_command", "offset": 0, "length": cmd_len}]
+        if thread_id is not None:
+            msg["message_thread_id"] = int(thread_id)
+            msg["is_topic_message"] = True
+        return self._push_update({"message": msg})
+
+    def inject_callback(self, user_id: int, data: str, message: Optional[dict] = None) -> str:
+        """Inline butona basılmış gibi callback_query update'i ekler. Query id döner."""
+        qid = str(next(self._callback_seq))
+        if message is None:
+            message = {
+                "message_id": next(self._message_seq),
+                "date": int(time.time()),
+                "chat": {"id": int(user_id), "type": "private"},
+                "from": _BOT_USER,
+                "text": "",
+            }
+        self._push_update({"callback_query": {
+            "id": qid,
+            "from": self._user(user_id),
+            "chat_instance": "fake",
+            "data": data,
+            "message": message,
+        }})
+        return qid
+
+    def press_button(self, user_id: int, message: dict, callback_data: str) -> str:
+        """Botun gönderdiği bir mesajdaki butona basar (callback_data birebir eşleşmeli)."""
+        rows = ((message.get("reply_markup") or {}).get("inline_keyboard") or [])
+        if not any(b.get("callback_data") == callback_data for row in rows for b in row):
+            raise KeyError(f"buton yok: {callback_data}")
+        clean = {k: v for k, v in message.items() if not k.startswith("_")}
+        return self.inject_callback(user_id, callback_data, message=clean)
+
+    def wait_for_message(self, predicate: Callable[[dict], bool] = lambda m: True,
+                         timeout: float = 5.0, start: int = 0) -> Optional[dict]:
+        """sent_messages[start:] içinde predicate'e uyan ilk mesajı bekler."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for m in self.sent_messages[start:]:
+                    if predicate(m):
+                        return m
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                self._cond.wait(left)
+
+    def wait_for_count(self, n: int, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self.sent_messages) < n:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            return True
+
+    # ---- Bot API metotları ----
+    def _handle(self, method: str, p: Dict[str, Any]) -> Any:
+        with self._cond:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        handler = getattr(self, f"_m_{method.lower()}", None)
+        return handler(p) if handler else True
+
+    def _m_getme(self, p):
+        return _BOT_USER
+
+    def _m_getupdates(self, p):
+        offset = int(p.get("offset") or 0)
+        limit = int(p.get("limit") or 100)
+        timeout = float(p.get("timeout") or 0)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if offset:
+                self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            while not self._updates and self._server is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return list(self._updates[:limit])
+
+    def _m_sendmessage(self, p):
+        chat_id = int(p.get("chat_id") or 0)
+        msg = {
+            "message_id": next(self._message_seq),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+            "from": _BOT_USER,
+            "text": str(p.get("text") or ""),
+        }
+        if p.get("message_thread_id") is not None:
+            msg["message_thread_id"] = int(p["message_thread_id"])
+        if p.get("reply_markup"):
+            msg["reply_markup"] = p["reply_markup"]
+        with self._cond:
+            rec = dict(msg, _recv_ts=time.perf_counter())
+            self.sent_messages.append(rec)
+            self._cond.notify_all()
+        return msg
+
+    def _m_answercallbackquery(self, p):
+        with self._cond:
+            self.answered_callbacks.append(dict(p))
+            self._cond.notify_all()
+        return True
+
+    def _m_createforumtopic(self, p):
+        tid = next(self._topic_seq)
+        topic = {"message_thread_id": tid, "name": str(p.get("name") or ""), "icon_color": int(p.get("icon_color") or 7322096)}
+        with self._cond:
+            self.topics[tid] = dict(topic, chat_id=int(p.get("chat_id") or 0))
+        return topic
+
+    def _m_editforumtopic(self, p):
+        tid = int(p.get("message_thread_id") or 0)
+        with self._cond:
+            if tid in self.topics and p.get("name"):
+                self.topics[tid]["name"] = str(p["name"])
+        return True
+
+    def _m_deleteforumtopic(self, p):
+        with self._cond:
+            self.topics.pop(int(p.get("message_thread_id") or 0), None)
+        return True
+
+
+def _parse_params(content_type: str, raw: bytes) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    ct = content_type.lower()
+    if "application/json" in ct:
+        try:
+            return json.loads(raw) or {}
+        except Exception:
+            return {}
+    if "multipart/form-data" in ct:
+        return _parse_multipart(content_type, raw)
+    out: Dict[str, Any] = {}
+    for k, vals in parse_qs(raw.decode("utf-8"), keep_blank_values=True).items():
+        out[k] = _coerce(k, vals[-1])
+    return out
+
+
+def _parse_multipart(content_type: str, raw: bytes) -> Dict[str, Any]:
+    boundary = content_type.split("boundary=", 1)[-1].strip('"').encode()
+    out: Dict[str, Any] = {}
+    for part in raw.split(b"--" + boundary):
+        head, sep, body = part.partition(b"\r\n\r\n")
+        if not sep or b'name="' not in head:
+            continue
+        name = head.split(b'name="', 1)[1].split(b'"', 1)[0].decode()
+        out[name] = _coerce(name, body.rstrip(b"\r\n").decode("utf-8", "replace"))
+    return out
+
+
+def _coerce(key: str, val: str) -> Any:
+    if key in _JSON_FIELDS:
+        try:
+            return json.loads(val)
+        except Exception:
+            return val
+    return val
+
+
+if __name__ == "__main__":
+    api = FakeBotApi(port=8081).start()
+    print(f"Fake Bot API: {api.base_url}<token>/  (Ctrl+C ile çık)")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        api.stop()
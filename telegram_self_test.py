@@ -2,6 +2,7 @@
 
 Kullanım:
     TELEGRAM_BOT_TOKEN=... TELEGRAM_OWNER_ID=... python telegram_self_test.py --requester Summoo
+    python telegram_self_test.py --fake --approve   # ağ/token olmadan, yerel sahte Bot API ile
 """
 from __future__ import annotations
 import argparse
@@ -10,23 +11,43 @@ import time
 import uuid
 from typing import Optional, List, Dict, Any
 
+from models import Friend
 from telegram_bridge import TelegramBridge
+from telegram_fake_api import FakeBotApi
+
+FAKE_TOKEN = "123456:fake-token"
+FAKE_OWNER_ID = 1001
+# --fake: /friends ve /to denenebilsin diye örnek arkadaş listesi (LCU /lol-chat/v1/friends biçimi)
+FAKE_FRIENDS = [
+    {"pid": "aaaa-1111@eu1.pvp.net", "puuid": "aaaa-1111", "gameName": "Summoo", "availability": "chat"},
+    {"pid": "bbbb-2222@eu1.pvp.net", "puuid": "bbbb-2222", "gameName": "Teemo Enjoyer", "availability": "away"},
+    {"pid": "cccc-3333@eu1.pvp.net", "puuid": "cccc-3333", "gameName": "Offline Friend", "availability": "offline"},
+]
 
 
 class DummyChatService:
     """TelegramBridge'in ihtiyaç duyduğu temel metotları sağlayan hafif sahte servis."""
 
     def friend_display_name(self, key: Optional[str]) -> str:
+        for f in self.friends():
+            if key and f.matches_key(key):
+                return f.name or key
         return key or "?"
 
     def friend_display_label(self, friend: Dict[str, Any]) -> str:
         return friend.get("name") or friend.get("gameName") or friend.get("displayName") or "?"
 
+    def __init__(self, friends: Optional[List[Dict[str, Any]]] = None):
+        self._friends = list(friends or [])
+
+    def friends(self) -> List[Friend]:
+        return [Friend.from_raw(f) for f in self._friends]
+
     def list_friends(self) -> List[Dict[str, Any]]:
-        return []
+        return list(self._friends)
 
     def list_friends_online(self) -> List[Dict[str, Any]]:
-        return []
+        return [f.raw for f in self.friends() if f.is_online]
 
     def dm_send(self, *_, **__) -> bool:
         return False
@@ -50,6 +71,14 @@ def parse_args() -> argparse.Namespace:
         default=90,
         help="Onay/ret sonucunu beklerken saniye cinsinden bloklama süresi",
     )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Gerçek Telegram yerine yerel sahte Bot API sunucusunu kullan",
+    )
+    decision = parser.add_mutually_exclusive_group()
+    decision.add_argument("--approve", action="store_true", help="--fake ile: onay butonuna otomatik bas")
+    decision.add_argument("--deny", action="store_true", help="--fake ile: ret butonuna otomatik bas")
     return parser.parse_args()
 
 
@@ -58,16 +87,22 @@ def main():
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     owner_id = os.getenv("TELEGRAM_OWNER_ID")
     forum_id = os.getenv("TELEGRAM_FORUM_ID")
+    fake: Optional[FakeBotApi] = None
+    if args.fake:
+        fake = FakeBotApi().start()
+        bot_token, owner_id = FAKE_TOKEN, str(FAKE_OWNER_ID)
+        print(f"Sahte Bot API: {fake.base_url}")
 
     if not bot_token or not owner_id:
         raise SystemExit("TELEGRAM_BOT_TOKEN ve TELEGRAM_OWNER_ID olmadan test gönderilemez.")
 
-    dummy = DummyChatService()
+    dummy = DummyChatService(FAKE_FRIENDS if fake else None)
     bridge = TelegramBridge(
         dummy,
         owner_id=int(owner_id),
         bot_token=bot_token,
         forum_chat_id=int(forum_id) if forum_id else None,
+        base_url=fake.base_url if fake else None,
     )
     bridge.start_in_thread()
     if not bridge.wait_until_ready(10.0):
@@ -92,6 +127,12 @@ def main():
     if not ok:
         raise SystemExit("Telegram'a istek gönderilemedi. Bot token / owner id kontrol et.")
 
+    if fake and (args.approve or args.deny):
+        prompt = fake.wait_for_message(lambda m: bool(m.get("reply_markup")), timeout=10.0)
+        if not prompt:
+            raise SystemExit("Sahte API'ye onay mesajı ulaşmadı.")
+        fake.press_button(FAKE_OWNER_ID, prompt, f"start:{req_id}:{'ok' if args.approve else 'no'}")
+
     timeout = time.time() + max(args.wait, 5)
     print("Yanıt bekleniyor… Telegram'da gelen bildirimi onay/ret et.")
     try:
@@ -104,6 +145,8 @@ def main():
         print("Belirtilen sürede yanıt alınamadı (timeout).")
     else:
         print("Test tamamlandı. Sonuç terminalde görülebilir.")
+    if fake:
+        fake.stop()
 
 
 if __name__ == "__main__":
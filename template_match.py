@@ -0,0 +1,280 @@
+"""Önbellekli, pencereye sınırlı şablon eşleme (ui_clicker için).
+
+pyautogui.locateCenterOnScreen her çağrıda şablon PNG'sini yeniden çözer ve tüm
+masaüstünü (çoklu monitörde milyonlarca piksel) tarar. TemplateEngine:
+
+  * şablonları bir kez çözer, griye çevirir; ölçek başına yeniden boyutlanmış hali,
+    sıfır-ortalamalı hali ve FFT'si (arama alanı boyutuna göre) önbellekte tutulur,
+  * yalnızca verilen bölgeyi (League penceresinin dikdörtgeni) yakalatır; son isabetin
+    çevresi önce küçük bir ROI olarak denenir (buton yerinden oynamadıysa tam arama yok),
+  * normalize çapraz korelasyonu (NCC) NumPy ile hesaplar: pay FFT ile, pencere
+    ortalaması/varyansı integral görüntülerle (Lewis, "Fast Normalized Cross-Correlation"),
+  * önce 2x küçültülmüş görüntüde kaba arama, sonra adayın çevresinde tam çözünürlükte
+    doğrulama yapar; birkaç ölçek (pencere genişliğinden beklenen ölçek ± %10) denenir.
+
+    eng = TemplateEngine({"accept": "assets/accept_button.png"}, threshold=0.86)
+    hit = eng.find("accept", grab, (left, top, width, height))   # grab(region) → gri ndarray
+    if hit: click(hit.x, hit.y)
+
+Skorlar pyautogui/OpenCV'nin TM_CCOEFF_NORMED'i ile aynı ölçektedir (-1..1).
+"""
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+Region = Tuple[int, int, int, int]            # (left, top, width, height)
+Grab = Callable[[Region], np.ndarray]         # bölge → 2B float32 gri görüntü
+
+# ui_clicker'ın kullandığı varsayılanlar (bench_detector.py aynı değerlerle ölçer)
+DEFAULT_THRESHOLD = 0.86
+ASSETS = {"accept": "assets/accept_button.png", "find": "assets/ara_button.png"}
+
+REF_WIDTH = 1280        # şablonların yakalandığı varsayılan istemci genişliği (CLICKER_REF_WIDTH ile değişir)
+SCALE_STEPS = (1.0, 0.9, 1.1)
+COARSE = 2              # kaba arama küçültme çarpanı
+COARSE_SLACK = 0.15     # kaba skor eşiğin bu kadar altındaysa aday yine doğrulanır
+MIN_COARSE_SIDE = 12    # küçültülmüş şablon bundan küçükse kaba aşama atlanır
+ROI_PAD = 0.5           # son isabet ROI'si: şablon boyutunun bu oranı kadar kenar payı
+FFT_CACHE = 32
+MIN_STD = 0.5           # gri seviye; bundan düz pencereler (tek renk alanlar) atlanır
+
+
+class Hit(NamedTuple):
+    x: int          # ekran koordinatı (merkez)
+    y: int
+    score: float
+    scale: float
+    roi: bool       # son isabet bölgesinde mi bulundu
+
+
+def load_gray(path: str) -> np.ndarray:
+    from PIL import Image
+    with Image.open(path) as im:
+        return np.asarray(im.convert("L"), dtype=np.float32)
+
+
+def _resize(img: np.ndarray, scale: float) -> np.ndarray:
+    if scale == 1.0:
+        return img
+    from PIL import Image
+    h, w = img.shape
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return np.asarray(Image.fromarray(img).resize(size, Image.BILINEAR), dtype=np.float32)
+
+
+def downsample(img: np.ndarray, k: int) -> np.ndarray:
+    """k×k blok ortalaması (kenarda artan satır/sütunlar atılır)."""
+    h, w = (img.shape[0] // k) * k, (img.shape[1] // k) * k
+    return img[:h, :w].reshape(h // k, k, w // k, k).mean(axis=(1, 3), dtype=np.float32)
+
+
+def _window_sums(img: np.ndarray, h: int, w: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Her (h, w) penceresi için Σx ve Σx² (integral görüntülerle, O(HW))."""
+    f = img.astype(np.float64)
+    ii = np.zeros((f.shape[0] + 1, f.shape[1] + 1))
+    ii2 = np.zeros_like(ii)
+    np.cumsum(np.cumsum(f, 0), 1, out=ii[1:, 1:])
+    np.cumsum(np.cumsum(f * f, 0), 1, out=ii2[1:, 1:])
+
+    def box(t):
+        return t[h:, w:] - t[:-h, w:] - t[h:, :-w] + t[:-h, :-w]
+    return box(ii), box(ii2)
+
+
+class _Scaled:
+    """Bir şablonun tek ölçekteki hali: sıfır-ortalamalı pikseller, normu ve FFT önbelleği."""
+    __slots__ = ("scale", "t", "tnorm", "h", "w", "ffts")
+
+    def __init__(self, img: np.ndarray, scale: float):
+        self.scale = scale
+        t = img - img.mean()
+        self.t = t.astype(np.float32)
+        self.tnorm = float(np.sqrt((t.astype(np.float64) ** 2).sum()))
+        self.h, self.w = t.shape
+        self.ffts: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+
+    def fft_for(self, shape: Tuple[int, int]) -> np.ndarray:
+        f = self.ffts.get(shape)
+        if f is None:
+            f = self.ffts[shape] = np.conj(np.fft.rfft2(self.t, shape))
+            while len(self.ffts) > FFT_CACHE:
+                self.ffts.popitem(last=False)
+        else:
+            self.ffts.move_to_end(shape)
+        return f
+
+
+def ncc_map(img: np.ndarray, tpl: _Scaled) -> np.ndarray:
+    """Geçerli (valid) bölge NCC haritası: (H-h+1, W-w+1); düz (varyanssız) pencereler 0."""
+    H, W = img.shape
+    h, w = tpl.h, tpl.w
+    if H < h or W < w or tpl.tnorm == 0.0:
+        return np.zeros((0, 0), dtype=np.float32)
+    num = np.fft.irfft2(np.fft.rfft2(img, (H, W)) * tpl.fft_for((H, W)), (H, W))[:H - h + 1, :W - w + 1]
+    s1, s2 = _window_sums(img, h, w)
+    n = h * w
+    var = s2 - s1 * s1 / n
+    # integral görüntü farklarındaki yuvarlama hatası düz pencerelerde sahte dev skor üretir:
+    # std < MIN_STD gri seviye olan pencereler eşleşme sayılmaz
+    ok = var > n * MIN_STD * MIN_STD
+    out = np.zeros_like(num)
+    out[ok] = num[ok] / (np.sqrt(var[ok]) * tpl.tnorm)
+    return np.clip(out, -1.0, 1.0, out=out)
+
+
+def best(img: np.ndarray, tpl: _Scaled) -> Tuple[float, int, int]:
+    """(skor, y, x) — en iyi eşleşmenin sol üst köşesi."""
+    m = ncc_map(img, tpl)
+    if m.size == 0:
+        return -1.0, 0, 0
+    i = int(np.argmax(m))
+    y, x = divmod(i, m.shape[1])
+    return float(m[y, x]), y, x
+
+
+class Template:
+    """Bir kez çözülmüş gri şablon + ölçek başına (tam ve kaba çözünürlük) önbellek."""
+
+    def __init__(self, name: str, img: np.ndarray):
+        self.name = name
+        self.img = img
+        self._scaled: Dict[Tuple[float, int], _Scaled] = {}
+
+    @classmethod
+    def load(cls, name: str, path: str) -> "Template":
+        return cls(name, load_gray(path))
+
+    def at(self, scale: float, coarse: int = 1) -> _Scaled:
+        key = (round(scale, 3), coarse)
+        s = self._scaled.get(key)
+        if s is None:
+            img = _resize(self.img, scale)
+            if coarse > 1:
+                img = downsample(img, coarse)
+            s = self._scaled[key] = _Scaled(img, scale)
+        return s
+
+
+class TemplateEngine:
+    def __init__(self, templates: Dict[str, str], threshold: float = DEFAULT_THRESHOLD,
+                 scale_steps: Iterable[float] = SCALE_STEPS, ref_width: int = REF_WIDTH):
+        self.templates = {name: Template.load(name, path) for name, path in templates.items()}
+        self.threshold = threshold
+        self.scale_steps = tuple(scale_steps)
+        self.ref_width = ref_width
+        self._last: Dict[str, Tuple[int, int, float]] = {}   # ad → (ekran x, y sol üst, ölçek)
+        self.stats = {"calls": 0, "roi_hits": 0, "full": 0, "hits": 0, "grab_ms": 0.0, "match_ms": 0.0}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], **kw) -> "TemplateEngine":
+        eng = cls({}, **kw)
+        eng.templates = {name: Template(name, img.astype(np.float32)) for name, img in arrays.items()}
+        return eng
+
+    def scales_for(self, width: int) -> Tuple[float, ...]:
+        """Pencere genişliğine göre ölçekler; şablon başka çözünürlükte yakalanmış olabilir diye 1.0 hep denenir."""
+        base = width / self.ref_width if width and self.ref_width else 1.0
+        scales = [round(base * k, 3) for k in self.scale_steps]
+        if 1.0 not in scales:
+            scales.append(1.0)
+        return tuple(scales)
+
+    def forget(self, name: Optional[str] = None) -> None:
+        if name is None:
+            self._last.clear()
+        else:
+            self._last.pop(name, None)
+
+    # ---------- arama ----------
+    def find(self, name: str, grab: Grab, region: Region) -> Optional[Hit]:
+        """region (genelde League penceresi) içinde şablonu arar; bulunursa ekran merkezini döner."""
+        self.stats["calls"] += 1
+        tpl = self.templates[name]
+        last = self._last.get(name)
+        if last is not None:
+            hit = self._find_roi(tpl, grab, region, last)
+            if hit is not None:
+                self.stats["roi_hits"] += 1
+                self.stats["hits"] += 1
+                return hit
+        self.stats["full"] += 1
+        t0 = time.perf_counter()
+        frame = grab(region)
+        self.stats["grab_ms"] += (time.perf_counter() - t0) * 1000.0
+        hit = self.locate(name, frame, origin=region[:2], width=region[2])
+        if hit is None:
+            self._last.pop(name, None)
+        else:
+            self.stats["hits"] += 1
+        return hit
+
+    def _find_roi(self, tpl: Template, grab: Grab, region: Region, last: Tuple[int, int, float]) -> Optional[Hit]:
+        lx, ly, scale = last
+        st = tpl.at(scale)
+        px, py = int(st.w * ROI_PAD) + 2, int(st.h * ROI_PAD) + 2
+        left, top = max(region[0], lx - px), max(region[1], ly - py)
+        right = min(region[0] + region[2], lx + st.w + px)
+        bottom = min(region[1] + region[3], ly + st.h + py)
+        if right - left < st.w or bottom - top < st.h:
+            return None
+        t0 = time.perf_counter()
+        frame = grab((left, top, right - left, bottom - top))
+        t1 = time.perf_counter()
+        score, y, x = best(frame, st)
+        self.stats["grab_ms"] += (t1 - t0) * 1000.0
+        self.stats["match_ms"] += (time.perf_counter() - t1) * 1000.0
+        if score < self.threshold:
+            return None
+        return self._hit(tpl.name, left + x, top + y, st, score, roi=True)
+
+    def locate(self, name: str, frame: np.ndarray, origin: Tuple[int, int] = (0, 0),
+               width: int = 0, threshold: Optional[float] = None) -> Optional[Hit]:
+        """Yakalanmış bir karede (gri ndarray) arar; origin karenin ekran konumu.
+
+        threshold verilirse bu çağrı için motorun eşiği yerine kullanılır (eşik taraması).
+        """
+        t0 = time.perf_counter()
+        thr = self.threshold if threshold is None else threshold
+        try:
+            return self._locate(self.templates[name], frame, origin, width or frame.shape[1], thr)
+        finally:
+            self.stats["match_ms"] += (time.perf_counter() - t0) * 1000.0
+
+    def _locate(self, tpl: Template, frame: np.ndarray, origin: Tuple[int, int], width: int,
+                thr: float) -> Optional[Hit]:
+        small = None
+        best_hit: Optional[Tuple[float, int, int, _Scaled]] = None
+        for scale in self.scales_for(width):
+            st = tpl.at(scale)
+            if st.h > frame.shape[0] or st.w > frame.shape[1]:
+                continue
+            cs = tpl.at(scale, COARSE)
+            if min(cs.h, cs.w) >= MIN_COARSE_SIDE:
+                if small is None:
+                    small = downsample(frame, COARSE)
+                score, cy, cx = best(small, cs)
+                if score < thr - COARSE_SLACK:
+                    continue
+                # adayı tam çözünürlükte, küçük bir pencerede doğrula
+                pad = COARSE * 2
+                y0, x0 = max(0, cy * COARSE - pad), max(0, cx * COARSE - pad)
+                sub = frame[y0:y0 + st.h + 2 * pad + COARSE, x0:x0 + st.w + 2 * pad + COARSE]
+                score, y, x = best(sub, st)
+                y, x = y + y0, x + x0
+            else:
+                score, y, x = best(frame, st)
+            if best_hit is None or score > best_hit[0]:
+                best_hit = (score, y, x, st)
+            if score >= thr:
+                break   # beklenen ölçekte bulundu; diğer ölçekleri deneme
+        if best_hit is None or best_hit[0] < thr:
+            return None
+        score, y, x, st = best_hit
+        return self._hit(tpl.name, origin[0] + x, origin[1] + y, st, score, roi=False)
+
+    def _hit(self, name: str, left: int, top: int, st: _Scaled, score: float, roi: bool) -> Hit:
+        self._last[name] = (left, top, st.scale)
+        return Hit(left + st.w // 2, top + st.h // 2, score, st.scale, roi)
@@ -0,0 +1,333 @@
+"""Hafif uçtan uca izleme (trace/span): sohbet mesajı → LCU çağrıları → Telegram → yanıt.
+
+Bir kök span (ör. lobi sohbetinde BASLAT) yeni bir trace açar; altında açılan her span
+ve her LCU HTTP isteği (TracedHttp) aynı trace'e bağlanır. Bağlam contextvars ile taşınır;
+thread / callback / asyncio sınırlarında elle aktarılır:
+
+    with root_span("grp.command", sender=frm):     # trace başlat
+        with span("cmd.baslat"):                   # alt span
+            cs.is_party_leader()                   # → "GET /lol-lobby/v2/lobby" span'i
+            cb = bind(on_done)                     # başka thread'de çalışsa da bu span'in altında
+    ctx = current()                                # sakla ...
+    with attach(ctx), span("start.finalize"): ...  # ... sonra (ör. TTL dolunca) aynı trace'e ekle
+
+Aktif trace yokken span()/TracedHttp hiçbir şey kaydetmez (tek ContextVar okuması).
+Alt span'i olmayan kökler (komut içermeyen sıradan sohbet) atılır. Tutulan trace'ler
+bellekte son KEEP tanesi olarak saklanır (/traces en yavaşları gösterir) ve
+configure(export_path=...) verilmişse span başına bir JSON satırı olarak dosyaya eklenir;
+kök kapandıktan sonra biten span'ler (Telegram onayı gibi) da aynı trace id ile eklenir.
+"""
+from __future__ import annotations
+import contextvars, functools, json, os, threading, time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from utils import log_once
+
+KEEP = 200   # bellekte tutulan son trace sayısı
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("trace_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent", "name", "ts", "t0", "dur", "attrs", "error", "thread")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional[str], attrs: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(4)
+        self.parent = parent
+        self.name = name
+        self.ts = time.time()
+        self.t0 = time.perf_counter()
+        self.dur: Optional[float] = None
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        d = {"trace": self.trace.trace_id, "span": self.span_id, "parent": self.parent, "name": self.name,
+             "ts": round(self.ts, 6), "dur_ms": round((self.dur or 0.0) * 1000.0, 3), "thread": self.thread}
+        if self.attrs:
+            d["attrs"] = self.attrs
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+class Trace:
+    __slots__ = ("trace_id", "root", "spans", "closed", "kept")
+
+    def __init__(self):
+        self.trace_id = _new_id(8)
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []      # bitiş sırasıyla
+        self.closed = False              # kök bitti
+        self.kept = False
+
+    @property
+    def start(self) -> float:
+        return self.root.ts if self.root else 0.0
+
+    @property
+    def duration(self) -> float:
+        """Kökün başlangıcından en son biten span'e kadar (sn); geç gelen span'ler dahil."""
+        if not self.root:
+            return 0.0
+        base = self.root.t0
+        return max((s.t0 + (s.dur or 0.0) - base for s in self.spans), default=0.0)
+
+
+class Tracer:
+    def __init__(self, keep: int = KEEP):
+        self._lock = threading.Lock()
+        self.recent: Deque[Trace] = deque(maxlen=keep)
+        self.export_path = ""
+        self._fh = None
+        self.dropped = 0    # alt span'i olmadığı için atılan kökler
+
+    def configure(self, export_path: str = "", keep: Optional[int] = None) -> None:
+        with self._lock:
+            if keep:
+                self.recent = deque(self.recent, maxlen=keep)
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+            self.export_path = export_path
+            if export_path:
+                d = os.path.dirname(export_path)
+                if d:
+                    os.makedirs(d, exist_ok=True)
+                self._fh = open(export_path, "a", encoding="utf-8")
+                log_once("TRACE", f"trace'ler dışa aktarılıyor: {export_path}")
+
+    # ---------- span yaşam döngüsü ----------
+    @contextmanager
+    def root(self, name: str, **attrs: Any):
+        """Yeni trace açar. Zaten bir trace içindeyse sıradan alt span gibi davranır."""
+        if _current.get() is not None:
+            with self.span(name, **attrs) as sp:
+                yield sp
+            return
+        tr = Trace()
+        sp = Span(tr, name, None, attrs)
+        tr.root = sp
+        token = _current.set(sp)
+        try:
+            yield sp
+        except BaseException as e:
+            sp.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            self._end(sp)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any):
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        sp = Span(parent.trace, name, parent.span_id, attrs)
+        token = _current.set(sp)
+        try:
+            yield sp
+        except BaseException as e:
+            sp.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            self._end(sp)
+
+    def record(self, name: str, t0: float, dur: float, error: str = "", **attrs: Any) -> None:
+        """Zaten ölçülmüş bir işlemi (perf_counter başlangıcı + süre) aktif span'in altına ekler."""
+        parent = _current.get()
+        if parent is None:
+            return
+        sp = Span(parent.trace, name, parent.span_id, attrs)
+        sp.ts -= sp.t0 - t0
+        sp.t0 = t0
+        sp.error = error or None
+        self._end(sp, dur)
+
+    def _end(self, sp: Span, dur: Optional[float] = None) -> None:
+        sp.dur = time.perf_counter() - sp.t0 if dur is None else dur
+        tr = sp.trace
+        out: List[Span] = []
+        with self._lock:
+            tr.spans.append(sp)
+            if sp is tr.root:
+                tr.closed = True
+                if len(tr.spans) > 1:
+                    tr.kept = True
+                    self.recent.append(tr)
+                    out = tr.spans
+                else:
+                    self.dropped += 1
+            elif tr.closed and tr.kept:
+                out = [sp]      # kökten sonra biten span (async onay vb.)
+            if out and self._fh:
+                try:
+                    for s in out:
+                        self._fh.write(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n")
+                    self._fh.flush()
+                except Exception as e:
+                    log_once("TRACE", f"yazma hatası: {e}")
+
+    # ---------- sorgular ----------
+    def slowest(self, n: int = 10) -> List[Trace]:
+        with self._lock:
+            traces = list(self.recent)
+        return sorted(traces, key=lambda t: t.duration, reverse=True)[:n]
+
+    def find(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for tr in self.recent:
+                if tr.trace_id.startswith(trace_id):
+                    return tr
+        return None
+
+    def export(self, path: str) -> int:
+        """Bellekteki trace'leri JSONL olarak yazar; yazılan span sayısını döner."""
+        with self._lock:
+            spans = [s for tr in self.recent for s in list(tr.spans)]
+        with open(path, "w", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n")
+        return len(spans)
+
+
+TRACER = Tracer()
+root_span = TRACER.root
+span = TRACER.span
+record = TRACER.record
+
+
+def current() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def attach(parent: Optional[Span]):
+    """Saklanmış bir span'i (current() ile alınmış) bu thread'de aktif yapar; None ise etkisiz."""
+    if parent is None:
+        yield None
+        return
+    token = _current.set(parent)
+    try:
+        yield parent
+    finally:
+        _current.reset(token)
+
+
+def bind(fn: Callable) -> Callable:
+    """fn'i, şu anki span'in altında çalışacak şekilde sarar (thread / callback aktarımı için)."""
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    @functools.wraps(fn)
+    def _bound(*args, **kwargs):
+        with attach(parent):
+            return fn(*args, **kwargs)
+    return _bound
+
+
+class TracedHttp:
+    """requests.Session sarmalayıcısı: aktif trace varken her isteği "METOD /yol" span'i olarak kaydeder."""
+
+    def __init__(self, inner, base: str):
+        self._inner = inner
+        self._base = base
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def request(self, method: str, url: str, **kw):
+        if _current.get() is None:
+            return self._inner.request(method, url, **kw)
+        path = url[len(self._base):] if url.startswith(self._base) else url
+        t0 = time.perf_counter()
+        try:
+            r = self._inner.request(method, url, **kw)
+        except Exception as e:
+            record(f"{method.upper()} {path}", t0, time.perf_counter() - t0, error=type(e).__name__)
+            raise
+        record(f"{method.upper()} {path}", t0, time.perf_counter() - t0, status=r.status_code)
+        return r
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+
+def format_trace(tr: Trace) -> List[str]:
+    """Trace'i girintili span ağacı olarak satırlara döker (ofset + süre)."""
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in sorted(list(tr.spans), key=lambda s: s.t0):
+        children.setdefault(s.parent, []).append(s)
+    base = tr.root.t0 if tr.root else 0.0
+    lines: List[str] = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for s in children.get(parent, ()):
+            extra = " ".join(f"{k}={v}" for k, v in s.attrs.items())
+            err = f" HATA={s.error}" if s.error else ""
+            lines.append(f"{'  ' * depth}+{(s.t0 - base) * 1000:8.1f} ms {(s.dur or 0) * 1000:8.1f} ms  "
+                         f"{s.name}{err}  [{s.thread}] {extra}".rstrip())
+            walk(s.span_id, depth + 1)
+    walk(None, 0)
+    return lines
+
+
+def _main() -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="JSONL trace dosyasından en yavaş trace'ler")
+    ap.add_argument("file")
+    ap.add_argument("-n", type=int, default=10)
+    args = ap.parse_args()
+    by_trace: Dict[str, Trace] = {}
+    with open(args.file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                d = json.loads(line)
+            except ValueError:
+                continue
+            tr = by_trace.get(d["trace"])
+            if tr is None:
+                tr = by_trace[d["trace"]] = Trace()
+                tr.trace_id = d["trace"]
+            sp = Span(tr, d["name"], d.get("parent"), d.get("attrs") or {})
+            sp.span_id, sp.ts, sp.t0 = d["span"], d["ts"], d["ts"]
+            sp.dur, sp.error, sp.thread = d["dur_ms"] / 1000.0, d.get("error"), d.get("thread", "")
+            tr.spans.append(sp)
+            if sp.parent is None:
+                tr.root = sp
+    traces = sorted((t for t in by_trace.values() if t.root), key=lambda t: t.duration, reverse=True)
+    for tr in traces[:args.n]:
+        print(f"{tr.trace_id} {tr.root.name} {tr.duration * 1000:.1f} ms "
+              f"({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tr.start))})")
+        for ln in format_trace(tr):
+            print("  " + ln)
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,45 +1,107 @@
 import time, random
+import numpy as np
 import pyautogui as pag
 import pygetwindow as gw
+from profiler import loop_tick
+from template_match import ASSETS, DEFAULT_THRESHOLD, REF_WIDTH, TemplateEngine
 
-CONFIDENCE = 0.86
-AS_ACCEPT = "assets/accept_button.png"
-AS_FIND = "assets/ara_button.png"
+CONFIDENCE = DEFAULT_THRESHOLD
+AS_ACCEPT = ASSETS["accept"]
+AS_FIND = ASSETS["find"]
 WINDOW_TITLES = ["League of Legends", "Riot Client"]
 
 state = {"active": False, "stop": False, "last_click": 0.0}
 
-def bring_front():
+# Şablonlar bir kez çözülür; arama yalnızca League penceresinde (ve son isabet çevresinde) yapılır
+_ENGINE = None
+
+def engine():
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = TemplateEngine({"accept": AS_ACCEPT, "find": AS_FIND}, threshold=CONFIDENCE, ref_width=REF_WIDTH)
+    return _ENGINE
+
+def league_window():
     for t in WINDOW_TITLES:
         ws = [w for w in gw.getWindowsWithTitle(t) if w.isVisible]
         if ws:
-            w = ws[0]
-            try:
-                if w.isMinimized: w.restore()
-                w.activate(); time.sleep(0.2); return True
-            except Exception:
-                pass
+            return ws[0]
+    return None
+
+def bring_front():
+    w = league_window()
+    if w is not None:
+        try:
+            if w.isMinimized: w.restore()
+            w.activate(); time.sleep(0.2); return True
+        except Exception:
+            pass
     return False
 
-def click_img(path):
+def virtual_screen():
+    """Tüm monitörleri kapsayan sanal masaüstü (left, top, width, height); sol/üst monitörde origin negatiftir."""
+    try:
+        import ctypes
+        metric = ctypes.windll.user32.GetSystemMetrics
+        # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+        width, height = metric(78), metric(79)
+        if width > 0 and height > 0:
+            return (metric(76), metric(77), width, height)
+    except (AttributeError, OSError):
+        pass
+    width, height = pag.size()
+    return (0, 0, width, height)
+
+def grab_gray(region):
+    """Ekranın yalnızca verilen bölgesini yakalar → gri float32 dizi (ikincil monitörler dahil)."""
+    try:
+        from PIL import ImageGrab
+        left, top, width, height = region
+        img = ImageGrab.grab(bbox=(left, top, left + width, top + height), all_screens=True)
+    except (ImportError, TypeError):   # Pillow yok / all_screens desteklemiyor
+        img = pag.screenshot(region=region)
+    return np.asarray(img.convert("L"), dtype=np.float32)
+
+def window_region():
+    w = league_window()
+    if w is None or w.isMinimized:
+        return None
+    # Pencereyi sanal masaüstüyle kırp: maksimize pencerelerde kenarlar birkaç piksel
+    # taşar (left=-8 gibi); sol/üst monitördeki pencerenin koordinatları ise zaten negatiftir
+    vx, vy, vw, vh = virtual_screen()
+    left, top = max(vx, w.left), max(vy, w.top)
+    right, bottom = min(vx + vw, w.left + w.width), min(vy + vh, w.top + w.height)
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right - left, bottom - top)
+
+def click_img(name):
     try:
-        loc = pag.locateCenterOnScreen(path, confidence=CONFIDENCE, grayscale=True)
-        if loc:
-            x = loc.x + random.randint(-2, 2)
-            y = loc.y + random.randint(-2, 2)
+        region = window_region()
+        if region is None:
+            return False
+        hit = engine().find(name, grab_gray, region)
+        if hit:
+            x = hit.x + random.randint(-2, 2)
+            y = hit.y + random.randint(-2, 2)
             pag.moveTo(x, y, duration=random.uniform(0.10, 0.25))
             pag.click(); return True
     except Exception:
         pass
     return False
 
-def clicker_worker():
-    while not state["stop"]:
+def clicker_worker(st=None, ref_width=None):
+    global REF_WIDTH, _ENGINE
+    st = state if st is None else st
+    if ref_width:   # şablonların yakalandığı istemci genişliği (CLICKER_REF_WIDTH)
+        REF_WIDTH, _ENGINE = ref_width, None
+    while not st["stop"]:
+        loop_tick()
         time.sleep(random.uniform(1.1, 2.1))
-        if not state["active"]: continue
+        if not st["active"]: continue
         bring_front()
         now = time.time()
-        if now - state["last_click"] > 3.5 and click_img(AS_ACCEPT):
-            state["last_click"] = now; continue
-        if now - state["last_click"] > 3.5 and click_img(AS_FIND):
-            state["last_click"] = now; continue
+        if now - st["last_click"] > 3.5 and click_img("accept"):
+            st["last_click"] = now; continue
+        if now - st["last_click"] > 3.5 and click_img("find"):
+            st["last_click"] = now; continue
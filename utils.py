@@ -1,5 +1,6 @@
 from __future__ import annotations
-import time
+import threading, time
+from contextlib import contextmanager
 from datetime import datetime
 
 ASCII_LOGO = r"""
@@ -11,19 +12,110 @@ ASCII_LOGO = r"""
 |_|\___|_|\__,_||___/ \___||_|\_\  \___/ |_| \___| \__|\___/
 """
 
+_log_ctx = threading.local()
+
 def log_once(tag: str, text: str) -> None:
-    print(f"[{tag}] {text}")
+    client = getattr(_log_ctx, "client", None)
+    line = f"[{client}][{tag}] {text}" if client else f"[{tag}] {text}"
+    print(line)
+    sink = getattr(_log_ctx, "sink", None)
+    if sink is not None:
+        try:
+            sink.write(line + "\n")
+        except Exception:
+            pass
+
+@contextmanager
+def log_client(name: str | None, sink=None):
+    """Bu blok içindeki log_once çağrılarını istemci adıyla etiketler (+ opsiyonel dosyaya yazar)."""
+    prev = (getattr(_log_ctx, "client", None), getattr(_log_ctx, "sink", None))
+    _log_ctx.client, _log_ctx.sink = name, sink
+    try:
+        yield
+    finally:
+        _log_ctx.client, _log_ctx.sink = prev
+
+_fromiso = datetime.fromisoformat
+_EPOCH = datetime(1970, 1, 1)
+_MINUTES: dict = {}    # "YYYY-MM-DDTHH:MM" → epoch sn (UTC)
+_MINUTES_CAP = 4096
 
 def parse_ts_iso(ts: str | None) -> float:
     if not ts:
         return 0.0
+    # LCU'nun sabit biçimi: "2024-05-01T12:34:56.789Z" (24) / "...:56Z" (20) — UTC.
+    # Dakikaya kadarki önek bir kez çözülüp önbelleğe alınır (sohbet mesajları aynı
+    # dakikalarda toplanır); saniye + milisaniye dilimden tek float() ile eklenir.
+    n = len(ts)
+    if ts[-1] == "Z" and (n == 24 or n == 20) and ts[10] == "T":
+        head = ts[:16]
+        base = _MINUTES.get(head)
+        try:
+            if base is None:
+                base = (_fromiso(head) - _EPOCH).total_seconds()
+                if len(_MINUTES) >= _MINUTES_CAP:
+                    _MINUTES.clear()
+                _MINUTES[head] = base
+            sec = float(ts[17:-1])
+            if 0.0 <= sec < 60.0:
+                return base + sec
+        except ValueError:
+            pass
     try:
         if ts.endswith("Z"):
             ts = ts[:-1] + "+00:00"
-        return datetime.fromisoformat(ts).timestamp()
+        return _fromiso(ts).timestamp()
     except Exception:
         return 0.0
 
+class TsMemo:
+    """Mesaj id → epoch sınırlı önbelleği; görülmüş mesajların zaman damgası tekrar çözülmez.
+
+    Kapasite dolunca en eski girdi atılır (FIFO). Aynı id farklı ts ile gelirse yeniden çözülür.
+    """
+
+    __slots__ = ("_d", "cap", "hits", "misses")
+
+    def __init__(self, cap: int = 8192):
+        self._d: dict = {}
+        self.cap = cap
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, key, ts: str | None) -> float:
+        if key is None:
+            return parse_ts_iso(ts)
+        hit = self._d.get(key)
+        if hit is not None and hit[0] == ts:
+            self.hits += 1
+            return hit[1]
+        self.misses += 1
+        v = parse_ts_iso(ts)
+        if len(self._d) >= self.cap:
+            try:
+                del self._d[next(iter(self._d))]
+            except (KeyError, RuntimeError, StopIteration):
+                pass  # başka thread aynı anda attı
+        self._d[key] = (ts, v)
+        return v
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+def _rank(xs, q: float) -> float:
+    # xs sıralı; en yakın sıra (nearest-rank) yüzdeliği
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+
+def percentile(values, q: float) -> float:
+    """q ∈ [0, 1] (0.5 → p50); boş girdide 0.0."""
+    return _rank(sorted(values), q)
+
+def latency_dist(samples) -> dict:
+    """Saniye cinsinden süre örnekleri → {"p50_ms", "p95_ms", "max_ms"} (/cmdq, /outbox çıktıları)."""
+    xs = sorted(samples)
+    return {"p50_ms": round(_rank(xs, 0.5) * 1000.0, 1), "p95_ms": round(_rank(xs, 0.95) * 1000.0, 1),
+            "max_ms": round((xs[-1] if xs else 0.0) * 1000.0, 1)}
+
 def status_tag(avail: str | None) -> str:
     a = (avail or "").lower()
     if a in ("chat","online","available","ingame","in_game","inchampselect","inlobby","in_lobby"):